@@ -20,7 +20,7 @@ def supported_properties():
     """
     Should be updated every time I add properties.
     """
-    return ['cell', 'pbc', 'positions',  'symbols', 'mass', 'charge', 'custom']
+    return ['cell', 'pbc', 'positions',  'symbols', 'mass', 'charge', 'hubbard', 'custom']
 
 
 @pytest.fixture
@@ -12,8 +12,10 @@
 This module defines the classes for structures and all related
 functions to operate on them.
 """
+import collections
 import copy
 import functools
+import io
 import itertools
 import json
 
@@ -28,11 +30,11 @@ from typing import Dict, Any
 
 from aiida_atomistic.data.structure.properties import PropertyCollector
 
-__all__ = ('StructureData', 'Kind', 'Site')
+__all__ = ('StructureData', 'Kind', 'Site', 'SiteView')
 
 # Threshold used to check if the mass of two different Site objects is the same.
 
-# RM _MASS_THRESHOLD = 1.e-3
+_MASS_THRESHOLD = 1.e-3
 # Threshold to check if the sum is one or not
 _SUM_THRESHOLD = 1.e-6
 
@@ -45,6 +47,85 @@ _valid_symbols = tuple(i['symbol'] for i in elements.values())
 _atomic_masses = {el['symbol']: el['mass'] for el in elements.values()}
 _atomic_numbers = {data['symbol']: num for num, data in elements.items()}
 
+# Per-process LRU cache of the derived quantities of stored (hence immutable) structures,
+# e.g. `get_kinds` and `get_formula` (key: node uuid, method name and arguments), see `memoize_if_stored`.
+_STORED_CACHE = collections.OrderedDict()
+_STORED_CACHE_MAXSIZE = 1024
+# Extra used to persist the `get_kinds` results of stored structures, if requested.
+_GET_KINDS_EXTRA = 'get_kinds'
+
+# Number of sites formatted at once by the writers of the export formats (see `write_formatted_rows`).
+_WRITE_CHUNK_SIZE = 10000
+
+def _freeze_stored_value(value):
+    """
+    Make the numpy arrays of `value` read-only, also inside tuples (e.g. the NeighborList), and return whether the 
+    value is immutable, i.e. whether it can be shared among the callers without copying it.
+    """
+    import numpy as np
+
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+        return True
+    if isinstance(value, tuple):
+        return all([_freeze_stored_value(item) for item in value])
+    return isinstance(value, (str, bytes, int, float, complex, frozenset, type(None), np.generic))
+
+
+def _get_stored_cache(key):
+    """
+    Return the value cached for `key` in the `_STORED_CACHE`, marking it as the most recently used.
+    Immutable values (including the read-only arrays) are returned as they are, the others are copied.
+
+    :raise: KeyError if the key is not cached.
+    """
+    _STORED_CACHE.move_to_end(key)
+    value, immutable = _STORED_CACHE[key]
+    return value if immutable else copy.deepcopy(value)
+
+
+def _set_stored_cache(key, value):
+    """
+    Cache `value` for `key` in the `_STORED_CACHE`, evicting the least recently used entry if the cache exceeds 
+    `_STORED_CACHE_MAXSIZE` entries. The numpy arrays are made read-only and cached as they are, as the other 
+    immutable values; the mutable ones (e.g. dictionaries, lists and sets) are copied.
+    """
+    immutable = _freeze_stored_value(value)
+    _STORED_CACHE[key] = (value, immutable) if immutable else (copy.deepcopy(value), immutable)
+    if len(_STORED_CACHE) > _STORED_CACHE_MAXSIZE:
+        _STORED_CACHE.popitem(last=False)
+
+
+def memoize_if_stored(method):
+    """
+    Decorator memoizing a method of the StructureData in the `_STORED_CACHE`, once the node is stored.
+
+    The key is made of the uuid of the node, the name of the method and the arguments, so the results are
+    shared among all the instances of the same node (e.g. obtained with `load_node`). The cached values cannot be
+    modified: the mutable results are copied at each call, while the arrays are read-only and returned without any
+    copy (see `_set_stored_cache`). Calls with unhashable arguments are not memoized.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.is_stored:
+            return method(self, *args, **kwargs)
+
+        key = (self.uuid, method.__name__, args, tuple(sorted(kwargs.items())))
+        try:
+            return _get_stored_cache(key)
+        except KeyError:
+            pass
+        except TypeError:
+            return method(self, *args, **kwargs)
+
+        result = method(self, *args, **kwargs)
+        _set_stored_cache(key, result)
+        return result
+
+    return wrapper
+
+
 ## RM
 def _get_valid_cell(inputcell):
     """
@@ -278,18 +359,7 @@ def group_symbols(_list):
     :return: a list of length-2 lists of the form [ multiplicity , element ]
     """
 
-    the_list = copy.deepcopy(_list)
-    the_list.reverse()
-    grouped_list = [[1, the_list.pop()]]
-    while the_list:
-        elem = the_list.pop()
-        if elem == grouped_list[-1][1]:
-            # same symbol is repeated
-            grouped_list[-1][0] += 1
-        else:
-            grouped_list.append([1, elem])
-
-    return grouped_list
+    return [[sum(1 for _ in group), elem] for elem, group in itertools.groupby(_list)]
 
 
 def get_formula_from_symbol_list(_list, separator=''):
@@ -496,21 +566,20 @@ def get_formula(symbol_list, mode='hill', separator=''):
     """
 
     if mode == 'group':
-        return get_formula_group(symbol_list, separator=separator)
+        return get_formula_group(list(symbol_list), separator=separator)
 
     # for hill and count cases, simply count the occurences of each
-    # chemical symbol (with some re-ordering in hill)
+    # chemical symbol (with some re-ordering in hill), in a single pass
     if mode in ['hill', 'hill_compact']:
-        if 'C' in symbol_list:
-            ordered_symbol_set = sorted(set(symbol_list), key=lambda elem: {'C': '0', 'H': '1'}.get(elem, elem))
+        counts = get_symbol_counts(symbol_list)
+        if 'C' in counts:
+            ordered_symbol_set = sorted(counts, key=lambda elem: {'C': '0', 'H': '1'}.get(elem, elem))
         else:
-            ordered_symbol_set = sorted(set(symbol_list))
-        the_symbol_list = [[symbol_list.count(elem), elem] for elem in ordered_symbol_set]
+            ordered_symbol_set = sorted(counts)
+        the_symbol_list = [[counts[elem], elem] for elem in ordered_symbol_set]
 
     elif mode in ['count', 'count_compact']:
-        ordered_symbol_indexes = sorted([symbol_list.index(elem) for elem in set(symbol_list)])
-        ordered_symbol_set = [symbol_list[i] for i in ordered_symbol_indexes]
-        the_symbol_list = [[symbol_list.count(elem), elem] for elem in ordered_symbol_set]
+        the_symbol_list = [[count, elem] for elem, count in get_symbol_counts(symbol_list).items()]
 
     elif mode == 'reduce':
         the_symbol_list = group_symbols(symbol_list)
@@ -518,7 +587,7 @@ def get_formula(symbol_list, mode='hill', separator=''):
     else:
         raise ValueError('Mode should be hill, hill_compact, group, reduce, count or count_compact')
 
-    if mode in ['hill_compact', 'count_compact']:
+    if mode in ['hill_compact', 'count_compact'] and the_symbol_list:
         from math import gcd
         the_gcd = functools.reduce(gcd, [e[0] for e in the_symbol_list])
         the_symbol_list = [[e[0] // the_gcd, e[1]] for e in the_symbol_list]
@@ -526,6 +595,17 @@ def get_formula(symbol_list, mode='hill', separator=''):
     return get_formula_from_symbol_list(the_symbol_list, separator=separator)
 
 
+def get_symbol_counts(symbol_list):
+    """
+    Count the occurrences of each symbol in a list of symbols, in a single pass.
+
+    :param symbol_list: a list of symbols, e.g. ``['H','H','O']``
+    :return: a ``collections.Counter`` mapping each symbol to its number of occurrences,
+        with the symbols in order of first appearance in the list, e.g. ``{'H': 2, 'O': 1}``
+    """
+    return collections.Counter(symbol_list)
+
+
 def get_symbols_string(symbols, weights):
     """
     Return a string that tries to match as good as possible the symbols
@@ -655,6 +735,74 @@ def ase_refine_cell(aseatoms, **kwargs):
     }
 
 
+def get_ase_tags(kind_names, kind_symbols):
+    """
+    Return the ASE tag of each kind, to be used when converting a structure to ase.Atoms.
+
+    If the kind name is equal to the symbol, no tag is set; if it is the symbol followed
+    by a digit, the digit is used as tag; otherwise a new tag is generated (the first
+    integer after the ones used by the kinds of the same element).
+
+    :param kind_names: the list of the kind names.
+    :param kind_symbols: the list of the (single) symbol of each kind, or None for alloys and
+        kinds with vacancies, which are not tagged.
+
+    :return: a list with the tag of each kind (0 means no tag).
+    """
+    from collections import defaultdict
+
+    # I create the list of tags
+    tag_list = []
+    used_tags = defaultdict(list)
+    for name, symbol in zip(kind_names, kind_symbols):
+        # Skip alloys and vacancies, and kinds whose name is equal to the specie name
+        if symbol is None or str(name) == str(symbol):
+            tag_list.append(None)
+            continue
+        # Name is not the specie name
+        if name.startswith(symbol):
+            try:
+                new_tag = int(name[len(symbol)])
+                tag_list.append(new_tag)
+                used_tags[symbol].append(new_tag)
+                continue
+            except ValueError:
+                pass
+        tag_list.append(symbol)  # I use a string as a placeholder
+
+    for i, tag in enumerate(tag_list):
+        # If it is a string, it is the name of the element,
+        # and I have to generate a new integer for this element
+        if isinstance(tag, str):
+            existing_tags = used_tags[tag]
+            new_tag = max(existing_tags) + 1 if existing_tags else 1
+            used_tags[tag].append(new_tag)
+            tag_list[i] = new_tag
+
+    return [0 if tag is None else tag for tag in tag_list]
+
+
+def write_formatted_rows(handle, row_format, columns, chunk_size=_WRITE_CHUNK_SIZE):
+    """
+    Write a table to a binary file handle, one row per entry of the columns.
+
+    The rows are formatted in chunks of `chunk_size` rows, each one with a single `%` operation, so that the
+    whole table is never held in memory as a string.
+
+    :param handle: a file-like object opened in binary mode.
+    :param row_format: the %-format of a single row, e.g. ``'%d %18.10f\\n'``.
+    :param columns: a list of sequences (lists or 1D arrays) of the same length, one for each field of the row.
+    :param chunk_size: the number of rows formatted at once.
+    """
+    n_rows = len(columns[0]) if columns else 0
+    for start in range(0, n_rows, chunk_size):
+        stop = min(start + chunk_size, n_rows)
+        chunk_columns = [column[start:stop] for column in columns]
+        chunk_columns = [column.tolist() if hasattr(column, 'tolist') else column for column in chunk_columns]
+        values = tuple(itertools.chain.from_iterable(zip(*chunk_columns)))
+        handle.write(((row_format * (stop - start)) % values).encode('utf-8'))
+
+
 def atom_kinds_to_html(atom_kind):
     """
 
@@ -713,6 +861,12 @@ class StructureData(Data):
 
     _dimensionality_label = {0: '', 1: 'length', 2: 'surface', 3: 'volume'}
     _internal_kind_tags = None
+    _properties = None # cached PropertyCollector, see the `properties` property.
+    _site_view = None # cached SiteView, see the `sites` property.
+    _site_view_key = None
+    _kinds_cache = None # cached Kind objects, see the `kinds` property.
+    # export formats written directly to a file handle, with the name of the corresponding writer method.
+    _stream_writers = {'xsf': '_write_xsf', 'xyz': '_write_xyz', 'chemdoodle': '_write_chemdoodle'}
 
     def __init__(
         self,
@@ -786,8 +940,31 @@ class StructureData(Data):
     def properties(self):
         """ 
         Load the `_property_attribute` stored in the aiida db.
-        """
-        return PropertyCollector(parent=self, properties=self.base.attributes.get('_property_attributes'))
+        
+        The PropertyCollector is cached on the node instance, so that the properties are validated only once:
+        - for stored nodes, the attributes are immutable and the cached collector is always returned;
+        - for unstored nodes, the collector is rebuilt only if the `_property_attributes` attribute has been
+          replaced in the meanwhile (e.g. via `base.attributes.set`). In-place changes of the attribute 
+          dictionary are not detected, as they are not supported anyway.
+          
+        Validation policy: the properties of unstored nodes are fully validated, and checked again in the `_validate`
+        method when the node is stored. The properties of nodes loaded from the database are trusted, i.e. not validated.
+        """
+        if self._properties is not None and self.is_stored:
+            return self._properties
+        
+        property_attributes = self.base.attributes.get('_property_attributes')
+        if self.is_stored:
+            # e.g. loaded via `load_node`: the properties were already validated when the node was stored.
+            self._properties = PropertyCollector(parent=self, properties=property_attributes, validate=False)
+            return self._properties
+        
+        # For unstored nodes, the `get` returns the reference to the attribute (no deepcopy), so we can check if
+        # it is still the one managed by the cached PropertyCollector.
+        if self._properties is None or self._properties._property_attributes is not property_attributes:
+            self._properties = PropertyCollector(parent=self, properties=property_attributes)
+        
+        return self._properties
 
     @properties.setter
     def properties(self,value):
@@ -805,7 +982,7 @@ class StructureData(Data):
             structure_dictionary: a dictionary with the properties defined. Used to generate new StructureData with some changed/updated properties.
         """
         
-        structure_dictionary = copy.deepcopy(self.base.attributes.get('_property_attributes'))
+        structure_dictionary = copy.deepcopy(self.properties.get_property_attributes())
         
         if generate_kinds:
             kinds, new_properties_value = self.get_kinds(exclude=kinds_exclude, custom_thr=kinds_thresholds)
@@ -816,7 +993,222 @@ class StructureData(Data):
         
         return structure_dictionary
     
-    def get_kinds(self, kind_tags=[], exclude=[], custom_thr={}):
+    def replace(self, **changes):
+        """
+        Return a new (unstored) StructureData with some properties changed, e.g.:
+        
+            new_structure = structure.replace(charge={'value': [1, 0]}, kinds={'value': ['Li0', 'Li1']})
+        
+        Cheaper than `StructureData(properties=structure.to_dict())`: the unchanged properties are shared with this 
+        node (no deepcopy) and not validated again; only the changed properties and the ones depending on them 
+        are validated.
+        
+        NB: derived properties are not updated if the properties they derive from are changed (e.g. the mass if the 
+        symbols are changed): use `mass=None` to reset them to the default.
+        
+        Args:
+            **changes: the changed properties, in the same format as the `properties` input. A None value removes 
+                       the property.
+            
+        Returns:
+            structure: the new StructureData.
+        """
+        new_structure = self.__class__()
+        new_structure._properties = self.properties._replace(parent=new_structure, changes=changes)
+        
+        return new_structure
+    
+    def make_supercell(self, matrix):
+        """
+        Return a supercell of this structure, with cell `matrix @ cell`, e.g.:
+        
+            supercell, site_map = structure.make_supercell([2, 2, 1])
+        
+        The lattice translations are generated by broadcasting, and all the intra-site properties (symbols, mass, 
+        charge, kinds, ...) and the custom per-site properties are tiled consistently with the positions, through the 
+        site map. For diagonal matrices 
+        (with positive entries) the positions are translated as they are; for general matrices, the sites are 
+        wrapped in the supercell.
+        
+        Args:
+            matrix: the 3x3 integer supercell matrix (the rows are the new cell vectors in units of the old ones), or 
+                    three integers for a diagonal matrix.
+            
+        Returns:
+            supercell: the new (unstored) StructureData.
+            site_map: array with, for each site of the supercell, the index of the corresponding site of this 
+                      structure. The sites are ordered by lattice translation, then as in this structure.
+        
+        Raises:
+            ValueError: if the matrix is not integer or is singular, or if it extends a non-periodic direction; if a 
+                        custom property has not one value per site.
+        """
+        import numpy as np
+        
+        matrix = np.array(matrix)
+        if matrix.shape == (3,):
+            matrix = np.diag(matrix)
+        if matrix.shape != (3, 3) or not np.allclose(matrix, np.round(matrix)):
+            raise ValueError(f"The supercell matrix should be a 3x3 integer matrix or 3 integers, got {matrix.tolist()}.")
+        matrix = np.round(matrix).astype(int)
+        n_images = int(round(abs(np.linalg.det(matrix))))
+        if n_images == 0:
+            raise ValueError(f"The supercell matrix {matrix.tolist()} is singular.")
+        
+        properties = self.properties
+        cell = np.array(properties.cell.value, dtype=float)
+        positions = np.array(properties.positions.value, dtype=float).reshape(-1, 3)
+        pbc = np.array(properties.pbc.value, dtype=bool)
+        n_sites = len(positions)
+        
+        non_periodic = ~pbc
+        if (matrix[non_periodic] != np.eye(3, dtype=int)[non_periodic]).any() or \
+            (matrix[:, non_periodic] != np.eye(3, dtype=int)[:, non_periodic]).any():
+            raise ValueError(f"The supercell matrix {matrix.tolist()} extends a non-periodic direction (pbc={pbc.tolist()}).")
+        
+        if (matrix == np.diag(np.diagonal(matrix))).all() and (np.diagonal(matrix) > 0).all():
+            translations = np.stack(
+                np.meshgrid(*[np.arange(n) for n in np.diagonal(matrix)], indexing='ij'), axis=-1
+                ).reshape(-1, 3)
+            site_map = np.tile(np.arange(n_sites), n_images)
+            site_translations = np.repeat(translations, n_sites, axis=0)
+            new_positions = (positions[None, :, :] + (translations @ cell)[:, None, :]).reshape(-1, 3)
+        else:
+            try:
+                fractional = positions @ np.linalg.inv(cell)
+            except np.linalg.LinAlgError:
+                raise ValueError("Cannot build a supercell with a general matrix for a singular cell.")
+            shifts = np.floor(fractional).astype(int)
+            fractional -= shifts
+            
+            # candidate translations: the bounding box of the supercell, in units of the cell vectors.
+            corners = np.array(list(itertools.product([0, 1], repeat=3))) @ matrix
+            ranges = [np.arange(low - 1, high + 1) for low, high in zip(corners.min(axis=0), corners.max(axis=0))]
+            translations = np.stack(np.meshgrid(*ranges, indexing='ij'), axis=-1).reshape(-1, 3)
+            
+            # fractional coordinates in the supercell of all the translated sites: keep the ones in [0, 1).
+            eps = 1e-8
+            supercell_fractional = (fractional[None, :, :] + translations[:, None, :]) @ np.linalg.inv(matrix)
+            inside = np.all((supercell_fractional >= -eps) & (supercell_fractional < 1 - eps), axis=2)
+            image_indices, site_map = np.nonzero(inside)
+            if len(site_map) != n_images * n_sites:
+                raise ValueError(f"Found {len(site_map)} sites in the supercell instead of {n_images * n_sites}.")
+            new_positions = (fractional[site_map] + translations[image_indices]) @ cell
+            site_translations = translations[image_indices] - shifts[site_map]
+        
+        changes = {
+            "cell": {**properties.get_property_attribute("cell"), "value": (matrix @ cell).tolist()},
+            "positions": {**properties.get_property_attribute("positions"), "value": new_positions.tolist()},
+        }
+        
+        if "hubbard" in properties.get_stored_properties():
+            from aiida_atomistic.data.structure.properties.hubbard_qe_utils import map_hubbard_indices
+            
+            arrays = properties.hubbard.get_arrays()
+            changes["hubbard"] = properties.hubbard._take_parameters(*map_hubbard_indices(
+                n_sites, site_map, site_translations, matrix, 
+                arrays["atom_index"], arrays["neighbour_index"], arrays["translation"],
+                ))
+        
+        return self._take_sites(site_map, changes), site_map
+    
+    def _take_sites(self, site_map, changes={}):
+        """
+        Return a new (unstored) StructureData with the sites `site_map` (array of site indices) of this structure: all 
+        the intra-site properties which are not in `changes` are indexed at once by the site map.
+        
+        As in `replace`, but the properties are valid by construction (they are taken from the validated properties 
+        of this structure): no need to copy and validate them. Used e.g. to tile or permute the sites.
+        
+        The inter-site properties (e.g. the Hubbard parameters) refer to the site indices: they have to be provided 
+        in `changes`, consistently with the site map. The custom properties are indexed as the intra-site ones if 
+        they have one value per site.
+        
+        :raise ValueError: if an inter-site property is not in `changes`, or a custom property has not one value 
+            per site.
+        """
+        import numpy as np
+        from aiida_atomistic.data.structure.properties.custom import CustomProperty
+        from aiida_atomistic.data.structure.properties.intra_site import IntraSiteProperty
+        
+        properties = self.properties
+        changes = dict(changes)
+        property_types = properties._get_property_types()
+        n_sites = len(properties.get_property_attribute("positions")["value"])
+        for pname in properties.get_stored_properties():
+            domain = getattr(property_types[pname].__fields__.get("domain"), "default", None)
+            if domain == "inter-site" and pname not in changes:
+                raise ValueError(f"The '{pname}' property cannot be mapped on the new sites.")
+            if pname in changes:
+                continue
+            property_attribute = properties.get_property_attribute(pname)
+            if issubclass(property_types[pname], CustomProperty):
+                value = property_attribute.get("value")
+                if not hasattr(value, "__len__") or isinstance(value, (str, dict)) or len(value) != n_sites:
+                    raise ValueError(
+                        f"The '{pname}' property cannot be mapped on the new sites, as it has not one value per site: "
+                        "provide it in `changes`, or remove it first."
+                    )
+                changes[pname] = {**property_attribute, "value": [value[index] for index in np.asarray(site_map).tolist()]}
+            elif issubclass(property_types[pname], IntraSiteProperty):
+                changes[pname] = {**property_attribute, "value": np.asarray(property_attribute["value"])[site_map].tolist()}
+        
+        return self._replace_trusted(changes)
+    
+    def _replace_trusted(self, changes):
+        """
+        As `replace`, but the `changes` are valid by construction (e.g. derived from the validated properties of this 
+        structure, or validated in bulk by the caller): they are neither copied nor validated.
+        """
+        new_structure = self.__class__()
+        new_structure._properties = self.properties._replace(parent=new_structure, changes=changes, trusted=True)
+        
+        return new_structure
+    
+    def get_kinds(self, kind_tags=[], exclude=[], custom_thr={}, use_extras=False):
+        """Get the list of kinds, taking into account all the properties.
+        
+        For stored structures, the results are memoized in the per-process LRU cache (of size `_STORED_CACHE_MAXSIZE`), 
+        so that repeated calls with the same arguments do not recompute them. If `use_extras` is True, the results are 
+        also persisted in (and loaded from) the extras of the node, to be reused by other processes.
+        
+        See the `_get_kinds` method for the algorithm and the description of the arguments.
+        
+        Args:
+            kind_tags (list, optional): list of kind names (or None) for each site.
+            exclude (list, optional): list of properties to be excluded in the kind determination 
+            custom_thr (dict, options): dictionary with the custom threshold for given properties.
+            use_extras (bool, optional): persist the results in the node extras (only for stored structures).
+            
+        Returns:
+            kind_names, kind_values: see the `_get_kinds` method.
+        """
+        if not self.is_stored:
+            return self._get_kinds(kind_tags=kind_tags, exclude=exclude, custom_thr=custom_thr)
+        
+        arguments = (tuple(kind_tags), tuple(sorted(exclude)), tuple(sorted(custom_thr.items())))
+        key = (self.uuid, 'get_kinds', arguments)
+        
+        try:
+            return _get_stored_cache(key)
+        except KeyError:
+            pass
+        
+        extra_key = json.dumps(arguments)
+        persisted = self.base.extras.get(_GET_KINDS_EXTRA, {}) if use_extras else {}
+        if extra_key in persisted:
+            result = tuple(persisted[extra_key])
+        else:
+            result = self._get_kinds(kind_tags=kind_tags, exclude=exclude, custom_thr=custom_thr)
+            if use_extras:
+                persisted[extra_key] = list(result)
+                self.base.extras.set(_GET_KINDS_EXTRA, persisted)
+        
+        _set_stored_cache(key, result)
+        
+        return result
+    
+    def _get_kinds(self, kind_tags=[], exclude=[], custom_thr={}):
         """Get the list of kinds, taking into account all the properties.
         
         Algorithm:
@@ -831,8 +1223,9 @@ class StructureData(Data):
         site4 = | 1  2  3 | = kind4
         
         In Step 2 it checks for the matrix which rows have the same numbers in the same order, i.e. recognize the different
-        kinds considering all the properties. This is done by subtracting a row from the others and see if all the elements
-        are zero, meaning that we have the same combination of kinds.
+        kinds considering all the properties. This is done via `np.unique(axis=0, return_inverse=True)` on the rows of
+        the matrix, with the symbol as additional column, i.e. in O(N log N). Each kind is then named after the element and 
+        the index of its last site appearing before (or at) the first site of the last detected kind.
         
         In Step 3 we override the kinds with the kind_tags.
 
@@ -866,7 +1259,10 @@ class StructureData(Data):
         kind_values = {}
         for single_property in self.properties.get_stored_properties():
             prop = getattr(self.properties,single_property)
-            if prop.domain == "intra-site" and not single_property in ["symbols","positions"]+exclude:
+            # the kinds (and any non-numeric property) cannot be clustered within a threshold.
+            if prop.domain == "intra-site" and not single_property in ["symbols","positions","kinds"]+exclude:
+                if not np.issubdtype(np.asarray(prop.value).dtype, np.number):
+                    continue
                 thr = custom_thr.get(single_property, None)
                 kind_values[single_property] = {}
                 # for this if, refer to the description of the `to_kinds` method of the IntraSiteProperty class.
@@ -881,30 +1277,49 @@ class StructureData(Data):
         k = k.T
         
         # Step 2:
-        kinds = np.zeros(len(self.properties.positions.value),dtype=int) -1
         kind_names = copy.deepcopy(symbols)
-        for i in range(len(k)):
-            element = symbols[i]
-            diff = k-k[i]
-            diff_sum = np.sum(np.abs(diff),axis=1)
-
-            kinds[np.where(diff_sum == 0)[0]] = i
-            for where in np.where(diff_sum == 0)[0]:
-                if f"{element}{i}" in kind_tags:
-                    kind_names[where] = f"{element}{i+len(k)}"
-                else:
-                    kind_names[where] = f"{element}{i}"
-            if len(np.where(kinds == -1)[0]) == 0 : 
-                #print(f"search ended at iteration {i}")
-                break
+        if len(k) > 0:
+            _, symbols_labels = np.unique(symbols, return_inverse=True)
+            rows = np.column_stack([symbols_labels.reshape(-1), k])
+            _, kinds = np.unique(rows, axis=0, return_inverse=True)
+            kinds = kinds.reshape(-1)
+            
+            # index of the first site of each kind: the search (in site order) ends when all kinds have been found.
+            sites = np.arange(len(k))
+            first_sites = np.full(kinds.max()+1, len(k))
+            np.minimum.at(first_sites, kinds, sites)
+            last_found = first_sites.max()
+            # the kind index is the one of the last site of that kind, before the search ended.
+            kinds_indexes = np.full(kinds.max()+1, -1)
+            np.maximum.at(kinds_indexes, kinds[:last_found+1], sites[:last_found+1])
+            
+            kind_tags_set = set(kind_tags)
+            names = [
+                f"{symbols[i]}{i+len(k)}" if f"{symbols[i]}{i}" in kind_tags_set else f"{symbols[i]}{i}"
+                for i in kinds_indexes
+                ]
+            kind_names = [names[kind] for kind in kinds]
         
         # Step 3:
         kind_names = [kind_names[i] if not kind_tags[i] else kind_tags[i] for i in range(len(kind_tags))]
         
         return kind_names,kind_values
     
+    def store(self, *args, **kwargs):
+        """
+        Store the node. The large intra-site properties are moved in the node repository once the node is validated 
+        (see `_validate` and `PropertyCollector.array_storage_threshold`), and moved back if the storing fails.
+        """
+        try:
+            return super().store(*args, **kwargs)
+        except Exception:
+            if not self.is_stored and self.base.attributes.get('_property_attributes', None) is not None:
+                self.properties._unstore_arrays()
+            raise
+
     #### END new methods
     
+    @memoize_if_stored
     def get_dimensionality(self):
         """
         Return the dimensionality of the structure and its length/surface/volume.
@@ -914,7 +1329,9 @@ class StructureData(Data):
         :return: returns a dictionary with keys "dim" (dimensionality integer), "label" (dimensionality label)
             and "value" (numerical length/surface/volume).
         """
-        return _get_dimensionality(self.pbc, self.cell)
+        if self._has_legacy_sites():
+            return _get_dimensionality(self.pbc, self.cell)
+        return _get_dimensionality(tuple(self.properties.pbc.value), self.properties.cell.value)
 
     def set_ase(self, aseatoms):
         """
@@ -922,11 +1339,19 @@ class StructureData(Data):
         """
         if is_ase_atoms(aseatoms):
             # Read the ase structure
+            import numpy as np
+
             self.cell = aseatoms.cell
             self.pbc = aseatoms.pbc
             self.clear_kinds()  # This also calls clear_sites
-            for atom in aseatoms:
-                self.append_atom(ase=atom)
+            # ASE sets mass to numpy.nan for unstable species
+            masses = aseatoms.get_masses()
+            self.extend_atoms(
+                symbols=aseatoms.get_chemical_symbols(),
+                positions=aseatoms.positions,
+                masses=[None if np.isnan(mass) else mass for mass in masses.tolist()],
+                tags=aseatoms.get_tags().tolist(),
+            )
         else:
             raise TypeError('The value is not an ase.Atoms object')
 
@@ -1014,6 +1439,9 @@ class StructureData(Data):
         self.pbc = [True, True, True]
         self.clear_kinds()
 
+        symbols = []
+        weights = []
+        names = []
         for site in struct.sites:
 
             species_and_occu = site.species
@@ -1023,16 +1451,11 @@ class StructureData(Data):
             else:
                 kind_name = build_kind_name(species_and_occu)
 
-            inputs = {
-                'symbols': [x.symbol for x in species_and_occu.keys()],
-                'weights': list(species_and_occu.values()),
-                'position': site.coords.tolist()
-            }
+            symbols.append([x.symbol for x in species_and_occu.keys()])
+            weights.append(list(species_and_occu.values()))
+            names.append(kind_name)
 
-            if kind_name is not None:
-                inputs['name'] = kind_name
-
-            self.append_atom(**inputs)
+        self.extend_atoms(symbols=symbols, positions=struct.cart_coords, weights=weights, names=names)
 
     def _validate(self):
         """
@@ -1043,6 +1466,12 @@ class StructureData(Data):
 
         super()._validate()
 
+        try:
+            # single consolidated validation pass of the properties, before storing.
+            self.properties._validate_properties()
+        except (ValueError, KeyError, NotImplementedError) as exc:
+            raise ValidationError(f'Invalid properties: {exc}')
+
         try:
             _get_valid_cell(self.properties.cell.value)
         except ValueError as exc:
@@ -1084,27 +1513,92 @@ class StructureData(Data):
                 f'The following kinds are defined, but there are no sites with that kind: {list(kinds_without_sites)}'
             )
 
-    def _prepare_xsf(self, main_file_name=''):  # pylint: disable=unused-argument
+        # Last step, once the node is valid (and before its hash is computed): move the large intra-site properties 
+        # in the node repository.
+        self.properties._store_arrays()
+
+    def export(self, path, fileformat=None, overwrite=False, **kwargs):
         """
-        Write the given structure to a string of format XSF (for XCrySDen).
+        Save the structure to a file, see :py:meth:`aiida.orm.Data.export`.
+
+        The formats with a streaming writer (see `_stream_writers`) are written directly to the file,
+        without building the whole content in memory.
+        """
+        import os
+
+        if fileformat is None and path:
+            extension = os.path.splitext(path)[1][len(os.path.extsep):]
+            fileformat = self._export_format_replacements.get(extension, extension) or None
+
+        if fileformat not in self._stream_writers or kwargs:
+            return super().export(path, fileformat=fileformat, overwrite=overwrite, **kwargs)
+
+        if os.path.exists(path) and not overwrite:
+            raise OSError(f'A file was already found at {path}')
+
+        with open(path, 'wb') as handle:
+            getattr(self, self._stream_writers[fileformat])(handle)
+
+        return [path]
+
+    def _get_export_sites(self):
+        """
+        Return the arrays needed by the writers of the export formats.
+
+        :return: a tuple with the cell (3x3 array), the pbc, the list of the symbols strings of the kinds
+            (see :py:meth:`Kind.get_symbols_string`), the array of the kind index of each site
+            and the (N, 3) array of the positions.
+        :raise: ValueError if the kind of a site is not present.
+        """
+        import numpy as np
+
+        if not self._has_legacy_sites():
+            properties = self.properties
+            kind_strings, kind_indices = np.unique(properties.symbols.value, return_inverse=True)
+            return (
+                np.array(properties.cell.value, dtype=float),
+                tuple(properties.pbc.value),
+                kind_strings.tolist(),
+                kind_indices.reshape(-1),
+                np.array(properties.positions.value, dtype=float).reshape(-1, 3),
+            )
+
+        sites = self.sites
+        if len(sites) > 0 and sites.kind_indices.min() < 0:
+            raise ValueError(f"Kind name '{sites.kind_names[int(sites.kind_indices.argmin())]}' unknown")
+        return (
+            np.array(self.cell, dtype=float),
+            self.pbc,
+            [kind.get_symbols_string() for kind in self.kinds],
+            sites.kind_indices,
+            sites.positions,
+        )
+
+    def _write_xsf(self, handle):
         """
+        Write the given structure to a binary file handle, in the XSF format (for XCrySDen).
+        """
+        import numpy as np
+
         if self.is_alloy or self.has_vacancies:
             raise NotImplementedError('XSF for alloys or systems with vacancies not implemented.')
 
-        sites = self.sites
+        cell, _, kind_symbols, kind_indices, positions = self._get_export_sites()
+        # I checked above that it is not an alloy, therefore the symbols string is the symbol
+        kind_numbers = np.array([_atomic_numbers[symbol] for symbol in kind_symbols] or [0], dtype=int)
 
-        return_string = 'CRYSTAL\nPRIMVEC 1\n'
-        for cell_vector in self.cell:
-            return_string += ' '.join([f'{i:18.10f}' for i in cell_vector])
-            return_string += '\n'
-        return_string += 'PRIMCOORD 1\n'
-        return_string += f'{int(len(sites))} 1\n'
-        for site in sites:
-            # I checked above that it is not an alloy, therefore I take the
-            # first symbol
-            return_string += f'{_atomic_numbers[self.get_kind(site.kind_name).symbols[0]]} '
-            return_string += '%18.10f %18.10f %18.10f\n' % tuple(site.position)
-        return return_string.encode('utf-8'), {}
+        handle.write(b'CRYSTAL\nPRIMVEC 1\n')
+        write_formatted_rows(handle, '%18.10f %18.10f %18.10f\n', list(cell.T))
+        handle.write(f'PRIMCOORD 1\n{len(positions)} 1\n'.encode('utf-8'))
+        write_formatted_rows(handle, '%d %18.10f %18.10f %18.10f\n', [kind_numbers[kind_indices], *positions.T])
+
+    def _prepare_xsf(self, main_file_name=''):  # pylint: disable=unused-argument
+        """
+        Write the given structure to a string of format XSF (for XCrySDen).
+        """
+        handle = io.BytesIO()
+        self._write_xsf(handle)
+        return handle.getvalue(), {}
 
     def _prepare_cif(self, main_file_name=''):  # pylint: disable=unused-argument
         """
@@ -1115,53 +1609,36 @@ class StructureData(Data):
         cif = CifData(ase=self.get_ase())
         return cif._prepare_cif()  # pylint: disable=protected-access
 
-    def _prepare_chemdoodle(self, main_file_name=''):  # pylint: disable=unused-argument
+    def _write_chemdoodle(self, handle):
         """
-        Write the given structure to a string of format required by ChemDoodle.
+        Write the given structure to a binary file handle, in the JSON format required by ChemDoodle.
+
+        The periodic images of the sites are obtained by broadcasting the lattice translations over the positions,
+        and the atoms are written in chunks.
         """
         # pylint: disable=too-many-locals,invalid-name
-        from itertools import product
-
         import numpy as np
 
         supercell_factors = [1, 1, 1]
 
         # Get cell vectors and atomic position
-        lattice_vectors = np.array(self.base.attributes.get('cell'))
-        base_sites = self.base.attributes.get('sites')
-
-        start1 = -int(supercell_factors[0] / 2)
-        start2 = -int(supercell_factors[1] / 2)
-        start3 = -int(supercell_factors[2] / 2)
-
-        stop1 = start1 + supercell_factors[0]
-        stop2 = start2 + supercell_factors[1]
-        stop3 = start3 + supercell_factors[2]
-
-        grid1 = range(start1, stop1)
-        grid2 = range(start2, stop2)
-        grid3 = range(start3, stop3)
+        lattice_vectors, _, kind_strings, kind_indices, positions = self._get_export_sites()
 
-        atoms_json = []
+        # Integer coordinates of the images, with the first factor as the slowest index
+        starts = [-int(factor / 2) for factor in supercell_factors]
+        images = np.stack(
+            np.meshgrid(*[np.arange(start, start + factor) for start, factor in zip(starts, supercell_factors)],
+                        indexing='ij'),
+            axis=-1,
+        ).reshape(-1, 3)
 
         # Manual recenter of the structure
         center = (lattice_vectors[0] + lattice_vectors[1] + lattice_vectors[2]) / 2.
 
-        for ix, iy, iz in product(grid1, grid2, grid3):
-            for base_site in base_sites:
-                shift = (ix * lattice_vectors[0] + iy * lattice_vectors[1] + \
-                         iz * lattice_vectors[2] - center).tolist()
-
-                kind_name = base_site['kind_name']
-                kind_string = self.get_kind(kind_name).get_symbols_string()
-
-                atoms_json.append({
-                    'l': kind_string,
-                    'x': base_site['position'][0] + shift[0],
-                    'y': base_site['position'][1] + shift[1],
-                    'z': base_site['position'][2] + shift[2],
-                    'atomic_elements_html': atom_kinds_to_html(kind_string)
-                })
+        shifts = images[:, 0, None] * lattice_vectors[0] + images[:, 1, None] * lattice_vectors[1] + \
+                 images[:, 2, None] * lattice_vectors[2] - center
+        image_positions = (positions[None, :, :] + shifts[:, None, :]).reshape(-1, 3)
+        image_kind_indices = np.tile(kind_indices, len(images))
 
         cell_json = {
             't': 'UnitCell',
@@ -1176,38 +1653,60 @@ class StructureData(Data):
             'xyz': (lattice_vectors[0] + lattice_vectors[1] + lattice_vectors[2] - center).tolist(),
         }
 
-        return_dict = {'s': [cell_json], 'm': [{'a': atoms_json}], 'units': '&Aring;'}
+        # The JSON of each atom is `{"l": ..., "x": ..., "y": ..., "z": ..., "atomic_elements_html": ...}`:
+        # the parts depending on the kind are serialized once per kind, the coordinates with `repr` (as `json`).
+        kind_heads = np.array([f'{{"l": {json.dumps(string)}, "x": ' for string in kind_strings] or [''], dtype=object)
+        kind_tails = np.array([f', "atomic_elements_html": {json.dumps(atom_kinds_to_html(string))}}}'
+                               for string in kind_strings] or [''], dtype=object)
+        separators = np.full(len(image_positions), ', ', dtype=object)
+        separators[:1] = ''
+
+        head, tail = json.dumps({'s': [cell_json], 'm': [{'a': []}], 'units': '&Aring;'}).split('"a": []', 1)
+        handle.write(f'{head}"a": ['.encode('utf-8'))
+        write_formatted_rows(
+            handle,
+            '%s%s%r, "y": %r, "z": %r%s',
+            [separators, kind_heads[image_kind_indices], *image_positions.T, kind_tails[image_kind_indices]],
+        )
+        handle.write(f']{tail}'.encode('utf-8'))
 
-        return json.dumps(return_dict).encode('utf-8'), {}
+    def _prepare_chemdoodle(self, main_file_name=''):  # pylint: disable=unused-argument
+        """
+        Write the given structure to a string of format required by ChemDoodle.
+        """
+        handle = io.BytesIO()
+        self._write_chemdoodle(handle)
+        return handle.getvalue(), {}
 
-    def _prepare_xyz(self, main_file_name=''):  # pylint: disable=unused-argument
+    def _write_xyz(self, handle):
         """
-        Write the given structure to a string of format XYZ.
+        Write the given structure to a binary file handle, in the XYZ format.
         """
         if self.is_alloy or self.has_vacancies:
             raise NotImplementedError('XYZ for alloys or systems with vacancies not implemented.')
 
-        sites = self.sites
-        cell = self.cell
+        cell, pbc, kind_symbols, kind_indices, positions = self._get_export_sites()
+        cell = cell.tolist()
 
-        return_list = [f'{len(sites)}']
-        return_list.append(
+        handle.write(f'{len(positions)}\n'.encode('utf-8'))
+        handle.write(
             'Lattice="{} {} {} {} {} {} {} {} {}" pbc="{} {} {}"'.format(
                 cell[0][0], cell[0][1], cell[0][2], cell[1][0], cell[1][1], cell[1][2], cell[2][0], cell[2][1],
-                cell[2][2], self.pbc[0], self.pbc[1], self.pbc[2]
-            )
+                cell[2][2], pbc[0], pbc[1], pbc[2]
+            ).encode('utf-8')
         )
-        for site in sites:
-            # I checked above that it is not an alloy, therefore I take the
-            # first symbol
-            return_list.append(
-                '{:6s} {:18.10f} {:18.10f} {:18.10f}'.format(
-                    self.get_kind(site.kind_name).symbols[0], site.position[0], site.position[1], site.position[2]
-                )
-            )
+        # I checked above that it is not an alloy, therefore the symbols string is the symbol;
+        # each row starts with the newline, as there is no newline at the end of the file
+        symbols = [kind_symbols[index] for index in kind_indices.tolist()]
+        write_formatted_rows(handle, '\n%-6s %18.10f %18.10f %18.10f', [symbols, *positions.T])
 
-        return_string = '\n'.join(return_list)
-        return return_string.encode('utf-8'), {}
+    def _prepare_xyz(self, main_file_name=''):  # pylint: disable=unused-argument
+        """
+        Write the given structure to a string of format XYZ.
+        """
+        handle = io.BytesIO()
+        self._write_xyz(handle)
+        return handle.getvalue(), {}
 
     def _parse_xyz(self, inputstring):
         """
@@ -1226,8 +1725,8 @@ class StructureData(Data):
         self.clear_kinds()
         self.pbc = (False, False, False)
 
-        for sym, position in atoms:
-            self.append_atom(symbols=sym, position=position)
+        atoms = list(atoms)
+        self.extend_atoms(symbols=[sym for sym, _ in atoms], positions=[position for _, position in atoms])
 
     def _adjust_default_cell(self, vacuum_factor=1.0, vacuum_addition=10.0, pbc=(False, False, False)):
         """
@@ -1244,14 +1743,19 @@ class StructureData(Data):
             return list(zip(*[(min(values), max(values)) for values in zip(*positions)]))
 
         # Calculating the minimal cell:
-        positions = np.array([site.position for site in self.sites])
+        sites = self.sites
+        positions = np.array(sites.positions)
         position_min, _ = get_extremas_from_positions(positions)
 
         # Translate the structure to the origin, such that the minimal values in each dimension
         # amount to (0,0,0)
         positions -= position_min
-        for index, site in enumerate(self.base.attributes.get('sites')):
-            site['position'] = list(positions[index])
+        self.base.attributes.set(
+            'sites', [{
+                'position': position,
+                'kind_name': kind_name
+            } for position, kind_name in zip(positions.tolist(), sites.kind_names)]
+        )
 
         # The orthorhombic cell that (just) accomodates the whole structure is now given by the
         # extremas of position in each dimension:
@@ -1277,6 +1781,7 @@ class StructureData(Data):
         """
         return self.get_formula(mode='hill_compact')
 
+    @memoize_if_stored
     def get_symbols_set(self):
         """
         Return a set containing the names of all elements involved in
@@ -1285,8 +1790,11 @@ class StructureData(Data):
 
         :returns: a set of strings of element names.
         """
+        if not self._has_legacy_sites():
+            return set(self.properties.symbols.value)
         return set(itertools.chain.from_iterable(kind.symbols for kind in self.kinds))
 
+    @memoize_if_stored
     def get_formula(self, mode='hill', separator=''):
         """
         Return a string with the chemical formula.
@@ -1336,9 +1844,25 @@ class StructureData(Data):
             used to group and/or order the symbols in the formula
         """
 
-        symbol_list = [self.get_kind(s.kind_name).get_symbols_string() for s in self.sites]
+        return get_formula(self._get_site_symbols_strings(), mode=mode, separator=separator)
+
+    def _get_site_symbols_strings(self):
+        """
+        Return a list with the symbols string (see :py:meth:`Kind.get_symbols_string`) of each site.
 
-        return get_formula(symbol_list, mode=mode, separator=separator)
+        For the (legacy) sites, the string is computed once per kind and broadcast to the sites;
+        otherwise, the `symbols` property is returned.
+
+        :raise: ValueError if the kind of a site is not present.
+        """
+        if not self._has_legacy_sites():
+            return list(self.properties.symbols.value)
+
+        sites = self.sites
+        if len(sites) > 0 and sites.kind_indices.min() < 0:
+            raise ValueError(f"Kind name '{sites.kind_names[int(sites.kind_indices.argmin())]}' unknown")
+        kind_strings = [kind.get_symbols_string() for kind in self.kinds]
+        return [kind_strings[index] for index in sites.kind_indices.tolist()]
 
     def get_site_kindnames(self):
         """
@@ -1351,8 +1875,9 @@ class StructureData(Data):
 
         :return: a list of strings
         """
-        return [this_site.kind_name for this_site in self.sites]
+        return list(self.sites.kind_names)
 
+    @memoize_if_stored
     def get_composition(self, mode='full'):
         """
         Returns the chemical composition of this structure as a dictionary,
@@ -1369,19 +1894,18 @@ class StructureData(Data):
         :returns: a dictionary with the composition
         """
         import numpy as np
-        symbols_list = [self.get_kind(s.kind_name).get_symbols_string() for s in self.sites]
-        symbols_set = set(symbols_list)
+        counts = get_symbol_counts(self._get_site_symbols_strings())
 
         if mode == 'full':
-            return {symbol: symbols_list.count(symbol) for symbol in symbols_set}
+            return dict(counts)
 
         if mode == 'reduced':
-            gcd = np.gcd.reduce([symbols_list.count(symbol) for symbol in symbols_set])
-            return {symbol: (symbols_list.count(symbol) / gcd) for symbol in symbols_set}
+            gcd = np.gcd.reduce(list(counts.values()))
+            return {symbol: (count / gcd) for symbol, count in counts.items()}
 
         if mode == 'fractional':
-            sum_comp = sum(symbols_list.count(symbol) for symbol in symbols_set)
-            return {symbol: symbols_list.count(symbol) / sum_comp for symbol in symbols_set}
+            sum_comp = sum(counts.values())
+            return {symbol: count / sum_comp for symbol, count in counts.items()}
 
         raise ValueError(f'mode `{mode}` is invalid, choose from `full`, `reduced` or `fractional`.')
 
@@ -1395,7 +1919,7 @@ class StructureData(Data):
           object.
 
         .. note:: If any site is an alloy or has vacancies, a ValueError
-            is raised (from the site.get_ase() routine).
+            is raised.
         """
         return self._get_object_ase()
 
@@ -1474,6 +1998,7 @@ class StructureData(Data):
 
         # If here, no exceptions have been raised, so I add the site.
         self.base.attributes.all.setdefault('kinds', []).append(new_kind.get_raw())
+        self._invalidate_site_view()
         # Note, this is a dict (with integer keys) so it allows for empty spots!
         if self._internal_kind_tags is None:
             self._internal_kind_tags = {}
@@ -1502,6 +2027,7 @@ class StructureData(Data):
 
         # If here, no exceptions have been raised, so I add the site.
         self.base.attributes.all.setdefault('sites', []).append(new_site.get_raw())
+        self._invalidate_site_view()
 
     def append_atom(self, **kwargs):
         """
@@ -1608,6 +2134,132 @@ class StructureData(Data):
         site = Site(kind_name=kind.name, position=position)
         self.append_site(site)
 
+    def extend_atoms(self, symbols, positions, weights=None, names=None, masses=None, tags=None):
+        """
+        Append many atoms to the Structure at once, taking care of creating the
+        corresponding kinds.
+
+        It is equivalent to (but much faster than) calling :py:meth:`append_atom`
+        for each atom, in order: the kind is resolved only once for each distinct
+        combination of inputs, via hash-indexed lookups of the existing kinds,
+        and the kinds and the sites are written in a single attribute update.
+
+        :param symbols: the symbols of each atom (a string, or a list of strings), passed to the
+                constructor of the Kind object.
+        :param positions: the positions of the atoms (three numbers in angstrom for each atom).
+        :param weights: (optional) the weights of each atom, passed to the constructor of the Kind object.
+        :param names: (optional) the kind name of each atom (or None), passed to the constructor of the Kind object.
+        :param masses: (optional) the mass of each atom (or None), passed to the constructor of the Kind object.
+        :param tags: (optional) an integer tag for each atom (or 0/None), as in ASE: if the name is not specified,
+                atoms with different tags get different kinds, named after the tag.
+
+        .. note :: the kinds are assigned with the same rules of :py:meth:`append_atom`.
+        """
+        # pylint: disable=too-many-locals
+        import numpy as np
+
+        from aiida.common.exceptions import ModificationNotAllowed
+
+        if self.is_stored:
+            raise ModificationNotAllowed('The StructureData object cannot be modified, it has already been stored')
+
+        n_atoms = len(symbols)
+        try:
+            positions = np.array(positions, dtype=float).reshape(n_atoms, 3)
+        except (ValueError, TypeError):
+            raise ValueError('Wrong format for positions, must be a list of three float numbers for each atom.')
+
+        per_atom = {'weights': weights, 'names': names, 'masses': masses, 'tags': tags}
+        for key, value in per_atom.items():
+            if value is None:
+                per_atom[key] = [None] * n_atoms
+            elif len(value) != n_atoms:
+                raise ValueError(f'The number of {key} should match the number of symbols.')
+
+        # Everything is written at the end, so that nothing is changed in case of errors.
+        raw_kinds = list(self.base.attributes.get('kinds', []))
+        internal_kind_tags = dict(self._internal_kind_tags or {})
+
+        # Hash indices of the kinds: by name, and by (symbols, weights, internal tag) for the identity check.
+        kinds_by_name = {}
+        kinds_by_key = {}
+
+        def add_kind(kind, index):
+            kinds_by_name[kind.name] = index
+            kinds_by_key.setdefault((kind.symbols, kind.weights, kind._internal_tag), []).append(index)  # pylint: disable=protected-access
+
+        for index, raw_kind in enumerate(raw_kinds):
+            kind = Kind(raw=raw_kind)
+            kind._internal_tag = internal_kind_tags.get(index)  # pylint: disable=protected-access
+            add_kind(kind, index)
+
+        resolved_kind_names = {}
+        site_kind_names = []
+        for symbol, weight, name, mass, tag in zip(
+            symbols, per_atom['weights'], per_atom['names'], per_atom['masses'], per_atom['tags']
+        ):
+            atom_key = (
+                _create_symbols_tuple(symbol), None if weight is None else _create_weights_tuple(weight), name, mass,
+                tag or None
+            )
+            if atom_key in resolved_kind_names:
+                site_kind_names.append(resolved_kind_names[atom_key])
+                continue
+
+            inputs = {'symbols': atom_key[0], 'weights': weight}
+            if mass is not None:
+                inputs['mass'] = mass
+            if name is not None:
+                inputs['name'] = name
+            kind = Kind(**inputs)
+            if tag:
+                if name is None:
+                    kind.set_automatic_kind_name(tag=tag)
+                kind._internal_tag = tag  # pylint: disable=protected-access
+
+            if name is None:
+                # If the kind is identical to an existing one, I use the existing one (the first one)
+                candidates = kinds_by_key.get((kind.symbols, kind.weights, kind._internal_tag), [])  # pylint: disable=protected-access
+                index = next((i for i in candidates if abs(raw_kinds[i]['mass'] - kind.mass) <= _MASS_THRESHOLD), None)
+                if index is None:
+                    # otherwise I make the name unique, by adding a number (starting from 1).
+                    simplename = kind.name
+                    counter = 1
+                    while kind.name in kinds_by_name:
+                        kind.name = f'{simplename}{counter}'
+                        counter += 1
+            else:
+                index = kinds_by_name.get(name)
+                if index is not None:
+                    is_the_same, firstdiff = kind.compare_with(Kind(raw=raw_kinds[index]))
+                    if not is_the_same:
+                        raise ValueError(
+                            'You are explicitly setting the name '
+                            "of the kind to '{}', that already "
+                            'exists, but the two kinds are different!'
+                            ' (first difference: {})'.format(kind.name, firstdiff)
+                        )
+
+            if index is None:
+                index = len(raw_kinds)
+                raw_kinds.append(kind.get_raw())
+                internal_kind_tags[index] = kind._internal_tag  # pylint: disable=protected-access
+                add_kind(kind, index)
+
+            resolved_kind_names[atom_key] = raw_kinds[index]['name']
+            site_kind_names.append(raw_kinds[index]['name'])
+
+        raw_sites = list(self.base.attributes.get('sites', []))
+        raw_sites.extend({
+            'position': tuple(position),
+            'kind_name': kind_name
+        } for position, kind_name in zip(positions.tolist(), site_kind_names))
+
+        self.base.attributes.set('kinds', raw_kinds)
+        self.base.attributes.set('sites', raw_sites)
+        self._internal_kind_tags = internal_kind_tags
+        self._invalidate_site_view()
+
     def clear_kinds(self):
         """
         Removes all kinds for the StructureData object.
@@ -1621,6 +2273,7 @@ class StructureData(Data):
 
         self.base.attributes.set('kinds', [])
         self._internal_kind_tags = {}
+        self._invalidate_site_view()
         self.clear_sites()
 
     def clear_sites(self):
@@ -1633,29 +2286,66 @@ class StructureData(Data):
             raise ModificationNotAllowed('The StructureData object cannot be modified, it has already been stored')
 
         self.base.attributes.set('sites', [])
+        self._invalidate_site_view()
+
+    def _invalidate_site_view(self):
+        """
+        Drop the cached SiteView and Kind objects (see the `sites` and `kinds` properties): to be called by all the
+        methods changing the sites or the kinds.
+        """
+        self._site_view = None
+        self._site_view_key = None
+        self._kinds_cache = None
+
+    def _get_raw_sites_and_kinds(self):
+        """
+        Return the raw sites and kinds, and whether the cached SiteView and Kind objects have been built from them.
+
+        For unstored nodes, the `get` returns the references to the attributes: the lists are compared by identity,
+        to detect the attributes set directly (the `append_*`, `clear_*` and `reset_*` methods invalidate the cache).
+        """
+        raw_sites = self.base.attributes.get('sites', [])
+        raw_kinds = self.base.attributes.get('kinds', [])
+        is_cached = self._site_view_key is not None and \
+            raw_sites is self._site_view_key[0] and raw_kinds is self._site_view_key[1]
+        if not is_cached:
+            self._invalidate_site_view()
+            self._site_view_key = (raw_sites, raw_kinds)
+        return raw_sites, raw_kinds
 
     @property
     def sites(self):
         """
-        Returns a list of sites.
+        Returns the sites, as a read-only :py:class:`SiteView` (a sequence of Site objects).
+
+        The view is cached: for stored nodes it is built only once, for unstored nodes it is rebuilt only
+        if the sites or the kinds have been changed (e.g. via `append_site` or `clear_sites`).
         """
-        try:
-            raw_sites = self.base.attributes.get('sites')
-        except AttributeError:
-            raw_sites = []
-        return [Site(raw=i) for i in raw_sites]
+        if self._site_view is not None and self.is_stored:
+            return self._site_view
+
+        raw_sites, raw_kinds = self._get_raw_sites_and_kinds()
+        if self._site_view is None:
+            self._site_view = SiteView(raw_sites, raw_kinds)
+
+        return self._site_view
 
     @property
     def kinds(self):
         """
         Returns a list of kinds.
+
+        The Kind objects are cached as the `sites`; the returned ones are (shallow) copies, so that changing them does
+        not change the cache.
         """
-        try:
-            raw_kinds = self.base.attributes.get('kinds')
-        except AttributeError:
-            raw_kinds = []
-        return [Kind(raw=i) for i in raw_kinds]
+        if self._kinds_cache is None or not self.is_stored:
+            _, raw_kinds = self._get_raw_sites_and_kinds()
+            if self._kinds_cache is None:
+                self._kinds_cache = tuple(Kind(raw=i) for i in raw_kinds)
 
+        return [copy.copy(kind) for kind in self._kinds_cache]
+
+    @memoize_if_stored
     def get_kind(self, kind_name):
         """
         Return the kind object associated with the given kind name.
@@ -1667,15 +2357,7 @@ class StructureData(Data):
 
         :raise: ValueError if the kind_name is not present.
         """
-        # Cache the kinds, if stored, for efficiency
-        if self.is_stored:
-            try:
-                kinds_dict = self._kinds_cache
-            except AttributeError:
-                self._kinds_cache = {_.name: _ for _ in self.kinds}  # pylint: disable=attribute-defined-outside-init
-                kinds_dict = self._kinds_cache
-        else:
-            kinds_dict = {_.name: _ for _ in self.kinds}
+        kinds_dict = {_.name: _ for _ in self.kinds}
 
         # Will raise ValueError if the kind is not present
         try:
@@ -1759,31 +2441,30 @@ class StructureData(Data):
         if not conserve_particle:
             raise NotImplementedError
         else:
+            import numpy as np
 
             # test consistency of th enew input
-            n_sites = len(self.sites)
+            sites = self.sites
+            n_sites = len(sites)
             if n_sites != len(new_positions) and conserve_particle:
                 raise ValueError('the new positions should be as many as the previous structure.')
 
-            new_sites = []
-            for i in range(n_sites):
-                try:
-                    this_pos = [float(j) for j in new_positions[i]]
-                except ValueError:
-                    raise ValueError(f'Expecting a list of floats. Found instead {new_positions[i]}')
-
-                if len(this_pos) != 3:
-                    raise ValueError(f'Expecting a list of lists of length 3. found instead {len(this_pos)}')
-
-                # now append this Site to the new_site list.
-                new_site = Site(site=self.sites[i])  # So we make a copy
-                new_site.position = copy.deepcopy(this_pos)
-                new_sites.append(new_site)
-
-            # now clear the old sites, and substitute with the new ones
-            self.clear_sites()
-            for this_new_site in new_sites:
-                self.append_site(this_new_site)
+            try:
+                positions = np.array(new_positions, dtype=float)
+            except (ValueError, TypeError):
+                raise ValueError(f'Expecting a list of floats. Found instead {new_positions}')
+
+            if positions.ndim != 2 or positions.shape[1] != 3:
+                raise ValueError(f'Expecting a list of lists of length 3. found instead {positions.shape[1:]}')
+
+            # the kinds of the sites are not changed, so we can replace the sites at once.
+            self.base.attributes.set(
+                'sites', [{
+                    'position': tuple(position),
+                    'kind_name': kind_name
+                } for position, kind_name in zip(positions.tolist(), sites.kind_names)]
+            )
+            self._invalidate_site_view()
 
     @property
     def pbc(self):
@@ -1860,6 +2541,7 @@ class StructureData(Data):
         raise NotImplementedError('Modification is not implemented yet')
 
     @property
+    @memoize_if_stored
     def is_alloy(self):
         """Return whether the structure contains any alloy kinds.
 
@@ -1868,6 +2550,7 @@ class StructureData(Data):
         return any(kind.is_alloy for kind in self.kinds)
 
     @property
+    @memoize_if_stored
     def has_vacancies(self):
         """Return whether the structure has vacancies in the structure.
 
@@ -1875,6 +2558,29 @@ class StructureData(Data):
         """
         return any(kind.has_vacancies for kind in self.kinds)
 
+    @memoize_if_stored
+    def get_neighbor_list(self, cutoff):
+        """
+        Return all the pairs of sites within `cutoff` of each other, taking into account the periodic boundary
+        conditions, in compressed sparse row format.
+
+        The search is based on cell lists, and scales linearly with the number of sites (see
+        :py:func:`aiida_atomistic.data.structure.neighbors.get_neighbor_list`). For stored structures,
+        the neighbor list is memoized for each cutoff.
+
+        :param cutoff: the maximum distance between neighbors, in angstrom.
+        :return: a :py:class:`~aiida_atomistic.data.structure.neighbors.NeighborList`, with the `offsets`,
+            `neighbors`, `images` and `distances` arrays.
+        """
+        from aiida_atomistic.data.structure.neighbors import get_neighbor_list
+
+        if self._has_legacy_sites():
+            return get_neighbor_list(self.sites.positions, self.cell, self.pbc, cutoff)
+
+        properties = self.properties
+        return get_neighbor_list(properties.positions.value, properties.cell.value, properties.pbc.value, cutoff)
+
+    @memoize_if_stored
     def get_cell_volume(self):
         """
         Returns the three-dimensional cell volume in Angstrom^3.
@@ -1883,7 +2589,9 @@ class StructureData(Data):
 
         :return: a float.
         """
-        return calc_cell_volume(self.cell)
+        if self._has_legacy_sites():
+            return calc_cell_volume(self.cell)
+        return calc_cell_volume(self.properties.cell.value)
 
     def get_cif(self, converter='ase', store=False, **kwargs):
         """
@@ -1930,16 +2638,62 @@ class StructureData(Data):
         :py:class:`StructureData <aiida.orm.nodes.data.structure.StructureData>`
         to ase.Atoms
 
+        The ase.Atoms is built in a single call from arrays, with the tags computed once per kind.
+        If the structure has (legacy) sites, they are used; otherwise it is built from the `properties`:
+        symbols, positions, mass, charge, and the tags are obtained from the kinds, if defined.
+
         :return: an ase.Atoms object
         """
         import ase
+        import numpy as np
 
-        asecell = ase.Atoms(cell=self.cell, pbc=self.pbc)
-        _kinds = self.kinds
+        if self._has_legacy_sites():
+            sites = self.sites
+            kinds = self.kinds
+            if len(sites) > 0 and sites.kind_indices.min() < 0:
+                missing = sites.kind_names[int(np.argmin(sites.kind_indices))]
+                raise ValueError(f"No kind '{missing}' has been found in the list of kinds")
+            if any(kinds[index].is_alloy or kinds[index].has_vacancies for index in np.unique(sites.kind_indices)):
+                raise ValueError('Cannot convert to ASE if the kind represents an alloy or it has vacancies.')
+
+            kind_tags = get_ase_tags([kind.name for kind in kinds],
+                                     [None if kind.is_alloy or kind.has_vacancies else kind.symbols[0] for kind in kinds])
+            kind_symbols = np.array([str(kind.symbols[0]) for kind in kinds] or [''], dtype=object)
+            kind_masses = np.array([kind.mass for kind in kinds] or [0.], dtype=float)
+
+            return ase.Atoms(
+                symbols=kind_symbols[sites.kind_indices].tolist(),
+                positions=sites.positions,
+                masses=kind_masses[sites.kind_indices],
+                tags=np.array(kind_tags or [0], dtype=int)[sites.kind_indices],
+                cell=self.cell,
+                pbc=self.pbc,
+            )
 
-        for site in self.sites:
-            asecell.append(site.get_ase(kinds=_kinds))
-        return asecell
+        properties = self.properties
+        stored_properties = properties.get_stored_properties()
+        symbols = properties.symbols.value
+
+        tags = None
+        if 'kinds' in stored_properties:
+            # kinds in order of appearance, each one with the symbol of its first site.
+            kind_names, first_sites, kind_indices = np.unique(
+                properties.kinds.value, return_index=True, return_inverse=True
+            )
+            order = np.argsort(first_sites)
+            kind_tags = np.zeros(len(kind_names), dtype=int)
+            kind_tags[order] = get_ase_tags(kind_names[order].tolist(), [symbols[i] for i in first_sites[order]])
+            tags = kind_tags[kind_indices.reshape(-1)]
+
+        return ase.Atoms(
+            symbols=symbols,
+            positions=properties.positions.value,
+            masses=properties.mass.value,
+            tags=tags,
+            charges=properties.charge.value if 'charge' in stored_properties else None,
+            cell=properties.cell.value,
+            pbc=properties.pbc.value,
+        )
 
     def _get_object_pymatgen(self, **kwargs):
         """
@@ -1953,11 +2707,97 @@ class StructureData(Data):
         .. note:: Requires the pymatgen module (version >= 3.0.13, usage
             of earlier versions may cause errors).
         """
-        if self.pbc == (True, True, True):
+        pbc = self.pbc if self._has_legacy_sites() else tuple(self.properties.pbc.value)
+        if pbc == (True, True, True):
             return self._get_object_pymatgen_structure(**kwargs)
 
         return self._get_object_pymatgen_molecule(**kwargs)
 
+    def _has_legacy_sites(self):
+        """
+        Return True if the structure is defined via the (legacy) sites and kinds, False if it is defined via the
+        `properties`.
+        """
+        return self.base.attributes.get('sites', None) is not None
+
+    def _get_pymatgen_species_and_sites(self, add_spin=False):
+        """
+        Return the arguments needed to build a pymatgen Structure or Molecule.
+
+        The species are computed once per kind and then broadcast to the sites through the kind-index array.
+        For structures defined via the `properties`, the species are the symbols, and the charge, mass and kinds
+        are passed as site properties (`charge`, `mass` and `kind_name`).
+
+        :param add_spin: True to add the spins to the species, see `_get_object_pymatgen_structure`.
+        :return: a tuple with the list of species, the (N, 3) array of positions and the site properties (or None).
+        :raise ValueError: if there are partial occupancies together with spins.
+        """
+        import numpy as np
+
+        if self._has_legacy_sites():
+            sites = self.sites
+            kinds = self.kinds
+            if len(sites) > 0 and sites.kind_indices.min() < 0:
+                raise ValueError(f"Kind name '{sites.kind_names[int(np.argmin(sites.kind_indices))]}' unknown")
+            site_kind_names, kind_indices, positions = sites.kind_names, sites.kind_indices, sites.positions
+            used_kinds = set(np.unique(kind_indices).tolist())
+            site_properties = None
+        else:
+            properties = self.properties
+            stored_properties = properties.get_stored_properties()
+            positions = np.array(properties.positions.value)
+            site_properties = {'mass': properties.mass.value}
+            if 'charge' in stored_properties:
+                site_properties['charge'] = properties.charge.value
+            if 'kinds' not in stored_properties:
+                return list(properties.symbols.value), positions, site_properties
+            site_kind_names = properties.kinds.value
+            site_properties['kind_name'] = site_kind_names
+
+            # kinds: one per kind name, each one with the symbol and mass of its first site.
+            unique_kinds, first_sites, kind_indices = np.unique(
+                site_kind_names, return_index=True, return_inverse=True
+            )
+            kind_indices = kind_indices.reshape(-1)
+            kinds = [
+                Kind(symbols=properties.symbols.value[i], mass=properties.mass.value[i], name=name)
+                for name, i in zip(unique_kinds.tolist(), first_sites.tolist())
+            ]
+            used_kinds = set(range(len(kinds)))
+
+        kind_names = [kind.name for kind in kinds]
+        if add_spin and any(name.endswith('1') or name.endswith('2') for name in kind_names):
+            # case when spins are defined -> no partial occupancy allowed
+            from pymatgen.core.periodic_table import Specie
+            oxidation_state = 0  # now I always set the oxidation_state to zero
+            species_table = []
+            for index, kind in enumerate(kinds):
+                if index in used_kinds and (
+                    len(kind.symbols) != 1 or (len(kind.weights) != 1 or sum(kind.weights) < 1.)
+                ):
+                    raise ValueError('Cannot set partial occupancies and spins at the same time')
+                species_table.append(
+                    Specie(
+                        kind.symbols[0],
+                        oxidation_state,
+                        spin=-1 if kind.name.endswith('1') else 1 if kind.name.endswith('2') else 0
+                    )
+                )
+        else:
+            # case when no spin are defined
+            species_table = [dict(zip(kind.symbols, kind.weights)) for kind in kinds]
+            if site_properties is None and any(
+                create_automatic_kind_name(kinds[index].symbols, kinds[index].weights) != kinds[index].name
+                for index in used_kinds
+            ):
+                # add "kind_name" as a properties to each site, whenever
+                # the kind_name cannot be automatically obtained from the symbols
+                site_properties = {'kind_name': list(site_kind_names)}
+
+        species = [species_table[index] for index in kind_indices.tolist()]
+
+        return species, positions, site_properties
+
     def _get_object_pymatgen_structure(self, **kwargs):
         """
         Converts
@@ -1984,45 +2824,20 @@ class StructureData(Data):
         """
         from pymatgen.core.structure import Structure
 
-        if self.pbc != (True, True, True):
-            raise ValueError('Periodic boundary conditions must apply in all three dimensions of real space')
-
-        species = []
-        additional_kwargs = {}
-
-        if (kwargs.pop('add_spin', False) and any(n.endswith('1') or n.endswith('2') for n in self.get_kind_names())):
-            # case when spins are defined -> no partial occupancy allowed
-            from pymatgen.core.periodic_table import Specie
-            oxidation_state = 0  # now I always set the oxidation_state to zero
-            for site in self.sites:
-                kind = self.get_kind(site.kind_name)
-                if len(kind.symbols) != 1 or (len(kind.weights) != 1 or sum(kind.weights) < 1.):
-                    raise ValueError('Cannot set partial occupancies and spins at the same time')
-                species.append(
-                    Specie(
-                        kind.symbols[0],
-                        oxidation_state,
-                        properties={'spin': -1 if kind.name.endswith('1') else 1 if kind.name.endswith('2') else 0}
-                    )
-                )
+        if self._has_legacy_sites():
+            cell, pbc = self.cell, self.pbc
         else:
-            # case when no spin are defined
-            for site in self.sites:
-                kind = self.get_kind(site.kind_name)
-                species.append(dict(zip(kind.symbols, kind.weights)))
-            if any(
-                create_automatic_kind_name(self.get_kind(name).symbols,
-                                           self.get_kind(name).weights) != name for name in self.get_site_kindnames()
-            ):
-                # add "kind_name" as a properties to each site, whenever
-                # the kind_name cannot be automatically obtained from the symbols
-                additional_kwargs['site_properties'] = {'kind_name': self.get_site_kindnames()}
+            cell, pbc = self.properties.cell.value, tuple(self.properties.pbc.value)
+
+        if pbc != (True, True, True):
+            raise ValueError('Periodic boundary conditions must apply in all three dimensions of real space')
 
+        add_spin = kwargs.pop('add_spin', False)
         if kwargs:
             raise ValueError(f'Unrecognized parameters passed to pymatgen converter: {kwargs.keys()}')
 
-        positions = [list(x.position) for x in self.sites]
-        return Structure(self.cell, species, positions, coords_are_cartesian=True, **additional_kwargs)
+        species, positions, site_properties = self._get_pymatgen_species_and_sites(add_spin=add_spin)
+        return Structure(cell, species, positions, coords_are_cartesian=True, site_properties=site_properties)
 
     def _get_object_pymatgen_molecule(self, **kwargs):
         """
@@ -2042,13 +2857,11 @@ class StructureData(Data):
         if kwargs:
             raise ValueError(f'Unrecognized parameters passed to pymatgen converter: {kwargs.keys()}')
 
-        species = []
-        for site in self.sites:
-            kind = self.get_kind(site.kind_name)
-            species.append(dict(zip(kind.symbols, kind.weights)))
-
-        positions = [list(site.position) for site in self.sites]
-        return Molecule(species, positions)
+        species, positions, site_properties = self._get_pymatgen_species_and_sites()
+        if self._has_legacy_sites():
+            # as before, the kind names are not passed to the Molecule.
+            site_properties = None
+        return Molecule(species, positions, site_properties=site_properties)
 
 
 class Kind:
@@ -2443,6 +3256,7 @@ class Site:
 
     It can be a single atom, or an alloy, or even contain vacancies.
     """
+    __slots__ = ('_kind_name', '_position')
 
     def __init__(self, **kwargs):
         """
@@ -2508,49 +3322,10 @@ class Site:
         .. note:: If any site is an alloy or has vacancies, a ValueError
             is raised (from the site.get_ase() routine).
         """
-        # pylint: disable=too-many-branches
-        from collections import defaultdict
-
         import ase
 
-        # I create the list of tags
-        tag_list = []
-        used_tags = defaultdict(list)
-        for k in kinds:
-            # Skip alloys and vacancies
-            if k.is_alloy or k.has_vacancies:
-                tag_list.append(None)
-            # If the kind name is equal to the specie name,
-            # then no tag should be set
-            elif str(k.name) == str(k.symbols[0]):
-                tag_list.append(None)
-            else:
-                # Name is not the specie name
-                if k.name.startswith(k.symbols[0]):
-                    try:
-                        new_tag = int(k.name[len(k.symbols[0])])
-                        tag_list.append(new_tag)
-                        used_tags[k.symbols[0]].append(new_tag)
-                        continue
-                    except ValueError:
-                        pass
-                tag_list.append(k.symbols[0])  # I use a string as a placeholder
-
-        for i, _ in enumerate(tag_list):
-            # If it is a string, it is the name of the element,
-            # and I have to generate a new integer for this element
-            # and replace tag_list[i] with this new integer
-            if isinstance(tag_list[i], str):
-                # I get a list of used tags for this element
-                existing_tags = used_tags[tag_list[i]]
-                if existing_tags:
-                    new_tag = max(existing_tags) + 1
-                else:  # empty list
-                    new_tag = 1
-                # I store it also as a used tag!
-                used_tags[tag_list[i]].append(new_tag)
-                # I update the tag
-                tag_list[i] = new_tag
+        tag_list = get_ase_tags([k.name for k in kinds],
+                                [None if k.is_alloy or k.has_vacancies else k.symbols[0] for k in kinds])
 
         found = False
         for kind_candidate, tag_candidate in zip(kinds, tag_list):
@@ -2565,7 +3340,7 @@ class Site:
         if kind.is_alloy or kind.has_vacancies:
             raise ValueError('Cannot convert to ASE if the kind represents an alloy or it has vacancies.')
         aseatom = ase.Atom(position=self.position, symbol=str(kind.symbols[0]), mass=kind.mass)
-        if tag is not None:
+        if tag:
             aseatom.tag = tag  # pylint: disable=assigning-non-slot
         return aseatom
 
@@ -2592,7 +3367,8 @@ class Site:
         Return the position of this site in absolute coordinates,
         in angstrom.
         """
-        return copy.deepcopy(self._position)
+        # tuple of floats: immutable, no need to copy it.
+        return self._position
 
     @position.setter
     def position(self, value):
@@ -2616,6 +3392,93 @@ class Site:
         return f"kind name '{self.kind_name}' @ {self.position[0]},{self.position[1]},{self.position[2]}"
 
 
+class SiteView:
+    """
+    Read-only sequence of the sites of a StructureData, backed by contiguous arrays:
+
+    * `positions`: (N, 3) read-only array of the positions, in angstrom;
+    * `kind_names`: list of the kind names of the sites;
+    * `kind_indices`: array with the index of the kind of each site, in the list of kinds of the structure
+      (-1 if the kind is not defined).
+
+    Indexing and iteration return lightweight :py:class:`SiteViewRow` objects, which behave as read-only Site objects
+    reading from the arrays: use `Site(site=row)` to get a modifiable copy.
+    """
+    __slots__ = ('positions', 'kind_names', 'kind_indices')
+
+    def __init__(self, raw_sites, raw_kinds):
+        """
+        :param raw_sites: the list of the raw sites, as stored in the attributes.
+        :param raw_kinds: the list of the raw kinds, as stored in the attributes.
+        """
+        import numpy as np
+
+        try:
+            self.kind_names = [str(raw_site['kind_name']) for raw_site in raw_sites]
+            positions = np.array([raw_site['position'] for raw_site in raw_sites], dtype=float).reshape(-1, 3)
+        except KeyError as exc:
+            raise ValueError(f'Invalid raw object, it does not contain any key {exc.args[0]}')
+        except (TypeError, ValueError):
+            raise ValueError('Wrong format for position, must be a list of three float numbers.')
+        positions.flags.writeable = False
+        self.positions = positions
+
+        kind_indices = {raw_kind['name']: index for index, raw_kind in enumerate(raw_kinds)}
+        self.kind_indices = np.array([kind_indices.get(name, -1) for name in self.kind_names], dtype=int)
+
+    def __len__(self):
+        return len(self.kind_names)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [SiteViewRow(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('site index out of range')
+        return SiteViewRow(self, index)
+
+    def __iter__(self):
+        return (SiteViewRow(self, index) for index in range(len(self)))
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__}: {len(self)} sites>'
+
+
+class SiteViewRow(Site):
+    """
+    A site of a :py:class:`SiteView`: a read-only Site reading its kind name and position from the arrays of the view.
+    """
+    __slots__ = ('_view', '_index')
+
+    def __init__(self, view, index):  # pylint: disable=super-init-not-called
+        self._view = view
+        self._index = index
+
+    @property
+    def kind_name(self):
+        """
+        Return the kind name of this site (a string).
+        """
+        return self._view.kind_names[self._index]
+
+    @kind_name.setter
+    def kind_name(self, value):
+        raise AttributeError('The sites of a SiteView are read-only: use `Site(site=...)` to get a modifiable copy.')
+
+    @property
+    def position(self):
+        """
+        Return the position of this site in absolute coordinates,
+        in angstrom.
+        """
+        return tuple(self._view.positions[self._index].tolist())
+
+    @position.setter
+    def position(self, value):
+        raise AttributeError('The sites of a SiteView are read-only: use `Site(site=...)` to get a modifiable copy.')
+
+
 def _get_dimensionality(pbc, cell):
     """
     Return the dimensionality of the structure and its length/surface/volume.
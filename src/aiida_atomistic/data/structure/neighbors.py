@@ -0,0 +1,197 @@
+"""
+Periodic neighbor search for atomic structures, based on cell lists.
+
+The positions are binned in slabs delimited by the lattice planes of the cell, each one at least `cutoff` wide,
+so that the neighbors of an atom can only lie in the adjacent bins (or in periodic images of them, when the
+cell is thinner than the cutoff). Only the occupied bins are stored, so the search takes linear memory and
+time in the number of atoms and of pairs (up to the sort of the bin indices), for any cutoff.
+"""
+import collections
+import itertools
+
+import numpy as np
+
+__all__ = ('NeighborList', 'get_neighbor_list', 'get_minimum_image_translations')
+
+# Maximum number of bins along each direction, so that the linear index of a bin fits in an int64.
+_MAX_BINS = 2**20
+
+NeighborList = collections.namedtuple('NeighborList', ['offsets', 'neighbors', 'images', 'distances'])
+NeighborList.__doc__ = """
+Neighbor list in compressed sparse row (CSR) format: the neighbors of atom `i` are the entries
+`offsets[i]:offsets[i+1]` of the other arrays.
+
+* `offsets`: (N+1,) int array;
+* `neighbors`: (M,) int array with the index `j` of each neighbor;
+* `images`: (M, 3) int array with the lattice translation `T` of each neighbor, i.e. the neighbor is at
+  `positions[j] + T @ cell` (always 0 along the non-periodic directions);
+* `distances`: (M,) float array with the distance of each neighbor, in the units of the positions.
+
+The neighbors of each atom are sorted by `j`; the atom itself is only included for its periodic images.
+"""
+
+
+def _get_binning_cell(cell, pbc):
+    """
+    Return the cell used for the binning: the vectors along the periodic directions are the ones of the cell,
+    the others are replaced by orthonormal vectors completing the basis, so that the cell is never singular
+    (e.g. for molecules, defined with a null cell).
+
+    :raise ValueError: if the periodic cell vectors are not linearly independent.
+    """
+    periodic = [cell[d] for d in range(3) if pbc[d]]
+    if len(periodic) == 3:
+        basis = []
+    elif len(periodic) == 2:
+        normal = np.cross(periodic[0], periodic[1])
+        basis = [normal / np.linalg.norm(normal)] if np.linalg.norm(normal) > 0 else []
+    elif len(periodic) == 1:
+        # The last rows of V^T of the SVD span the orthogonal complement of the periodic vector.
+        basis = list(np.linalg.svd(np.array(periodic))[2][1:])
+    else:
+        basis = list(np.eye(3))
+
+    binning_cell = np.array(cell, dtype=float)
+    for d in [d for d in range(3) if not pbc[d]]:
+        binning_cell[d] = basis.pop(0) if basis else 0.
+
+    if abs(np.linalg.det(binning_cell)) < 1e-12:
+        raise ValueError('The cell vectors along the periodic directions must be linearly independent.')
+
+    return binning_cell
+
+
+def get_neighbor_list(positions, cell, pbc, cutoff):
+    """
+    Return all the pairs of atoms within `cutoff` of each other, taking into account the periodic images.
+
+    :param positions: (N, 3) array of the cartesian positions.
+    :param cell: 3x3 array of the cell vectors (as rows); the vectors along the non-periodic directions are
+        not used, and can be null.
+    :param pbc: the periodic boundary conditions along each cell vector, as three booleans.
+    :param cutoff: the maximum distance (included) between neighbors, in the units of the positions.
+    :return: a :py:class:`NeighborList`.
+    :raise ValueError: if the cutoff is not positive, or the cell is singular along the periodic directions.
+    """
+    # pylint: disable=too-many-locals
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    cell = np.asarray(cell, dtype=float).reshape(3, 3)
+    pbc = np.array(pbc, dtype=bool).reshape(3)
+    n_atoms = len(positions)
+
+    if not cutoff > 0:
+        raise ValueError(f'The cutoff must be positive, got {cutoff}.')
+
+    if n_atoms == 0:
+        return NeighborList(np.zeros(1, dtype=int), np.zeros(0, dtype=int), np.zeros((0, 3), dtype=int), np.zeros(0))
+
+    binning_cell = _get_binning_cell(cell, pbc)
+    inverse_cell = np.linalg.inv(binning_cell)
+    # distance between the lattice planes along each direction.
+    plane_spacings = 1. / np.linalg.norm(inverse_cell, axis=0)
+
+    # fractional coordinates, wrapped in the cell along the periodic directions: positions = wrapped + shifts @ cell.
+    fractional = positions @ inverse_cell
+    shifts = np.where(pbc, np.floor(fractional), 0.).astype(int)
+    fractional -= shifts
+    # along the non-periodic directions, the coordinates are rescaled to the [0, 1] range of the positions.
+    lower = np.where(pbc, 0., fractional.min(axis=0))
+    spans = np.where(pbc, 1., fractional.max(axis=0) - lower)
+    widths = spans * plane_spacings
+
+    n_bins = np.clip(np.floor(widths / cutoff), 1, _MAX_BINS).astype(int)
+    # number of adjacent bins to be searched along each direction: more than one only if the cell is thinner
+    # than the cutoff along a periodic direction (hence with a single bin).
+    reach = np.where(pbc, np.ceil(cutoff * n_bins / np.where(pbc, widths, 1.)), 1).astype(int)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scaled = np.where(spans > 0, (fractional - lower) / spans, 0.)
+    bins = np.clip(np.floor(scaled * n_bins).astype(int), 0, n_bins - 1)
+
+    # sparse cell list: the atoms sorted by bin, and the start and count of each occupied bin.
+    strides = np.array([n_bins[1] * n_bins[2], n_bins[2], 1])
+    bin_ids = bins @ strides
+    order = np.argsort(bin_ids, kind='stable')
+    occupied, starts, counts = np.unique(bin_ids[order], return_index=True, return_counts=True)
+
+    wrapped = fractional @ binning_cell
+    # the atoms are visited in the order of their bins, so that the look-ups of the target bins are (almost) sorted.
+    sorted_bins = bins[order]
+    pair_i, pair_j, pair_images = [], [], []
+    for offset in itertools.product(*[range(-r, r + 1) for r in reach]):
+        target = sorted_bins + offset
+        images = np.floor_divide(target, n_bins)
+        target -= images * n_bins
+        valid = np.all(pbc | (images == 0), axis=1)
+
+        # look up the target bins among the occupied ones.
+        target_ids = target @ strides
+        found = np.minimum(np.searchsorted(occupied, target_ids), len(occupied) - 1)
+        valid &= occupied[found] == target_ids
+
+        atoms = np.flatnonzero(valid)
+        found = found[atoms]
+        n_candidates = counts[found]
+        candidate_i = order[np.repeat(atoms, n_candidates)]
+        # index of each candidate within its bin, to get `j` from the sorted atoms.
+        within_bin = np.arange(n_candidates.sum()) - np.repeat(np.cumsum(n_candidates) - n_candidates, n_candidates)
+        candidate_j = order[np.repeat(starts[found], n_candidates) + within_bin]
+        candidate_images = np.repeat(images[atoms], n_candidates, axis=0)
+
+        vectors = wrapped[candidate_j] + candidate_images @ cell - wrapped[candidate_i]
+        within = np.einsum('ij,ij->i', vectors, vectors) <= cutoff**2
+        within &= (candidate_i != candidate_j) | np.any(candidate_images != 0, axis=1)
+
+        pair_i.append(candidate_i[within])
+        pair_j.append(candidate_j[within])
+        pair_images.append(candidate_images[within])
+
+    pair_i = np.concatenate(pair_i)
+    pair_j = np.concatenate(pair_j)
+    # lattice translations with respect to the original (not wrapped) positions.
+    pair_images = np.concatenate(pair_images) + shifts[pair_i] - shifts[pair_j]
+
+    sorting = np.lexsort((pair_j, pair_i))
+    pair_i, pair_j, pair_images = pair_i[sorting], pair_j[sorting], pair_images[sorting]
+    distances = np.linalg.norm(positions[pair_j] + pair_images @ cell - positions[pair_i], axis=1)
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(pair_i, minlength=n_atoms))])
+
+    return NeighborList(offsets, pair_j, pair_images, distances)
+
+
+def get_minimum_image_translations(positions, cell, pbc, first, second):
+    """
+    Return the lattice translations of the closest periodic images of the atoms `second` to the atoms `first`.
+
+    The translations are obtained by rounding the fractional coordinates of the pair vectors, then refined among
+    the images which can be closer (more than the adjacent ones only for skewed cells), for all the pairs at once.
+
+    :param positions: (N, 3) array of the cartesian positions.
+    :param cell: 3x3 array of the cell vectors (as rows).
+    :param pbc: the periodic boundary conditions along each cell vector, as three booleans.
+    :param first: (K,) int array with the index of the first atom of each pair.
+    :param second: (K,) int array with the index of the second atom of each pair.
+    :return: (K, 3) int array with the lattice translation `T` of each pair, such that `positions[second] + T @ cell`
+        is the image of the second atom closest to the first one (always 0 along the non-periodic directions).
+    :raise ValueError: if the cell is singular along the periodic directions.
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    cell = np.asarray(cell, dtype=float).reshape(3, 3)
+    pbc = np.array(pbc, dtype=bool).reshape(3)
+
+    vectors = positions[np.asarray(second, dtype=int)] - positions[np.asarray(first, dtype=int)]
+    inverse_cell = np.linalg.inv(_get_binning_cell(cell, pbc))
+    translations = np.where(pbc, -np.rint(vectors @ inverse_cell), 0.).astype(int)
+    if len(vectors) == 0:
+        return translations
+
+    # an image closer than the rounded one, `r`, differs from it by at most 2|r| / (plane spacing) cell vectors.
+    rounded = vectors + translations @ cell
+    reach = np.floor(2 * np.sqrt(np.einsum('ij,ij->i', rounded, rounded).max()) * np.linalg.norm(inverse_cell, axis=0))
+    reach = np.where(pbc, reach, 0).astype(int)
+    offsets = np.array(list(itertools.product(*[range(-r, r + 1) for r in reach])), dtype=int)
+    # (n_offsets, K) squared distances of the candidate images.
+    candidates = rounded[None, :, :] + (offsets @ cell)[:, None, :]
+    closest = np.argmin(np.einsum('okj,okj->ok', candidates, candidates), axis=0)
+
+    return translations + offsets[closest]
@@ -1,17 +1,21 @@
 from typing import Dict, Any
 import copy
+import typing
 
 from aiida_atomistic.data.structure.properties.property_utils import *
 
 from aiida_atomistic.data.structure.properties.globals.cell import Cell
 from aiida_atomistic.data.structure.properties.globals.pbc import Pbc
 
+from aiida_atomistic.data.structure.properties.intra_site import IntraSiteProperty
 from aiida_atomistic.data.structure.properties.intra_site.positions import Positions
 from aiida_atomistic.data.structure.properties.intra_site.kinds import Kinds
 from aiida_atomistic.data.structure.properties.intra_site.symbols import Symbols
 from aiida_atomistic.data.structure.properties.intra_site.mass import Mass
 from aiida_atomistic.data.structure.properties.intra_site.charge import Charge
 
+from aiida_atomistic.data.structure.properties.hubbard import Hubbard
+
 from aiida_atomistic.data.structure.properties.custom import CustomProperty
 
 class PropertyCollector(HasPropertyMixin):
@@ -39,9 +43,17 @@ class PropertyCollector(HasPropertyMixin):
     The properties are stored exactly as they are provided in the construction of the class instance: in 
     this way, we do not have ambiguities when the properties are used or loaded from the database/repository.
     To facilitate this, we may provided some `translation methods` from and to the format allowed in the property.
+    The only exception are the `normalized_fields` of a property class, which are stored in their validated format 
+    (e.g. the Hubbard parameters, which can be provided as a list of tuples, are always stored by columns).
+    
+    #### Validation engine:
+    The properties are validated in a single pass (see the `_validate_properties` method):
+    (1) the defaults of the derived properties are resolved in one explicit stage (`get_default` of the property class);
+    (2) the number of sites of all the intra-site properties is checked against the positions;
+    (3) each property is validated via pydantic, in the topological order defined by `property_dependencies`.
+    The property validators only check the property itself, they do not access the other properties.
     
     The supported properties are listed below. 
-    The order does matter here, It is needed for the consistency check among properties.
     """
     
     # Global
@@ -55,6 +67,9 @@ class PropertyCollector(HasPropertyMixin):
     charge: Charge = Property()
     
     kinds: Kinds = Property() # optional; if not there but required, use the get_kinds to generate automatically.
+    
+    # Inter-site
+    hubbard: Hubbard = Property()
 
     # Custom
     custom: CustomProperty = Property()
@@ -67,45 +82,327 @@ class PropertyCollector(HasPropertyMixin):
     # StructureData but can also be initialised with defaults if not explicitely provided
     derived_properties = ['pbc','mass'] # for now we exclude kinds.
     
+    # Dependencies among properties (key: property, value: the properties used in its validation or default): 
+    # the properties are validated in topological order, and if a property is changed, its dependents have to be 
+    # validated again (see the `_replace` method).
+    property_dependencies = {
+        'positions': ['cell','pbc'], # only for the optional check of the overlapping sites (see `Positions`).
+        'symbols': ['positions'],
+        'mass': ['positions','symbols'],
+        'charge': ['positions'],
+        'kinds': ['symbols'],
+        'hubbard': ['positions'],
+    }
+    
+    # Intra-site properties of structures with at least this number of sites are stored, when the node is stored, 
+    # in the node repository as numpy arrays (`<property>.npy`). Only a small descriptor (key `array`) is then kept
+    # in the `_property_attributes`, and the array is decoded only when the property is accessed for the first time.
+    # Set to None to always store the properties as attributes.
+    array_storage_threshold = 1000
+    
+    _property_types = None # supported properties (name: class), in declaration order. See `_get_property_types`.
+    _validation_order = None # topological order of the supported properties. See `_get_validation_order`.
+    
     def __init__(
         self, 
         parent, 
-        properties: Dict[str, Dict[str, Any]] = {}):
+        properties: Dict[str, Dict[str, Any]] = {},
+        validate: bool = True):
+        """
+        Args:
+            parent: the StructureData node.
+            properties: the dictionary of the properties.
+            validate: if False, the properties are trusted and the pydantic validation is skipped (models are built 
+                      via `construct`). To be used only for the properties of stored nodes, which were already validated 
+                      when the node was stored, and are immutable.
+        """
         
         if not isinstance(properties, dict):
             raise ValueError(f"The `properties` input is not of the right type. Expected '{type(dict())}', received '{type(properties)}'.")
         
+        self._parent = parent # Parent StructureData object
+        self._validate = validate
+        
+        if not validate:
+            # Loaded from the database: the derived properties are already there, and the attributes are a copy.
+            super().__init__()
+            self._property_attributes = properties
+            self._array_attributes = {}
+            return
+        
         # Checking minimal inputs
         if False in [required in properties.keys() for required in self.required_properties]:
             raise KeyError(f"You need to provide at least the following properties: {self.required_properties}")
         
         provided_properties = copy.deepcopy(properties)
         
-        # Checking if derived inputs are provided; we set to None, and then in the `_inspect_properties` method
-        # we call it, meaning that we are actually setting to its default value, needed.
-        # each default value is set in the validator method of the property. Instead, in its pydantic field `value`, the default will be none.
-        for derived in self.derived_properties:
-            if not derived in properties.keys():
-                provided_properties[derived] = {"value": None}
-            
-        self._parent = parent # Parent StructureData object
-        
         # properties: Dictionary containing the properties. The key is the name of the property and the value                                                           
         # is an instance of the corresponding Property subclass value.
         super().__init__()
         
         # inspect and then store the properties in the `_property_attributes` attribute.
         self._property_attributes = provided_properties
+        self._array_attributes = {} # decoded array-backed properties, see the `get_property_attribute` method.
         
         # Store the properties in the StructureData node.
         if not self._parent.is_stored:
             self._parent.base.attributes.set('_property_attributes',self._property_attributes)
             
         self._inspect_properties(self._property_attributes)
+        self._resolve_defaults(self._property_attributes)
+        self._validate_properties()
     
     def get_property_attribute(self, key):
         # In AiiDA this could be self.base.attrs['properties'][key] or similar
-        return self._property_attributes[key]    
+        property_attribute = self._property_attributes[key]
+        
+        if "array" in property_attribute:
+            # array-backed property: we decode it from the repository only once.
+            try:
+                property_attribute = self._array_attributes[key]
+            except KeyError:
+                property_attribute = self._load_array_attribute(key)
+                self._array_attributes[key] = property_attribute
+            
+        return property_attribute
+    
+    def get_property_attributes(self):
+        """Return the dictionary of the property attributes, with the array-backed properties decoded."""
+        return {pname: self.get_property_attribute(pname) for pname in self._property_attributes.keys()}
+    
+    def _template_property(self, type_hint, attr):
+        """
+        Trusted properties are not validated again:
+        - if the collector was built with `validate=False`, i.e. for stored nodes loaded from the database;
+        - array-backed properties, which are written only when the node is stored, i.e. after their validation 
+          (validating them again would require the other properties to be decoded).
+        """
+        if attr not in self._property_models and (not self._validate or "array" in self._property_attributes[attr]):
+            self._property_models[attr] = type_hint.construct(
+                parent=self._parent,
+                **self.get_property_attribute(attr)
+            )
+            
+        return super()._template_property(type_hint=type_hint, attr=attr)
+    
+    def _load_array_attribute(self, key):
+        """Load the array-backed property `key` from the repository of the parent node.
+        
+        Returns:
+            property_attribute: the property attribute, with the `array` descriptor replaced by the `value` (as a list).
+        """
+        import numpy as np
+        
+        property_attribute = copy.deepcopy(self._property_attributes[key])
+        property_attribute.pop("shape", None)
+        
+        with self._parent.base.repository.open(property_attribute.pop("array"), mode='rb') as handle:
+            property_attribute["value"] = np.load(handle, allow_pickle=False).tolist()
+        
+        return property_attribute
+    
+    def _store_arrays(self):
+        """
+        Move the intra-site properties in the repository of the parent node (as `<property>.npy` files), if the 
+        number of sites is at least `array_storage_threshold`. 
+        
+        To be called only when storing the parent node, once validated (see `StructureData._validate`): the already 
+        validated property models are preserved.
+        """
+        import numpy as np
+        import tempfile
+        
+        if self.array_storage_threshold is None:
+            return
+        
+        if len(self.get_property_attribute('positions')['value']) < self.array_storage_threshold:
+            return
+        
+        property_types = self._get_property_types()
+        stored_attributes = {}
+        for pname, pvalue in self._property_attributes.items():
+            # custom properties have no domain: they are always stored as attributes.
+            if "array" in pvalue or not issubclass(property_types[pname], IntraSiteProperty):
+                stored_attributes[pname] = pvalue
+                continue
+            
+            array = np.array(pvalue["value"])
+            with tempfile.NamedTemporaryFile() as handle:
+                np.save(handle, array, allow_pickle=False)
+                handle.flush()
+                handle.seek(0)
+                self._parent.base.repository.put_object_from_filelike(handle, f'{pname}.npy')
+            
+            stored_attributes[pname] = {key: value for key, value in pvalue.items() if key != "value"}
+            stored_attributes[pname].update({"array": f'{pname}.npy', "shape": list(array.shape)})
+            # no need to decode it again.
+            self._array_attributes[pname] = pvalue
+        
+        self._property_attributes = stored_attributes
+        self._parent.base.attributes.set('_property_attributes', self._property_attributes)
+    
+    def _unstore_arrays(self):
+        """
+        Revert the `_store_arrays` method, if the storing of the parent node failed: the array-backed properties are 
+        moved back to the attributes, and their files are deleted from the repository of the parent node.
+        """
+        for pname, pvalue in self._property_attributes.items():
+            if "array" in pvalue:
+                self._parent.base.repository.delete_object(pvalue["array"])
+                self._property_attributes[pname] = self._array_attributes.pop(pname)
+        
+        self._parent.base.attributes.set('_property_attributes', self._property_attributes)
+    
+    def _get_dependents(self, pnames):
+        """Return the set of the properties which depend, also indirectly, on the properties `pnames` (included)."""
+        dependents = set(pnames)
+        while True:
+            new_dependents = {
+                pname for pname, dependencies in self.property_dependencies.items() 
+                if dependents.intersection(dependencies)
+                } - dependents
+            if not new_dependents:
+                return dependents
+            dependents.update(new_dependents)
+    
+    def _replace(self, parent, changes: Dict[str, Dict[str, Any]], trusted: bool = False):
+        """
+        Return a new PropertyCollector for the (unstored) `parent` node, with the properties of this collector updated 
+        with `changes`. 
+        
+        The unchanged properties are not copied: their payloads are shared with this collector (copy-on-write, as 
+        properties are immutable) and their models are built without validation. Only the changed properties and 
+        their dependents (see `property_dependencies`) are validated again.
+        
+        Args:
+            parent: the new StructureData node.
+            changes: dictionary of the changed properties. A None value removes the property (derived properties 
+                     are then set again to their default).
+            trusted: if True, the changes are new objects, valid by construction (e.g. tiled from the validated 
+                     properties by `StructureData.make_supercell`): they are neither copied nor validated.
+        """
+        property_attributes = self.get_property_attributes() # shallow: the payloads are shared.
+        
+        for pname, pvalue in changes.items():
+            if pname not in self.get_supported_properties():
+                raise NotImplementedError(f"Property '{pname}' is not yet supported.\nSupported properties are: {self.get_supported_properties()}")
+            elif pvalue is not None:
+                property_attributes[pname] = pvalue if trusted else copy.deepcopy(pvalue)
+            elif pname in self.required_properties:
+                raise KeyError(f"You cannot remove the property '{pname}', as it is required: {self.required_properties}")
+            elif pname in self.derived_properties:
+                property_attributes[pname] = {"value": None}
+            else:
+                property_attributes.pop(pname, None)
+        
+        new_collector = PropertyCollector(parent=parent, properties=property_attributes, validate=False)
+        parent.base.attributes.set('_property_attributes', property_attributes)
+        
+        to_validate = set() if trusted else self._get_dependents(changes.keys())
+        property_types = self._get_property_types()
+        for pname in property_attributes.keys():
+            if pname not in to_validate:
+                new_collector._property_models[pname] = property_types[pname].construct(parent=parent, **property_attributes[pname])
+        
+        # from now on, the properties are validated as for any other unstored node.
+        new_collector._validate = True
+        new_collector._resolve_defaults(property_attributes)
+        new_collector._validate_properties()
+        
+        return new_collector
+    
+    @classmethod
+    def _get_property_types(cls):
+        """Return the dictionary of the supported properties (key: name, value: property class), in declaration order."""
+        if cls._property_types is None:
+            cls._property_types = {
+                pname: type_hint for pname, type_hint in typing.get_type_hints(cls).items() 
+                if pname in cls._valid_properties and isinstance(type_hint, type) and issubclass(type_hint, BaseProperty)
+                }
+        return cls._property_types
+    
+    @classmethod
+    def _get_validation_order(cls):
+        """
+        Return the supported properties in topological order with respect to `property_dependencies`, i.e. each property
+        comes after the ones it depends on. The order is deterministic: ties are resolved with the declaration order.
+        """
+        if cls._validation_order is None:
+            pending = list(cls._get_property_types().keys())
+            order = []
+            while pending:
+                ready = [
+                    pname for pname in pending 
+                    if all(dependency in order for dependency in cls.property_dependencies.get(pname, []))
+                    ]
+                if not ready:
+                    raise ValueError(f"Cyclic dependencies among the properties: {pending}")
+                order.append(ready[0])
+                pending.remove(ready[0])
+            cls._validation_order = order
+        return cls._validation_order
+    
+    def _resolve_defaults(self, properties):
+        """
+        Defaults stage: set (in place) the default value of the derived properties which are not provided, or are None. 
+        Done in topological order, as a default can depend on other properties (e.g. the mass on the symbols).
+        """
+        property_types = self._get_property_types()
+        for pname in self._get_validation_order():
+            if pname in self.derived_properties and properties.get(pname, {}).get("value") is None:
+                properties.setdefault(pname, {})["value"] = property_types[pname].get_default(properties)
+    
+    def _validate_properties(self):
+        """
+        Validation engine: single validation pass, at the construction of the collector and when the parent node is 
+        stored (see `StructureData._validate`). The defaults should be already resolved (see `_resolve_defaults`).
+        
+        The number of sites is checked once for all the intra-site properties, then each property is validated in the 
+        topological order of the dependencies, and checked against the validated models of the properties it depends 
+        on (see `BaseProperty.check_dependencies`). The properties already validated are not validated again, as their 
+        models are memoized. Trusted collectors (`validate=False`) are never validated, as they come from stored nodes.
+        """
+        if not self._validate:
+            return
+        
+        property_types = self._get_property_types()
+        to_validate = [pname for pname in self._get_validation_order() 
+                       if pname in self._property_attributes and pname not in self._property_models]
+        n_sites = len(self.positions.value)
+        
+        for pname in to_validate:
+            if pname in self._property_models: # e.g. the positions, validated above.
+                self._check_dependencies(pname)
+                continue
+            
+            property_attribute = self.get_property_attribute(pname)
+            if issubclass(property_types[pname], IntraSiteProperty):
+                value = property_attribute.get("value")
+                if not hasattr(value, "__len__") or len(value) != n_sites:
+                    raise ValueError(f"The number of provided values for the '{pname}' property should match the number of positions.")
+            
+            self._property_models[pname] = property_types[pname](
+                parent=self._parent,
+                **property_attribute
+            )
+            
+            # fields stored in their validated format, so that the models of stored nodes (built without validation)
+            # can rely on it, e.g. the Hubbard parameters, provided as a list of tuples but stored by columns.
+            normalized_fields = getattr(property_types[pname], "normalized_fields", ())
+            if normalized_fields:
+                self._property_attributes[pname] = {
+                    **property_attribute, 
+                    **{field: getattr(self._property_models[pname], field) for field in normalized_fields},
+                    }
+            
+            self._check_dependencies(pname)
+    
+    def _check_dependencies(self, pname):
+        """Check the (validated) property `pname` against the validated models of the properties it depends on."""
+        self._property_models[pname].check_dependencies({
+            dependency: self._property_models[dependency] 
+            for dependency in self.property_dependencies.get(pname, []) if dependency in self._property_models
+            })
     
     def _inspect_properties(self,properties):
         """
@@ -113,8 +410,7 @@ class PropertyCollector(HasPropertyMixin):
         Here there should be also the detection of custom properties, which 
         have a defined prefix.
         
-        NB: At the end of the method, we try to call such properties, in this way we trigger the validation and 
-        the completion of the properties dictionary, which will be stored in the database. 
+        NB: the validation of the properties is done afterwards, in the `_validate_properties` method.
         """
         
         for pname,pvalue in properties.items():
@@ -129,13 +425,4 @@ class PropertyCollector(HasPropertyMixin):
             elif len(pvalue)==0:
                 raise ValueError(f"Property '{pname}' is empty.")
             elif not isinstance(pvalue, dict): # maybe to be changed
-                raise ValueError(f"The '{pname}' value is not of the right type. Expected '{type(dict())}', received '{type(pvalue)}'.") 
-            else:
-                """
-                Using the pydantic validation:
-                the following `getattr` call is done as we want to initialise the properties, in such a way to have `pydantic` validation.
-                This is needed because the get method will invoke the `_template_property` method as defined in the 
-                `HasPropertyMixin` class.
-                The fact is that the `PropertyMixinMetaclass` only define the fget and fset methods, without using them.
-                """
-                getattr(self,pname)
\ No newline at end of file
+                raise ValueError(f"The '{pname}' value is not of the right type. Expected '{type(dict())}', received '{type(pvalue)}'.") 
\ No newline at end of file
@@ -1,5 +1,5 @@
 from typing import List
-from pydantic import Field, validator
+from pydantic import Field
 
 from aiida_atomistic.data.structure.properties.property_utils import BaseProperty
 
@@ -13,16 +13,10 @@ class Pbc(BaseProperty):
     domain = "global"
     value: List[bool] = Field(default=None, min_items=3,max_items=3)
     
-    @validator("value", always=True)
-    def validate_pbc(cls,value,values):
-        # Here we set the default.
-        properties = values["parent"].base.attributes.get("_property_attributes")
-        if not value:
-            properties = values["parent"].base.attributes.get("_property_attributes")
-            properties["pbc"]["value"] = [True,True,True]
-            return properties["pbc"]["value"]
-                
-        return value
+    @classmethod
+    def get_default(cls, properties):
+        """The default pbc is 3D. Called by the PropertyCollector, if the pbc is not provided."""
+        return cls.from_string("3D")
     
     @classmethod
     def from_string(cls, dimensionality: str = "3D"):
@@ -0,0 +1,657 @@
+from typing import ClassVar, List, Literal, Tuple
+from pydantic import BaseModel, Field, PrivateAttr, conint, constr, validator
+
+from aiida_atomistic.data.structure.properties.property_utils import BaseProperty
+
+__all__ = ('HubbardParameters', 'Hubbard')
+
+HUBBARD_TYPES = ('Ueff', 'U', 'V', 'J', 'B', 'E2', 'E3')
+
+# Fields of the Hubbard parameters, in the order of the tuples of `Hubbard.to_list`.
+PARAMETERS_FIELDS = (
+    'atom_index',
+    'atom_manifold',
+    'neighbour_index',
+    'neighbour_manifold',
+    'value',
+    'translation',
+    'hubbard_type',
+)
+
+################################################## Start: Hubbard parameters:
+
+def check_manifold(value):
+    """Check the validity of the manifold input.
+
+    Allowed formats are:
+        * {N}{L} (2 characters)
+        * {N1}{L1}-{N2}{L2} (5 characters)
+
+    N = quantum number (1,2,3,...); L = orbital letter (s,p,d,f,g,h)
+    """
+    length = len(value)
+    if length not in [2, 5]:
+        raise ValueError(f'invalid length ``{length}``. Only 2 or 5.')
+    if length == 2:
+        if not value[0] in [str(_ + 1) for _ in range(6)]:
+            raise ValueError(f'invalid quantum number {value[0]}')
+        if not value[1] in ['s', 'p', 'd', 'f', 'h']:
+            raise ValueError(f'invalid manifold symbol {value[1]}')
+    if length == 5:
+        if not value[2] == '-':
+            raise ValueError(f'the separator {value[0]} is not allowed. Only `-`')
+        if not value[3] in [str(_ + 1) for _ in range(6)]:
+            raise ValueError(f'the quantum number {value[0]} is not correct')
+        if not value[4] in ['s', 'p', 'd', 'f', 'h']:
+            raise ValueError(f'the manifold number {value[1]} is not correct')
+    return value
+
+
+class HubbardParameters(BaseModel):
+    """Class for describing onsite and intersite Hubbard interaction parameters.
+
+    .. note: allowed manifold formats are:
+            * {N}{L} (2 characters)
+            * {N1}{L1}-{N2}{L2} (5 characters)
+
+        N = quantum number (1,2,3,...); L = orbital letter (s,p,d,f,g,h)
+    """
+    atom_index: conint(strict=True, ge=0)
+    """Atom index in the abstract structure."""
+
+    atom_manifold: constr(strip_whitespace=True, to_lower=True, min_length=2, max_length=5)
+    """Atom manifold (syntax is `3d`, `3d-2p`)."""
+
+    neighbour_index: conint(strict=True, ge=0)
+    """Neighbour index in the abstract structure."""
+
+    neighbour_manifold: constr(strip_whitespace=True, to_lower=True, min_length=2, max_length=5)
+    """Atom manifold (syntax is `3d`, `3d-2p`)."""
+
+    translation: Tuple[conint(strict=True), conint(strict=True), conint(strict=True)]
+    """Translation vector referring to the neighbour atom, (3,) shape list of ints."""
+
+    value: float
+    """Value of the Hubbard parameter, expessed in eV."""
+
+    hubbard_type: Literal['Ueff', 'U', 'V', 'J', 'B', 'E2', 'E3']
+    """Type of the Hubbard parameters used (`Ueff`, `U`, `V`, `J`, `B`, `E2`, `E3`)."""
+
+    @validator('atom_manifold', 'neighbour_manifold')  # cls is mandatory to use
+    def check_manifolds(cls, value):  # pylint: disable=no-self-argument, no-self-use
+        """Check the validity of the manifold input (see `check_manifold`)."""
+        return check_manifold(value)
+
+    def to_tuple(self) -> Tuple[int, str, int, str, float, Tuple[int, int, int], str]:
+        """Return the parameters as a tuple.
+
+        The parameters have the following order:
+            * atom_index
+            * atom_manifold
+            * neighbour_index
+            * neighbour_manifold
+            * value
+            * translation
+            * hubbard_type
+        """
+        return (
+            self.atom_index, self.atom_manifold, self.neighbour_index, self.neighbour_manifold, self.value,
+            self.translation, self.hubbard_type
+        )
+
+    @staticmethod
+    def from_tuple(hubbard_parameters: Tuple[int, str, int, str, float, Tuple[int, int, int], str]):
+        """Return a ``HubbardParameters``  instance from a list.
+
+        The parameters within the list must have the following order:
+            * atom_index
+            * atom_manifold
+            * neighbour_index
+            * neighbour_manifold
+            * value
+            * translation
+            * hubbard_type
+        """
+        return HubbardParameters(**dict(zip(PARAMETERS_FIELDS, hubbard_parameters)))
+
+
+class HubbardParametersColumns(dict):
+    """
+    Pydantic type for the Hubbard parameters, stored by columns: a dictionary with one list per field of the
+    :class:`HubbardParameters` (see `PARAMETERS_FIELDS`), e.g. `{"atom_index": [0, 0], "translation": [[0, 0, 0],
+    [0, 0, -1]], ...}`. A list of tuples (in the order of `PARAMETERS_FIELDS`) is also accepted, and converted.
+
+    As for the intra-site properties, each column is converted to a numpy array only once and checked in bulk;
+    the manifolds are checked only once for each distinct value.
+    """
+
+    @classmethod
+    def __get_validators__(cls):
+        yield cls.validate
+
+    @classmethod
+    def validate(cls, value):
+        import numpy as np
+
+        if isinstance(value, (list, tuple)):
+            rows = [tuple(row) for row in value]
+            if any(len(row) != len(PARAMETERS_FIELDS) for row in rows):
+                raise ValueError(f"Each Hubbard parameter should be a tuple of {len(PARAMETERS_FIELDS)} elements: {PARAMETERS_FIELDS}.")
+            value = dict(zip(PARAMETERS_FIELDS, map(list, zip(*rows)))) if rows else {field: [] for field in PARAMETERS_FIELDS}
+
+        if not isinstance(value, dict) or set(value.keys()) != set(PARAMETERS_FIELDS):
+            raise ValueError(f"The Hubbard parameters should be a list of tuples or a dictionary with keys {PARAMETERS_FIELDS}.")
+
+        columns = {}
+        for field in ['atom_index', 'neighbour_index']:
+            array = np.asarray(value[field])
+            if array.ndim != 1 or (len(array) > 0 and array.dtype.kind not in 'iu') or (array < 0).any():
+                raise ValueError(f"The '{field}' of the Hubbard parameters should be non-negative integers.")
+            columns[field] = array.astype(int).tolist()
+
+        translation = np.asarray(value['translation'])
+        if translation.size == 0:
+            translation = translation.reshape(0, 3)
+        if translation.shape != (len(columns['atom_index']), 3) or (len(translation) > 0 and translation.dtype.kind not in 'iu'):
+            raise ValueError("The 'translation' of the Hubbard parameters should be (3,) shape lists of integers.")
+        columns['translation'] = translation.astype(int).tolist()
+
+        try:
+            columns['value'] = np.asarray(value['value'], dtype=float).reshape(-1).tolist()
+        except (ValueError, TypeError):
+            raise ValueError("The 'value' of the Hubbard parameters should be floats.")
+
+        for field in ['atom_manifold', 'neighbour_manifold']:
+            manifolds, inverse = np.unique(np.asarray(value[field], dtype=str), return_inverse=True)
+            manifolds = [check_manifold(manifold.strip().lower()) for manifold in manifolds.tolist()]
+            columns[field] = np.asarray(manifolds, dtype=str)[inverse.reshape(-1)].tolist() if manifolds else []
+
+        hubbard_type = np.asarray(value['hubbard_type'], dtype=str)
+        if not np.isin(hubbard_type, HUBBARD_TYPES).all():
+            raise ValueError(f"The 'hubbard_type' of the Hubbard parameters should be one of {HUBBARD_TYPES}.")
+        columns['hubbard_type'] = hubbard_type.tolist()
+
+        if len({len(column) for column in columns.values()}) > 1:
+            raise ValueError("All the fields of the Hubbard parameters should have the same length.")
+
+        return {field: columns[field] for field in PARAMETERS_FIELDS}
+
+
+# Initial cutoff (in angstrom) of the neighbor search used to find the shells of neighbours, and its growth factor.
+_SHELLS_CUTOFF = 3.0
+_SHELLS_CUTOFF_GROWTH = 1.5
+
+
+def get_shell_ranks(first, distances, thr: float = 1e-3):
+    """Return the rank of the shell of each pair, among the shells of neighbours of its first atom.
+
+    The pairs are grouped in shells of (almost) equal distance from the first atom: a new shell starts when the
+    distance grows by more than `thr` with respect to the previous (closer) pair.
+
+    :param first: (K,) int array with the index of the first atom of each pair.
+    :param distances: (K,) float array with the distance of each pair.
+    :param thr: the tolerance on the distances of the pairs of a same shell.
+    :returns: (K,) int array with the rank of the shell of each pair (0 for the closest neighbours).
+    """
+    import numpy as np
+
+    first = np.asarray(first, dtype=int)
+    distances = np.asarray(distances, dtype=float)
+    ranks = np.zeros(len(first), dtype=int)
+    if len(first) == 0:
+        return ranks
+
+    order = np.lexsort((distances, first))
+    sorted_first, sorted_distances = first[order], distances[order]
+    new_atom = np.concatenate([[True], sorted_first[1:] != sorted_first[:-1]])
+    new_shell = new_atom | np.concatenate([[True], np.diff(sorted_distances) > thr])
+    shells = np.cumsum(new_shell) - 1
+    # the shells are numbered from the first one of each atom.
+    ranks[order] = shells - shells[new_atom][np.cumsum(new_atom) - 1]
+    return ranks
+
+################################################## End: Hubbard parameters.
+
+################################################## Start: Hubbard property:
+
+class Hubbard(BaseProperty):
+    """
+    The Hubbard property: complete description of the onsite and intersite Hubbard interactions.
+
+    The parameters are stored by columns (see :class:`HubbardParametersColumns`), so that they are validated and
+    manipulated in bulk. A hash index of the parameters, on (atom_index, atom_manifold, neighbour_index,
+    neighbour_manifold, translation, hubbard_type), is built when it is first needed, for O(1) look-ups.
+
+    As all the properties, the Hubbard property is immutable: the methods changing the parameters return a new
+    (unstored) StructureData, e.g.:
+
+        structure = structure.replace(hubbard={"parameters": [(0, '3d', 0, '3d', 5.0, (0, 0, 0), 'U')]})
+        structure = structure.properties.hubbard.append_hubbard_parameter(0, '3d', 1, '2p', 1.0, hubbard_type='V')
+    """
+    domain = "inter-site"
+    normalized_fields: ClassVar[tuple] = ("parameters",) # stored by columns, whatever the input format (see the PropertyCollector).
+    parameters: HubbardParametersColumns = Field(default=None)
+    """Parameters, by columns (one list per field of :class:`HubbardParameters`)."""
+
+    projectors: Literal['atomic',
+                        'ortho-atomic',
+                        'norm-atomic',
+                        'wannier-functions',
+                        'pseudo-potentials',
+                        ] = Field(default='ortho-atomic')
+    """Name of the projectors used. Allowed values are:
+        'atomic', 'ortho-atomic', 'norm-atomic', 'wannier-functions', 'pseudo-potentials'."""
+
+    formulation: Literal['dudarev', 'liechtenstein'] = Field(default='dudarev')
+    """Hubbard formulation used. Allowed values are: 'dudarev', `liechtenstein`."""
+
+    _index = PrivateAttr(default=None)
+
+    @validator("parameters", always=True)
+    def validate_parameters(cls, value):
+        return value if value is not None else HubbardParametersColumns.validate([])
+
+    def check_dependencies(self, dependencies):
+        """Check that the indices of the parameters refer to the (validated) positions of the structure."""
+        n_sites = len(dependencies["positions"].value)
+        parameters = self.parameters
+
+        if max(parameters["atom_index"] + parameters["neighbour_index"], default=-1) >= n_sites:
+            raise ValueError(f"The indices of the Hubbard parameters should be smaller than the number of sites ({n_sites}).")
+
+    @staticmethod
+    def _get_keys(parameters):
+        """Return the list of the keys of the hash index, (atom_index, atom_manifold, neighbour_index,
+        neighbour_manifold, translation, hubbard_type), of the `parameters` columns."""
+        return list(zip(
+            parameters['atom_index'],
+            parameters['atom_manifold'],
+            parameters['neighbour_index'],
+            parameters['neighbour_manifold'],
+            map(tuple, parameters['translation']),
+            parameters['hubbard_type'],
+        ))
+
+    def _get_index(self):
+        """Return the hash index of the parameters (key: see `_get_keys`, value: position in the columns)."""
+        if self._index is None:
+            keys = self._get_keys(self.parameters)
+            self._index = dict(zip(keys, range(len(keys))))
+        return self._index
+
+    def get_parameter_index(
+        self,
+        atom_index: int,
+        atom_manifold: str,
+        neighbour_index: int,
+        neighbour_manifold: str,
+        translation: Tuple[int, int, int] = (0, 0, 0),
+        hubbard_type: str = 'Ueff',
+    ):
+        """Return the position of a Hubbard parameter in the columns, or None if it is not defined."""
+        return self._get_index().get(
+            (atom_index, atom_manifold, neighbour_index, neighbour_manifold, tuple(translation), hubbard_type)
+        )
+
+    def has_parameter(self, *args, **kwargs) -> bool:
+        """Return whether a Hubbard parameter is defined (same arguments as `get_parameter_index`), in O(1)."""
+        return self.get_parameter_index(*args, **kwargs) is not None
+
+    def get_arrays(self):
+        """Return the parameters as a dictionary of numpy arrays (one per field of :class:`HubbardParameters`)."""
+        import numpy as np
+
+        parameters = self.parameters
+        return {
+            'atom_index': np.array(parameters['atom_index'], dtype=int),
+            'atom_manifold': np.array(parameters['atom_manifold'], dtype=str),
+            'neighbour_index': np.array(parameters['neighbour_index'], dtype=int),
+            'neighbour_manifold': np.array(parameters['neighbour_manifold'], dtype=str),
+            'value': np.array(parameters['value'], dtype=float),
+            'translation': np.array(parameters['translation'], dtype=int).reshape(-1, 3),
+            'hubbard_type': np.array(parameters['hubbard_type'], dtype=str),
+        }
+
+    def to_list(self) -> List[Tuple[int, str, int, str, float, Tuple[int, int, int], str]]:
+        """Return the Hubbard `parameters` as a list of tuples.
+
+        The parameters have the following order within each tuple:
+            * atom_index
+            * atom_manifold
+            * neighbour_index
+            * neighbour_manifold
+            * value
+            * translation
+            * hubbard_type
+        """
+        parameters = self.parameters
+        return list(zip(
+            parameters['atom_index'],
+            parameters['atom_manifold'],
+            parameters['neighbour_index'],
+            parameters['neighbour_manifold'],
+            parameters['value'],
+            map(tuple, parameters['translation']),
+            parameters['hubbard_type'],
+        ))
+
+    def get_translations(self, atom_indices, neighbour_indices):
+        """Return the translations of the closest images of the neighbours, computed from the cell of the structure.
+
+        :param atom_indices: (K,) int array of the atom indices.
+        :param neighbour_indices: (K,) int array of the neighbour indices.
+        :returns: (K, 3) int array of the translations.
+        """
+        from aiida_atomistic.data.structure.neighbors import get_minimum_image_translations
+
+        properties = self.parent.properties
+        return get_minimum_image_translations(
+            properties.positions.value, properties.cell.value, properties.pbc.value, atom_indices, neighbour_indices
+        )
+
+    def _take_parameters(self, parameter_indices, atom_indices, neighbour_indices, translations):
+        """
+        Return the property attribute with the parameters `parameter_indices`, with new indices and translations
+        (e.g. mapped onto a supercell, or after a permutation of the sites).
+        """
+        arrays = self.get_arrays()
+        parameters = {field: arrays[field][parameter_indices].tolist() for field in PARAMETERS_FIELDS}
+        parameters.update({
+            'atom_index': atom_indices.tolist(),
+            'neighbour_index': neighbour_indices.tolist(),
+            'translation': translations.tolist(),
+        })
+        return {'parameters': parameters, 'projectors': self.projectors, 'formulation': self.formulation}
+
+    def _replace_parameters(self, parameters, index=None):
+        """Return a new StructureData, with the (already validated) `parameters` columns, and their hash index if known."""
+        hubbard = {'parameters': parameters, 'projectors': self.projectors, 'formulation': self.formulation}
+        new_structure = self.parent._replace_trusted({'hubbard': hubbard})  # pylint: disable=protected-access
+        new_structure.properties.hubbard._index = index
+        return new_structure
+
+    def from_list(
+        self,
+        parameters: List[Tuple[int, str, int, str, float, Tuple[int, int, int], str]],
+        projectors: str = None,
+        formulation: str = None,
+    ):
+        """Return a new StructureData with the Hubbard parameters replaced by a list of tuples.
+
+        Each tuple must contain the hubbard parameters in the following order:
+            * atom_index
+            * atom_manifold
+            * neighbour_index
+            * neighbour_manifold
+            * value
+            * translation
+            * hubbard_type
+        """
+        return self.parent.replace(hubbard={
+            'parameters': parameters,
+            'projectors': projectors or self.projectors,
+            'formulation': formulation or self.formulation,
+        })
+
+    def append_hubbard_parameter(
+        self,
+        atom_index: int,
+        atom_manifold: str,
+        neighbour_index: int,
+        neighbour_manifold: str,
+        value: float,
+        translation: Tuple[int, int, int] = None,
+        hubbard_type: str = 'Ueff',
+    ):
+        """Return a new StructureData with a Hubbard parameter appended (see `append_hubbard_parameters`).
+
+        :param atom_index: atom index in unitcell
+        :param atom_manifold: atomic manifold (e.g. 3d, 3d-2p)
+        :param neighbour_index: neighbouring atom index in unitcell
+        :param neighbour_manifold: neighbour manifold (e.g. 3d, 3d-2p)
+        :param value: value of the Hubbard parameter, in eV
+        :param translation: (3,) list of ints, describing the translation vector
+            associated with the neighbour atom, defaults to None (i.e. the closest image of the neighbour)
+        :param hubbard_type: hubbard type (U, V, J, ...), defaults to 'Ueff'
+            (see :class:`HubbardParameters` for full allowed values)
+        """
+        return self.append_hubbard_parameters(
+            [(atom_index, atom_manifold, neighbour_index, neighbour_manifold, value, translation, hubbard_type)]
+        )
+
+    def append_hubbard_parameters(self, parameters):
+        """Return a new StructureData with the Hubbard parameters appended, in bulk.
+
+        Only the new parameters are validated. The parameters which are already defined (i.e. with the same
+        indices, manifolds, translation and type, looked up in the hash index) are not appended again: their value
+        is updated.
+
+        :param parameters: list of tuples (in the order of `to_list`), or dictionary of columns. The translations
+            which are None are set to the ones of the closest images of the neighbours (see `get_translations`).
+        """
+        import numpy as np
+
+        if isinstance(parameters, dict):
+            parameters = dict(parameters)
+        else:
+            parameters = [tuple(parameter) for parameter in parameters]
+            parameters = dict(zip(PARAMETERS_FIELDS, map(list, zip(*parameters)))) if parameters else \
+                {field: [] for field in PARAMETERS_FIELDS}
+
+        n_sites = len(self.parent.properties.positions.value)
+        translations = list(parameters.get('translation', []))
+        missing = [position for position, translation in enumerate(translations) if translation is None]
+        if missing:
+            if max(max(parameters['atom_index']), max(parameters['neighbour_index'])) >= n_sites:
+                raise ValueError(f"The indices of the Hubbard parameters should be smaller than the number of sites ({n_sites}).")
+            computed = self.get_translations(
+                np.asarray(parameters['atom_index'])[missing], np.asarray(parameters['neighbour_index'])[missing]
+            ).tolist()
+            for position, translation in zip(missing, computed):
+                translations[position] = translation
+            parameters['translation'] = translations
+
+        new_parameters = HubbardParametersColumns.validate(parameters)
+        if max(new_parameters['atom_index'] + new_parameters['neighbour_index'], default=-1) >= n_sites:
+            raise ValueError(f"The indices of the Hubbard parameters should be smaller than the number of sites ({n_sites}).")
+
+        # last occurrence of each new key, then look-up of the keys already defined.
+        new_index = dict(zip(self._get_keys(new_parameters), range(len(new_parameters['value']))))
+        index = self._get_index()
+        rows = np.fromiter(new_index.values(), dtype=int, count=len(new_index))
+        positions = np.fromiter((index.get(key, -1) for key in new_index), dtype=int, count=len(new_index))
+        existing = positions >= 0
+
+        values = np.array(self.parameters['value'], dtype=float)
+        values[positions[existing]] = np.asarray(new_parameters['value'], dtype=float)[rows[existing]]
+        appended = rows[~existing].tolist()
+
+        columns = {field: column + [new_parameters[field][row] for row in appended] for field, column in self.parameters.items()}
+        columns['value'] = values.tolist() + [new_parameters['value'][row] for row in appended]
+
+        # the index of the new parameters is updated, instead of being built again.
+        index = dict(index)
+        index.update(zip([key for key, is_existing in zip(new_index, existing.tolist()) if not is_existing],
+                         range(len(values), len(values) + len(appended))))
+
+        return self._replace_parameters(columns, index=index)
+
+    def pop_hubbard_parameters(self, index: int):
+        """Return a new StructureData without the Hubbard parameter at position `index`.
+
+        :param index: index of the Hubbard parameters to pop
+        """
+        columns = {field: list(column) for field, column in self.parameters.items()}
+        for column in columns.values():
+            column.pop(index)
+        return self._replace_parameters(columns)
+
+    def clear_hubbard_parameters(self):
+        """Return a new StructureData without Hubbard parameters."""
+        return self._replace_parameters({field: [] for field in PARAMETERS_FIELDS})
+
+    def _get_site_indices(self, name: str, use_kinds: bool = True):
+        """Return the indices of the sites with kind name (or symbol, if `use_kinds` is False) equal to `name`.
+
+        The symbols are used in place of the kind names, if the kinds are not defined.
+        """
+        import numpy as np
+
+        properties = self.parent.properties
+        if use_kinds and 'kinds' in properties.get_stored_properties():
+            names = properties.kinds.value
+        else:
+            names = properties.symbols.value
+
+        indices = np.flatnonzero(np.asarray(names, dtype=str) == name)
+        if len(indices) == 0:
+            raise ValueError(f'species or kind name `{name}` not in structure')
+        return indices
+
+    def get_intersite_pairs(
+        self,
+        atom_indices,
+        neighbour_indices,
+        cutoff: float = None,
+        number_of_shells: int = 1,
+        thr: float = 1e-3,
+    ):
+        """Return the pairs of sites between `atom_indices` and the periodic images of `neighbour_indices`,
+        either within a cutoff or within the first shells of neighbours of each atom.
+
+        The pairs are obtained in a single pass from the neighbor list of the structure (see its
+        `get_neighbor_list` method). Without `cutoff`, the neighbor search is repeated with a larger cutoff until
+        all the requested shells are complete (or, for non-periodic structures, all the sites are included).
+
+        :param atom_indices: (K,) int array with the indices of the atoms.
+        :param neighbour_indices: (L,) int array with the indices of the neighbours.
+        :param cutoff: the maximum distance of the pairs, in angstrom; if None, `number_of_shells` is used.
+        :param number_of_shells: the number of shells of neighbours of each atom (used only if `cutoff` is None).
+        :param thr: the tolerance on the distances of the neighbours of a same shell, in angstrom.
+        :returns: the (P,) atom indices, (P,) neighbour indices and (P, 3) translations of the pairs, sorted by
+            atom index and distance.
+        """
+        import numpy as np
+
+        properties = self.parent.properties
+        n_sites = len(properties.positions.value)
+        is_atom = np.zeros(n_sites, dtype=bool)
+        is_atom[np.asarray(atom_indices, dtype=int)] = True
+        is_neighbour = np.zeros(n_sites, dtype=bool)
+        is_neighbour[np.asarray(neighbour_indices, dtype=int)] = True
+
+        if cutoff is None and number_of_shells < 1:
+            raise ValueError(f'The number of shells must be positive, got {number_of_shells}.')
+        # without pbc, there are no neighbours beyond the largest distance between the sites.
+        positions = np.asarray(properties.positions.value, dtype=float).reshape(-1, 3)
+        extent = np.linalg.norm(np.ptp(positions, axis=0)) if n_sites else 0.
+        periodic = any(properties.pbc.value)
+
+        search_cutoff = cutoff if cutoff is not None else _SHELLS_CUTOFF
+        if cutoff is None and all(properties.pbc.value):
+            # radius of the sphere containing, on average, as many neighbours as the requested shells.
+            volume = abs(np.linalg.det(np.asarray(properties.cell.value, dtype=float)))
+            search_cutoff = max(search_cutoff, (3 * volume * number_of_shells / (4 * np.pi * is_neighbour.sum()))**(1 / 3))
+        while True:
+            neighbor_list = self.parent.get_neighbor_list(search_cutoff)
+            first = np.repeat(np.arange(n_sites), np.diff(neighbor_list.offsets))
+            selected = is_atom[first] & is_neighbour[neighbor_list.neighbors]
+            first, second = first[selected], neighbor_list.neighbors[selected]
+            images, distances = neighbor_list.images[selected], neighbor_list.distances[selected]
+            if cutoff is not None:
+                break
+
+            ranks = get_shell_ranks(first, distances, thr)
+            # a shell is complete if a farther one has been found: the requested ones are complete if, for each
+            # atom, the shell following them has been found.
+            complete = np.zeros(n_sites, dtype=bool)
+            complete[first[ranks == number_of_shells]] = True
+            if complete[is_atom].all() or (not periodic and search_cutoff > extent):
+                selected = ranks < number_of_shells
+                first, second, images, distances = first[selected], second[selected], images[selected], distances[selected]
+                break
+            search_cutoff *= _SHELLS_CUTOFF_GROWTH
+
+        order = np.lexsort((second, distances, first))
+        return first[order], second[order], images[order]
+
+    def initialize_intersites_hubbard(
+        self,
+        atom_name: str,
+        atom_manifold: str,
+        neighbour_name: str,
+        neighbour_manifold: str,
+        value: float = 1e-8,
+        hubbard_type: str = 'V',
+        use_kinds: bool = True,
+        cutoff: float = None,
+        number_of_shells: int = 1,
+        thr: float = 1e-3,
+    ):
+        """Return a new StructureData with the intersite Hubbard parameters between all the atoms named `atom_name`
+        and their neighbours named `neighbour_name`, within a cutoff or within the first shells of neighbours.
+
+        All the pairs are generated at once from a periodic neighbor search (see `get_intersite_pairs`), and
+        appended in bulk (see `append_hubbard_parameters`).
+
+        :param atom_name: kind name (or symbol, if `use_kinds` is False) of the atoms
+        :param atom_manifold: atomic manifold (e.g. 3d, 3d-2p)
+        :param neighbour_name: kind name (or symbol, if `use_kinds` is False) of the neighbours
+        :param neighbour_manifold: neighbour manifold (e.g. 3d, 3d-2p)
+        :param value: value of the Hubbard parameter, in eV
+        :param hubbard_type: hubbard type (U, V, J, ...), defaults to 'V'
+            (see :class:`HubbardParameters` for full allowed values)
+        :param use_kinds: whether to match the kind names or the symbols of the sites
+        :param cutoff: the maximum distance between an atom and its neighbours, in angstrom; if None,
+            `number_of_shells` is used
+        :param number_of_shells: the number of shells of neighbours of each atom, defaults to 1 (the closest ones)
+        :param thr: the tolerance on the distances of the neighbours of a same shell, in angstrom
+        """
+        atom_indices, neighbour_indices, translations = self.get_intersite_pairs(
+            self._get_site_indices(atom_name, use_kinds),
+            self._get_site_indices(neighbour_name, use_kinds),
+            cutoff=cutoff,
+            number_of_shells=number_of_shells,
+            thr=thr,
+        )
+        n_pairs = len(atom_indices)
+        return self.append_hubbard_parameters({
+            'atom_index': atom_indices.tolist(),
+            'atom_manifold': [atom_manifold] * n_pairs,
+            'neighbour_index': neighbour_indices.tolist(),
+            'neighbour_manifold': [neighbour_manifold] * n_pairs,
+            'value': [value] * n_pairs,
+            'translation': translations.tolist(),
+            'hubbard_type': [hubbard_type] * n_pairs,
+        })
+
+    def initialize_onsites_hubbard(
+        self,
+        atom_name: str,
+        atom_manifold: str,
+        value: float = 1e-8,
+        hubbard_type: str = 'Ueff',
+        use_kinds: bool = True,
+    ):
+        """Return a new StructureData with the onsite Hubbard parameters of all the atoms named `atom_name`.
+
+        :param atom_name: kind name (or symbol, if `use_kinds` is False) of the atoms
+        :param atom_manifold: atomic manifold (e.g. 3d, 3d-2p)
+        :param value: value of the Hubbard parameter, in eV
+        :param hubbard_type: hubbard type (U, J, ...), defaults to 'Ueff'
+            (see :class:`HubbardParameters` for full allowed values)
+        :param use_kinds: whether to match the kind names or the symbols of the sites
+        """
+        atom_indices = self._get_site_indices(atom_name, use_kinds).tolist()
+        n_atoms = len(atom_indices)
+        return self.append_hubbard_parameters({
+            'atom_index': atom_indices,
+            'atom_manifold': [atom_manifold] * n_atoms,
+            'neighbour_index': atom_indices,
+            'neighbour_manifold': [atom_manifold] * n_atoms,
+            'value': [value] * n_atoms,
+            'translation': [[0, 0, 0]] * n_atoms,
+            'hubbard_type': [hubbard_type] * n_atoms,
+        })
+
+################################################## End: Hubbard property.
@@ -0,0 +1,584 @@
+# -*- coding: utf-8 -*-
+"""Utility functions for handling the Hubbard parameters of a :class:`aiida_atomistic.data.structure.StructureData`,
+as used in the aiida-quantumespresso plugin.
+
+The functions work on arrays: the sites of a supercell are matched with the ones of the unit cell by broadcasting
+their fractional coordinates, and the (site, lattice translation) pairs are then looked up through integer keys,
+without any pymatgen conversion.
+"""
+# pylint: disable=invalid-name
+from itertools import product
+
+import numpy as np
+
+__all__ = (
+    'QE_TRANSLATIONS',
+    'get_supercell_atomic_index',
+    'get_index_and_translation',
+    'get_supercell_site_map',
+    'get_hubbard_indices_for_supercell',
+    'map_hubbard_indices',
+    'get_hubbard_for_supercell',
+    'get_hubbard_indices',
+    'get_reorder_permutation',
+    'reorder_atoms',
+    'get_supercell_atomic_indices',
+    'get_indices_and_translations',
+    'get_hubbard_card',
+    'get_hubbard_file',
+    'parse_hubbard_dat',
+)
+
+QE_TRANSLATIONS = list(list(item) for item in product((-1, 0, 1), repeat=3))
+first = QE_TRANSLATIONS.pop(13)
+QE_TRANSLATIONS.insert(0, first)
+QE_TRANSLATIONS = tuple(tuple(item) for item in QE_TRANSLATIONS)
+# Number of each translation in the QuantumESPRESSO loop, indexed by the base-3 key of the translation (see below).
+_QE_TRANSLATION_NUMBERS = np.empty(len(QE_TRANSLATIONS), dtype=int)
+_QE_TRANSLATION_NUMBERS[(np.array(QE_TRANSLATIONS) + 1) @ (9, 3, 1)] = np.arange(len(QE_TRANSLATIONS))
+
+# Number of supercell sites whose fractional translations are broadcast together, to bound the memory.
+_CHUNK_SIZE = 4096
+# Tolerance on the fractional coordinates when wrapping the (integer) lattice translations in the supercell.
+_EPS = 1e-8
+
+
+def get_supercell_atomic_index(index: int, num_sites: int, translation) -> int:
+    """Return the atomic index in 3x3x3 supercell.
+
+    :param index: atomic index in unit cell
+    :param num_sites: number of sites in structure
+    :param translation: (3,) shape list of int referring to the translated atom in the 3x3x3 supercell
+
+    :returns: atomic index in supercell standardized with the QuantumESPRESSO loop
+    """
+    return index + QE_TRANSLATIONS.index(tuple(translation)) * num_sites
+
+
+def get_index_and_translation(index: int, num_sites: int):
+    """Return the atomic index in unitcell and the associated translation from a 3x3x3 QuantumESPRESSO supercell index.
+
+    :param index: atomic index
+    :param num_sites: number of sites in structure
+    :returns: tuple (index, (3,) shape list of ints)
+    """
+    number = index // num_sites  # associated supercell number
+    return (index - num_sites * number, QE_TRANSLATIONS[number])
+
+
+def get_supercell_site_map(positions, cell, supercell_positions, thr: float = 1e-3):
+    """Return, for each site of a supercell, the corresponding site of the unit cell and the lattice translation.
+
+    The fractional translations between all the supercell and unit cell sites are computed by broadcasting (in chunks
+    of supercell sites), and a site is matched if its translation is a lattice vector within `thr`.
+
+    :param positions: (N, 3) array of the cartesian positions of the unit cell.
+    :param cell: 3x3 array of the cell vectors of the unit cell (as rows).
+    :param supercell_positions: (M, 3) array of the cartesian positions of the supercell.
+    :param thr: the maximum distance between a supercell site and the translated unit cell site, in angstrom.
+    :returns: tuple (site_map, translations), with the (M,) int array of the unit cell indices and the (M, 3) int array
+        of the lattice translations, such that `supercell_positions = positions[site_map] + translations @ cell`.
+    :raises ValueError: if the cell is singular, or if a supercell site does not match any unit cell site.
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    cell = np.asarray(cell, dtype=float).reshape(3, 3)
+    supercell_positions = np.asarray(supercell_positions, dtype=float).reshape(-1, 3)
+
+    try:
+        inverse_cell = np.linalg.inv(cell)
+    except np.linalg.LinAlgError:
+        raise ValueError('The cell of the unit cell is singular.')
+
+    fractional = positions @ inverse_cell
+    supercell_fractional = supercell_positions @ inverse_cell
+
+    site_map = np.empty(len(supercell_positions), dtype=int)
+    translations = np.empty((len(supercell_positions), 3), dtype=int)
+    for start in range(0, len(supercell_positions), _CHUNK_SIZE):
+        # (chunk, N, 3) fractional translations from each unit cell site to each supercell site.
+        differences = supercell_fractional[start:start + _CHUNK_SIZE, None, :] - fractional[None, :, :]
+        lattice_vectors = np.rint(differences)
+        distances = np.linalg.norm((differences - lattice_vectors) @ cell, axis=2)
+
+        matched = distances < thr
+        if not matched.any(axis=1).all():
+            missing = start + np.flatnonzero(~matched.any(axis=1))
+            raise ValueError(f'The supercell sites {missing[:10].tolist()} do not match any site of the unit cell.')
+
+        chunk_map = np.argmax(matched, axis=1)
+        site_map[start:start + _CHUNK_SIZE] = chunk_map
+        translations[start:start + _CHUNK_SIZE] = lattice_vectors[np.arange(len(chunk_map)), chunk_map]
+
+    return site_map, translations
+
+
+def _wrap_translations(translations, matrix, inverse_matrix):
+    """Return the integer translations `translations = wrapped + images @ matrix`, with `wrapped` in the supercell.
+
+    :returns: tuple (wrapped, images) of (K, 3) int arrays.
+    """
+    images = np.floor(translations @ inverse_matrix + _EPS).astype(int)
+    return translations - images @ matrix, images
+
+
+def get_hubbard_indices_for_supercell(
+    positions,
+    cell,
+    supercell_positions,
+    supercell_cell,
+    atom_indices,
+    neighbour_indices,
+    translations,
+    thr: float = 1e-3,
+):
+    """Return the indices and translations of the Hubbard parameters of a unit cell mapped onto a supercell.
+
+    Each parameter `(i, j, T)` is mapped onto all the images of the atom `i` in the supercell. The neighbour of each
+    image is found by wrapping its lattice translation in the supercell and looking up the integer key of the pair
+    (unit cell site, wrapped translation) among the ones of the supercell sites, so that all the parameters are
+    mapped in a single vectorized pass.
+
+    .. note:: the two structures need to be commensurate (no rigid rotations).
+
+    :param positions: (N, 3) array of the cartesian positions of the unit cell.
+    :param cell: 3x3 array of the cell vectors of the unit cell (as rows).
+    :param supercell_positions: (M, 3) array of the cartesian positions of the supercell.
+    :param supercell_cell: 3x3 array of the cell vectors of the supercell (as rows).
+    :param atom_indices: (P,) int array of the atom indices of the parameters.
+    :param neighbour_indices: (P,) int array of the neighbour indices of the parameters.
+    :param translations: (P, 3) int array of the translations of the neighbours of the parameters.
+    :param thr: the tolerance used to match the supercell and unit cell sites, in angstrom.
+    :returns: tuple (parameter_indices, atom_indices, neighbour_indices, translations) of the mapped parameters, with
+        the index of the originating unit cell parameter. The mapped parameters are sorted by originating parameter,
+        then by supercell atom index.
+    :raises ValueError: if the structures are not commensurate.
+    """
+    cell = np.asarray(cell, dtype=float).reshape(3, 3)
+    n_sites = len(np.asarray(positions).reshape(-1, 3))
+
+    matrix = np.asarray(supercell_cell, dtype=float).reshape(3, 3) @ np.linalg.inv(cell)
+    if not np.allclose(matrix, np.rint(matrix), atol=1e-5) or abs(np.linalg.det(np.rint(matrix))) < 0.5:
+        raise ValueError('The supercell is not commensurate with the unit cell.')
+    matrix = np.rint(matrix).astype(int)
+
+    site_map, site_translations = get_supercell_site_map(positions, cell, supercell_positions, thr)
+
+    return map_hubbard_indices(n_sites, site_map, site_translations, matrix, atom_indices, neighbour_indices, translations)
+
+
+def map_hubbard_indices(n_sites, site_map, site_translations, matrix, atom_indices, neighbour_indices, translations):
+    """Return the indices and translations of the Hubbard parameters of a unit cell mapped onto a supercell, whose
+    sites are known in terms of the unit cell sites (see :func:`get_hubbard_indices_for_supercell`).
+
+    :param n_sites: the number of sites of the unit cell.
+    :param site_map: (M,) int array with the unit cell site of each supercell site.
+    :param site_translations: (M, 3) int array with the lattice translation of each supercell site, with respect to
+        its unit cell site.
+    :param matrix: the 3x3 integer supercell matrix, i.e. `supercell_cell = matrix @ cell`.
+    :param atom_indices: (P,) int array of the atom indices of the parameters.
+    :param neighbour_indices: (P,) int array of the neighbour indices of the parameters.
+    :param translations: (P, 3) int array of the translations of the neighbours of the parameters.
+    :returns: tuple (parameter_indices, atom_indices, neighbour_indices, translations) of the mapped parameters.
+    :raises ValueError: if some neighbours are missing in the supercell.
+    """
+    site_map = np.asarray(site_map, dtype=int)
+    site_translations = np.asarray(site_translations, dtype=int).reshape(-1, 3)
+    atom_indices = np.asarray(atom_indices, dtype=int).reshape(-1)
+    neighbour_indices = np.asarray(neighbour_indices, dtype=int).reshape(-1)
+    translations = np.asarray(translations, dtype=int).reshape(-1, 3)
+    matrix = np.asarray(matrix, dtype=int).reshape(3, 3)
+    inverse_matrix = np.linalg.inv(matrix)
+
+    site_wrapped, site_images = _wrap_translations(site_translations, matrix, inverse_matrix)
+
+    # integer keys of the (unit cell site, wrapped translation) pairs: the wrapped translations lie in a bounded box.
+    lower = site_wrapped.min(axis=0, initial=0)
+    shape = np.append(n_sites, site_wrapped.max(axis=0, initial=0) - lower + 1)
+
+    def get_keys(indices, wrapped):
+        inside = np.all((wrapped >= lower) & (wrapped < lower + shape[1:]), axis=1)
+        keys = np.ravel_multi_index((indices, *(np.where(inside[:, None], wrapped - lower, 0)).T), shape)
+        return np.where(inside, keys, -1)
+
+    site_keys = get_keys(site_map, site_wrapped)
+    order = np.argsort(site_keys, kind='stable')
+    sorted_keys = site_keys[order]
+    if (np.diff(sorted_keys) == 0).any():
+        raise ValueError('The supercell contains overlapping sites.')
+
+    # images of the atom of each parameter: the supercell sites are grouped by unit cell site.
+    by_site = np.argsort(site_map, kind='stable')
+    counts = np.bincount(site_map, minlength=n_sites)
+    starts = np.cumsum(counts) - counts
+    n_images = counts[atom_indices]
+    parameter_indices = np.repeat(np.arange(len(atom_indices)), n_images)
+    within = np.arange(n_images.sum()) - np.repeat(np.cumsum(n_images) - n_images, n_images)
+    supercell_atoms = by_site[np.repeat(starts[atom_indices], n_images) + within]
+
+    # lattice translation of each neighbour, with respect to the unit cell, then wrapped in the supercell.
+    neighbour_translations = site_translations[supercell_atoms] + translations[parameter_indices]
+    neighbour_wrapped, neighbour_images = _wrap_translations(neighbour_translations, matrix, inverse_matrix)
+    neighbour_keys = get_keys(neighbour_indices[parameter_indices], neighbour_wrapped)
+
+    found = np.minimum(np.searchsorted(sorted_keys, neighbour_keys), len(sorted_keys) - 1)
+    if len(sorted_keys) == 0 or (sorted_keys[found] != neighbour_keys).any():
+        raise ValueError('The supercell is not commensurate with the unit cell: some neighbours are missing.')
+    supercell_neighbours = order[found]
+
+    return (
+        parameter_indices,
+        supercell_atoms,
+        supercell_neighbours,
+        neighbour_images - site_images[supercell_neighbours],
+    )
+
+
+def _get_kind_names(structure):
+    """Return the array of the kind names of the sites of a StructureData (the symbols, if the kinds are not defined)."""
+    if structure._has_legacy_sites():  # pylint: disable=protected-access
+        return np.array(structure.sites.kind_names)
+    properties = structure.properties
+    if 'kinds' in properties.get_stored_properties():
+        return np.array(properties.kinds.value)
+    return np.array(properties.symbols.value)
+
+
+def _get_positions_and_cell(structure):
+    """Return the positions and the cell of a StructureData, defined via the properties or the (legacy) sites."""
+    if structure._has_legacy_sites():  # pylint: disable=protected-access
+        return structure.sites.positions, np.array(structure.cell)
+    properties = structure.properties
+    return np.array(properties.positions.value), np.array(properties.cell.value)
+
+
+def get_hubbard_for_supercell(structure, supercell, parameters, thr: float = 1e-3):
+    """Return the Hubbard parameters of a structure mapped onto a supercell.
+
+    .. note:: the two structures need to be commensurate (no rigid rotations)
+
+    .. warning:: **always check** that the energy calculation of a pristine supercell
+        structure obtained through this method is the same as the unitcell (within numerical noise)
+
+    :param structure: the unit cell ``StructureData``.
+    :param supercell: the supercell ``StructureData``, e.g. obtained via its ``make_supercell`` method.
+    :param parameters: list of the Hubbard parameters of the unit cell, as tuples in the following order:
+        atom_index, atom_manifold, neighbour_index, neighbour_manifold, value, translation, hubbard_type
+    :param thr: the tolerance used to match the supercell and unit cell sites, in angstrom.
+    :returns: the list of the mapped Hubbard parameters, as tuples in the same order.
+    """
+    positions, cell = _get_positions_and_cell(structure)
+    supercell_positions, supercell_cell = _get_positions_and_cell(supercell)
+
+    parameter_indices, atom_indices, neighbour_indices, translations = get_hubbard_indices_for_supercell(
+        positions,
+        cell,
+        supercell_positions,
+        supercell_cell,
+        [parameter[0] for parameter in parameters],
+        [parameter[2] for parameter in parameters],
+        [parameter[5] for parameter in parameters],
+        thr,
+    )
+
+    return [(
+        atom_index,
+        parameters[index][1],
+        neighbour_index,
+        parameters[index][3],
+        parameters[index][4],
+        tuple(translation),
+        parameters[index][6],
+    ) for index, atom_index, neighbour_index, translation in zip(
+        parameter_indices.tolist(), atom_indices.tolist(), neighbour_indices.tolist(), translations.tolist()
+    )]
+
+
+def get_hubbard_indices(atom_indices, neighbour_indices):
+    """Return the sorted array of the site indices involved in the Hubbard parameters.
+
+    :param atom_indices: (P,) int array of the atom indices of the parameters.
+    :param neighbour_indices: (P,) int array of the neighbour indices of the parameters.
+    """
+    return np.unique(np.concatenate([np.asarray(atom_indices, dtype=int), np.asarray(neighbour_indices, dtype=int)]))
+
+
+def get_reorder_permutation(kind_names, hubbard_indices):
+    """Return the permutation of the sites which puts the Hubbard kinds first, as needed for an ``hp.x`` calculation.
+
+    The Hubbard kinds (i.e. the kinds of the sites in `hubbard_indices`) come first, in reverse alphabetical order,
+    followed by all the other sites. The relative order of the sites is otherwise preserved, as the permutation is
+    computed with a single stable sort of the rank of the kind of each site.
+
+    :param kind_names: (N,) array of the kind names of the sites.
+    :param hubbard_indices: array of the indices of the sites involved in the Hubbard parameters.
+    :returns: tuple (permutation, inverse_permutation) of (N,) int arrays: the site `i` of the reordered structure is
+        the site `permutation[i]` of the original one, and the site `j` of the original structure is the site
+        `inverse_permutation[j]` of the reordered one.
+    """
+    unique_kinds, kind_indices = np.unique(np.asarray(kind_names), return_inverse=True)
+    is_hubbard = np.zeros(len(unique_kinds), dtype=bool)
+    is_hubbard[kind_indices[np.asarray(hubbard_indices, dtype=int)]] = True
+
+    # the last Hubbard kind (alphabetically) has rank 0, the non-Hubbard kinds all have the largest rank.
+    n_hubbard = is_hubbard.sum()
+    ranks = np.where(is_hubbard, n_hubbard - np.cumsum(is_hubbard), n_hubbard)
+
+    permutation = np.argsort(ranks[kind_indices], kind='stable')
+    inverse_permutation = np.empty_like(permutation)
+    inverse_permutation[permutation] = np.arange(len(permutation))
+
+    return permutation, inverse_permutation
+
+
+def reorder_atoms(structure, parameters=None):
+    """Return the structure with the atoms reordered as necessary for an ``hp.x`` calculation, and its parameters.
+
+    An ``HpCalculation`` which restarts from a completed ``PwCalculation``, requires that the all
+    Hubbard atoms appear first in  the atomic positions card of the ``PwCalculation`` input file.
+    All the intra-site properties are permuted at once (see :func:`get_reorder_permutation`), and the indices
+    of the parameters are remapped through the inverse permutation, so that the reordering is linear in the number of
+    sites and parameters.
+
+    :param structure: the ``StructureData``. If it has the ``hubbard`` property, its parameters are also reordered.
+    :param parameters: list of the Hubbard parameters, as tuples in the following order:
+        atom_index, atom_manifold, neighbour_index, neighbour_manifold, value, translation, hubbard_type.
+        Defaults to the ones of the ``hubbard`` property of the structure.
+    :returns: tuple (reordered, parameters) with the new (unstored) ``StructureData`` and the reordered parameters.
+    """
+    has_hubbard = not structure._has_legacy_sites() and 'hubbard' in structure.properties.get_stored_properties()  # pylint: disable=protected-access
+    if parameters is None:
+        parameters = structure.properties.hubbard.to_list() if has_hubbard else []
+
+    atom_indices = np.array([parameter[0] for parameter in parameters], dtype=int)
+    neighbour_indices = np.array([parameter[2] for parameter in parameters], dtype=int)
+
+    permutation, inverse_permutation = get_reorder_permutation(
+        _get_kind_names(structure), get_hubbard_indices(atom_indices, neighbour_indices)
+    )
+
+    if structure._has_legacy_sites():  # pylint: disable=protected-access
+        # the kinds are also sorted, by first appearance in the reordered sites.
+        reordered = structure.clone()
+        raw_sites = structure.base.attributes.get('sites')
+        raw_kinds = structure.base.attributes.get('kinds')
+        kind_names, first_sites = np.unique(_get_kind_names(structure)[permutation], return_index=True)
+        first_sites = dict(zip(kind_names.tolist(), first_sites.tolist()))
+        reordered.base.attributes.set('sites', [raw_sites[index] for index in permutation.tolist()])
+        reordered.base.attributes.set(
+            'kinds', sorted(raw_kinds, key=lambda raw_kind: first_sites.get(raw_kind['name'], len(raw_sites)))
+        )
+    else:
+        changes = {}
+        if has_hubbard:
+            hubbard = structure.properties.hubbard
+            arrays = hubbard.get_arrays()
+            changes['hubbard'] = hubbard._take_parameters(  # pylint: disable=protected-access
+                np.arange(len(arrays['value'])),
+                inverse_permutation[arrays['atom_index']],
+                inverse_permutation[arrays['neighbour_index']],
+                arrays['translation'],
+            )
+        reordered = structure._take_sites(permutation, changes)  # pylint: disable=protected-access
+
+    reordered_parameters = [(atom_index, *parameter[1:2], neighbour_index, *parameter[3:])
+                            for parameter, atom_index, neighbour_index in zip(
+                                parameters,
+                                inverse_permutation[atom_indices].tolist(),
+                                inverse_permutation[neighbour_indices].tolist(),
+                            )]
+
+    return reordered, reordered_parameters
+
+
+def get_supercell_atomic_indices(indices, num_sites: int, translations):
+    """Return the atomic indices in 3x3x3 supercell, for all the atoms at once (see `get_supercell_atomic_index`).
+
+    :param indices: (P,) int array of the atomic indices in unit cell
+    :param num_sites: number of sites in structure
+    :param translations: (P, 3) int array of the translations of the atoms in the 3x3x3 supercell
+    :returns: (P,) int array of the atomic indices in supercell standardized with the QuantumESPRESSO loop
+    :raises ValueError: if some translations are not within the 3x3x3 supercell.
+    """
+    translations = np.asarray(translations, dtype=int).reshape(-1, 3)
+    if (np.abs(translations) > 1).any():
+        raise ValueError('The translations should be within the 3x3x3 supercell, i.e. made of -1, 0 and 1.')
+    return np.asarray(indices, dtype=int) + _QE_TRANSLATION_NUMBERS[(translations + 1) @ (9, 3, 1)] * num_sites
+
+
+def get_indices_and_translations(indices, num_sites: int):
+    """Return the atomic indices in unitcell and the associated translations from 3x3x3 QuantumESPRESSO supercell
+    indices, for all the atoms at once (see `get_index_and_translation`).
+
+    :param indices: (P,) int array of atomic indices
+    :param num_sites: number of sites in structure
+    :returns: tuple ((P,) int array, (P, 3) int array)
+    :raises ValueError: if some indices are not within the 3x3x3 supercell.
+    """
+    indices = np.asarray(indices, dtype=int)
+    numbers = indices // num_sites  # associated supercell numbers
+    if ((numbers < 0) | (numbers >= len(QE_TRANSLATIONS))).any():
+        raise ValueError(f'The atomic indices should be within the 3x3x3 supercell, i.e. smaller than {27 * num_sites}.')
+    return indices - num_sites * numbers, np.array(QE_TRANSLATIONS, dtype=int).reshape(-1, 3)[numbers]
+
+
+def _get_hubbard(structure):
+    """Return the `Hubbard` property of a StructureData, and its parameters as arrays."""
+    if structure._has_legacy_sites() or 'hubbard' not in structure.properties.get_stored_properties():  # pylint: disable=protected-access
+        raise ValueError('The structure has no `hubbard` property.')
+    hubbard = structure.properties.hubbard
+    return hubbard, hubbard.get_arrays()
+
+
+def get_hubbard_card(structure) -> str:
+    """Return QuantumESPRESSO `HUBBARD` input card for `pw.x`.
+
+    The supercell indices of all the neighbours are computed at once, and the lines are formatted in a single
+    pass over the columns of the parameters; the duplicated lines are dropped, keeping the first occurrence.
+
+    :param structure: the ``StructureData``, with the ``hubbard`` property.
+    """
+    hubbard, arrays = _get_hubbard(structure)
+    if hubbard.formulation not in ['dudarev', 'liechtenstein']:
+        raise ValueError(f'Hubbard formulation {hubbard.formulation} is not implemented.')
+
+    kind_names = _get_kind_names(structure)
+    atom_names = kind_names[arrays['atom_index']].tolist()
+    neighbour_names = kind_names[arrays['neighbour_index']].tolist()
+    values = arrays['value'].tolist()
+    hubbard_types = arrays['hubbard_type'].tolist()
+
+    if hubbard.formulation == 'liechtenstein':
+        lines = [
+            f'{pre}\t{atom_i}-{man_i} \t{value}\n'
+            for pre, atom_i, man_i, value in zip(hubbard_types, atom_names, hubbard.parameters['atom_manifold'], values)
+        ]
+    else:
+        # This variable is to meet QE implementation. If intersite interactions
+        # (+V) are present, onsite parameters might not be relabelled by the ``hp.x``
+        # code, causing a subsequent ``pw.x`` calculation to crash. That is,
+        # we need to avoid writing "U Co-3d 5.0", but instead "V Co-3d Co-3d 1 1 5.0".
+        is_intersite = (arrays['atom_index'] != arrays['neighbour_index']).any()
+        is_onsite = (
+            (kind_names[arrays['atom_index']] == kind_names[arrays['neighbour_index']]) &
+            (arrays['atom_manifold'] == arrays['neighbour_manifold']) & (not is_intersite)
+        )
+        prefixes = np.where(arrays['hubbard_type'] == 'J', 'J', np.where(is_onsite, 'U', 'V')).tolist()
+
+        index_i = (arrays['atom_index'] + 1).tolist()  # QE indices start from 1
+        index_j = (get_supercell_atomic_indices(
+            arrays['neighbour_index'], len(kind_names), arrays['translation']
+        ) + 1).tolist()
+
+        lines = [
+            f'{pre}\t{atom_i}-{man_i}\t{value}\n' if pre != 'V' else
+            f'{pre}\t{atom_i}-{man_i}\t{atom_j}-{man_j}\t{i}\t{j}\t{value}\n'
+            for pre, atom_i, man_i, atom_j, man_j, i, j, value in zip(
+                prefixes, atom_names, hubbard.parameters['atom_manifold'], neighbour_names,
+                hubbard.parameters['neighbour_manifold'], index_i, index_j, values
+            )
+        ]
+
+    return ' '.join([f'HUBBARD\t{hubbard.projectors}\n', *dict.fromkeys(lines)])
+
+
+def get_hubbard_file(structure) -> str:
+    """Return QuantumESPRESSO ``parameters.in`` data for ``pw.x```.
+
+    :param structure: the ``StructureData``, with the ``hubbard`` property.
+    """
+    hubbard, arrays = _get_hubbard(structure)
+    if not hubbard.formulation == 'dudarev':
+        raise ValueError('only `dudarev` formulation is implemented')
+
+    index_i = (arrays['atom_index'] + 1).tolist()  # QE indices start from 1
+    index_j = (get_supercell_atomic_indices(
+        arrays['neighbour_index'], len(structure.properties.positions.value), arrays['translation']
+    ) + 1).tolist()
+
+    return '#\tAtom 1\tAtom 2\tHubbard V (eV)\n' + ''.join(
+        f'\t{i}\t{j}\t{value}\n' for i, j, value in zip(index_i, index_j, arrays['value'].tolist())
+    )
+
+
+def parse_hubbard_dat(structure, filepath):
+    """Return the structure with the Hubbard parameters parsed from the `HUBBARD.dat` file of QuantumESPRESSO.
+
+    This function is needed for parsing the HUBBARD.dat file generated in a `hp.x` calculation. The file is read
+    line by line into the columns of the parameters, and the indices of all the parameters are then converted at once.
+
+    .. note:: overrides current Hubbard information.
+
+    :param structure: the ``StructureData`` associated to the file.
+    :param filepath: the filepath of the *HUBBARD.dat* to parse
+    :returns: a new (unstored) ``StructureData`` with the parsed ``hubbard`` property.
+    """
+    projectors = None
+    from aiida_atomistic.data.structure.properties.hubbard import Hubbard
+
+    hubbard_types, atom_tokens, neighbour_tokens, values, indices = [], [], [], [], []
+
+    # Samples of parsed lines are:
+    # ['U', 'Co-3d', '6.0']
+    # ['V', 'Co-3d', 'O-2p', '1', '4', '6.0']
+    with open(filepath, encoding='utf-8') as handle:
+        for line in handle:
+            data = line.split()
+            if not data or data[0] == '#':
+                continue
+            if projectors is None:
+                projectors = data[1].strip('([{}])')
+            elif data[0] == 'U':
+                hubbard_types.append('U')
+                atom_tokens.append(data[1])
+                neighbour_tokens.append(data[1])
+                values.append(data[2])
+                indices.append((1, 1))
+            else:
+                hubbard_types.append(data[0])
+                atom_tokens.append(data[1])
+                neighbour_tokens.append(data[2])
+                values.append(data[5])
+                indices.append((data[3], data[4]))
+
+    if projectors is None:
+        raise ValueError(f'The file {filepath} does not contain any Hubbard information.')
+
+    kind_names = _get_kind_names(structure)
+    num_sites = len(kind_names)
+    hubbard_types = np.array(hubbard_types, dtype=str)
+    atom_names, atom_manifolds = zip(*(token.partition('-')[::2] for token in atom_tokens)) if atom_tokens else ((), ())
+    neighbour_manifolds = [token.partition('-')[2] for token in neighbour_tokens]
+
+    # -1 because QE index starts from 1
+    indices = np.array(indices, dtype=int).reshape(-1, 2) - 1
+    atom_indices, _ = get_indices_and_translations(indices[:, 0], num_sites)
+    neighbour_indices, translations = get_indices_and_translations(indices[:, 1], num_sites)
+
+    # the onsite U parameters refer to the first site of their kind.
+    is_onsite = hubbard_types == 'U'
+    unique_names, first_sites = np.unique(kind_names, return_index=True)
+    onsite_names = np.array(atom_names, dtype=str)[is_onsite]
+    positions = np.minimum(np.searchsorted(unique_names, onsite_names), len(unique_names) - 1)
+    if len(onsite_names) and (unique_names[positions] != onsite_names).any():
+        raise ValueError('species or kind names not in structure')
+    atom_indices[is_onsite] = neighbour_indices[is_onsite] = first_sites[positions]
+    translations[is_onsite] = 0
+
+    parameters = {
+        'atom_index': atom_indices.tolist(),
+        'atom_manifold': list(atom_manifolds),
+        'neighbour_index': neighbour_indices.tolist(),
+        'neighbour_manifold': neighbour_manifolds,
+        'value': np.array(values, dtype=float).tolist(),
+        'translation': translations.tolist(),
+        'hubbard_type': hubbard_types.tolist(),
+    }
+    formulation = structure.properties.hubbard.formulation \
+        if 'hubbard' in structure.properties.get_stored_properties() else 'dudarev'
+
+    # the parsed columns are validated once, then used as they are (without the copy done by `replace`).
+    hubbard = Hubbard(parent=structure, parameters=parameters, projectors=projectors, formulation=formulation)
+    hubbard.check_dependencies({'positions': structure.properties.positions})
+    return structure._replace_trusted({  # pylint: disable=protected-access
+        'hubbard': {'parameters': hubbard.parameters, 'projectors': hubbard.projectors, 'formulation': hubbard.formulation}
+    })
@@ -1,5 +1,48 @@
 from aiida_atomistic.data.structure.properties.property_utils import BaseProperty
 
+################################################## Start: bulk validation of intra-site values:
+
+class ConstrainedSiteArray(list):
+    """
+    Pydantic type for the value of an intra-site property, i.e. a list with one entry per site.
+    
+    Instead of validating each entry separately (as for `List[List[float]]`), the value is converted to a 
+    numpy array only once, and dtype and shape are checked in bulk. The validated value is then returned as a 
+    (nested) list, as this is the format stored in the database. 
+    Do not use directly, but via the `conarray` function.
+    """
+    dtype = float
+    shape = ()
+    
+    @classmethod
+    def __get_validators__(cls):
+        yield cls.validate
+    
+    @classmethod
+    def validate(cls, value):
+        import numpy as np
+        
+        try:
+            array = np.asarray(value, dtype=cls.dtype)
+        except (ValueError, TypeError):
+            raise ValueError(f"The value cannot be converted to an array of '{cls.dtype.__name__}'.")
+        
+        if array.ndim != 1 + len(cls.shape) or array.shape[1:] != cls.shape:
+            raise ValueError(f"Each site should be represented by a '{cls.dtype.__name__}' array of shape {cls.shape}.")
+        
+        return array.tolist()
+    
+    
+def conarray(dtype: type = float, shape: tuple = ()):
+    """
+    Return the pydantic type for an intra-site value, with one entry per site of the given dtype and shape.
+    For example, `conarray(float, shape=(3,))` validates a list of 3-d vectors.
+    """
+    namespace = {"dtype": dtype, "shape": tuple(shape)}
+    return type("ConstrainedSiteArrayValue", (ConstrainedSiteArray,), namespace)
+
+################################################## End: bulk validation of intra-site values.
+
 ################################################## Start: IntraSiteProperty class:
 class IntraSiteProperty(BaseProperty):
     
@@ -8,58 +51,72 @@ class IntraSiteProperty(BaseProperty):
     """
     domain = "intra-site"
     
-    def to_kinds(self, thr: float = None):
-        import numpy as np
+    def to_kinds(self, thr: float = None, mode: str = "component"):
         """Get the kinds for a generic intra-site property. Can also be overridden in the specific property.
 
         ### Search algorithm:
 
-        Basically we compute the indexes array which locates each point in regions centered on our values, considering
-        min(values) as reference and each region being of width=thr:
+        For each element separately, we compute the indexes array which locates each point in regions centered on our 
+        values, considering the minimum value of the element as reference and each region being of width=thr:
         
-            indexes = np.array((prop_array-np.min(prop_array))/thr,dtype=int)
+            indexes = np.floor((prop_array-min_per_element)/thr)
         
         To understand this, try to draw the problem considering prop_array=[1,2,3,4] and thr=0.5.
-        This methods allows to efficiently clusterize the point using the defined threshold.
+        The kinds are then the unique (element, indexes) rows, as obtained via `np.unique(axis=0, return_inverse=True)`:
+        the clustering is done in O(N log N), does not depend on the order of the sites and does not mix different elements.
+        The kinds are labelled from zero, in the order of the sorted (element, indexes) rows.
         
-        At the end, we reorder the kinds from zero (to have ordered list like Li0, Li1...).
-        Basically we define the set of unordered kinds, and the range(len(set(kinds))) being the group of orderd kinds.
-        Then we basically do a mapping with the np.where().
+        Vector-valued properties (e.g. the three components of a magnetic moment) are supported: the regions are 
+        defined for each component (`mode="component"`) or only for the norm of the vectors (`mode="norm"`).
         
         Args:
             thr (float, optional): the threshold to consider two atoms of the same element to be the same kind. 
                 Defaults to structure.properties.<property>.default_kind_threshold.
                 If thr==0, we just return different kind for each site with the original property value. This is 
                 needed when we have tags for each site, in the get_kind method of StructureData.
+            mode (str, optional): for vector-valued properties, "component" (default) to apply the threshold to each 
+                component, or "norm" to apply it to the norm of the vectors.
             
         Returns:
-            kinds_labels: array of kinds (as integers) associated to the charge property. they are integers so that in the `get_kinds()` method
+            kinds_labels: array of kinds (as integers) associated to the property. they are integers so that in the `get_kinds()` method
                              can be used in the matrix representation (the k.T).
-            kinds_values: list of the associated property value to each kind detected.
+            kinds_values: array of the associated property value to each site, i.e. the value of its kind: the minimum value
+                             (component-wise) among the sites of the kind, or the value of its first site if `mode="norm"`.
         """ 
+        import numpy as np
+        
         symbols_array = np.array(self.parent.properties.symbols.value)
-        prop_array = np.array(self.value)
+        prop_array = np.array(self.value, dtype=float)
         
-        if not thr: 
+        if thr is None: 
             thr = self.default_kind_threshold
         elif thr == 0:
-            return np.array(range(len(prop_array))), prop_array
+            return np.arange(len(prop_array)), prop_array
+        
+        values = prop_array.reshape(len(prop_array), -1)
+        if mode == "norm":
+            values = np.linalg.norm(values, axis=1, keepdims=True)
+        elif mode != "component":
+            raise ValueError(f"Unknown mode '{mode}': it should be 'component' or 'norm'.")
         
-        # list for the value of the property for each generated kind.
-        kinds_values = np.zeros(len(symbols_array))
-        indexes = np.array((prop_array-np.min(prop_array))/thr,dtype=int)
+        # regions defined starting from the minimum value of each element.
+        _, symbols_labels = np.unique(symbols_array, return_inverse=True)
+        symbols_labels = symbols_labels.reshape(-1)
+        minima = np.full((symbols_labels.max()+1, values.shape[1]), np.inf)
+        np.minimum.at(minima, symbols_labels, values)
+        indexes = np.floor((values-minima[symbols_labels])/thr).astype(int)
         
-        # Here we select the closest value present in the property values
-        set_indexes = set(indexes)
-        for index in set_indexes:
-            where_index_in_indexes = np.where(indexes == index)[0]
-            kinds_values[where_index_in_indexes] = np.min(prop_array[where_index_in_indexes])
+        _, kinds_labels = np.unique(np.column_stack([symbols_labels, indexes]), axis=0, return_inverse=True)
+        kinds_labels = kinds_labels.reshape(-1)
         
-        # here we reorder from zero the kinds.
-        list_set_indexes = list(set_indexes)
-        kinds_labels = np.zeros(len(symbols_array),dtype=int)
-        for i in range(len(list_set_indexes)):
-            kinds_labels[np.where(indexes==list_set_indexes[i])[0]] = i
+        # Here we select the value of each kind.
+        if mode == "norm":
+            first_sites = np.full(kinds_labels.max()+1, len(prop_array))
+            np.minimum.at(first_sites, kinds_labels, np.arange(len(prop_array)))
+            kinds_values = prop_array[first_sites]
+        else:
+            kinds_values = np.full((kinds_labels.max()+1,)+prop_array.shape[1:], np.inf)
+            np.minimum.at(kinds_values, kinds_labels, prop_array)
         
-        return kinds_labels, kinds_values
+        return kinds_labels, kinds_values[kinds_labels]
 ################################################## End: IntraSiteProperty class.
\ No newline at end of file
@@ -1,13 +1,9 @@
 from typing import List
-from pydantic import Field, validator
-
-from aiida.common.constants import elements
+from pydantic import Field
 
 from aiida_atomistic.data.structure.properties.intra_site import IntraSiteProperty
 
-################################################## Start: Symbols property:
-
-_valid_symbols = tuple(i['symbol'] for i in elements.values())
+################################################## Start: Kinds property:
 
 class Kinds(IntraSiteProperty):
     """
@@ -15,19 +11,8 @@ class Kinds(IntraSiteProperty):
     """
     domain = "intra-site"
     value: List[str]
+    # The consistency with the number of positions (i.e. of symbols) is checked in the PropertyCollector.
     
-    @validator("value", always=True)
-    def validate_kinds(cls,value,values):
- 
-        properties = values["parent"].base.attributes.get("_property_attributes")
-              
-        if not "symbols" in properties.keys():
-            raise ValueError("If you define kinds, you should define also the corresponding symbols.")
-        elif not len(value) == len(properties["symbols"]["value"]):
-            raise ValueError("The number of provided kinds should match the number of symbols.")
-        
-        # Check that the properties are not inconsistent with respect to the defined kinds: i.e. 
-        # same kinds should have same properties.
-        
-        return value
-################################################## End: PBC property.
\ No newline at end of file
+    # Check that the properties are not inconsistent with respect to the defined kinds: i.e. 
+    # same kinds should have same properties.
+################################################## End: Kinds property.
\ No newline at end of file
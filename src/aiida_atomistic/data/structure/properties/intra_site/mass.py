@@ -1,9 +1,8 @@
-from typing import List, Literal
-from pydantic import Field, validator, root_validator
+from pydantic import Field
 
 from aiida.common.constants import elements
 
-from aiida_atomistic.data.structure.properties.intra_site import IntraSiteProperty
+from aiida_atomistic.data.structure.properties.intra_site import IntraSiteProperty, conarray
 
 _atomic_masses = {el['symbol']: el['mass'] for el in elements.values()}
 
@@ -15,29 +14,21 @@ class Mass(IntraSiteProperty):
     """
     default_kind_threshold = 1e-3
     # units... maybe specify in the docs.
-    value: List[float] = Field(default=None)
+    value: conarray(float) = Field(default=None)
+    # The consistency with the number of positions is checked in the PropertyCollector.
 
-    @validator("value", always=True)
-    def validate_masses(cls,value,values):
-        # I have to use the _property_attributes, as accessing directly parent.properties gives recursion error.
-        # Maybe it is possible to change how we get the properties? 
-        properties = values["parent"].base.attributes.get("_property_attributes")
+    @classmethod
+    def get_default(cls, properties):
+        """
+        The default masses are the atomic masses of the symbols. Called by the PropertyCollector, if the masses are not provided.
+        """
+        import numpy as np
         
-        if not "positions" in properties:
-            # this also validated that we have symbols.
-            raise ValueError("If you define masses, you should define also the corresponding positions.")
+        # we look up the mass only once per element.
+        unique_symbols, inverse = np.unique(properties["symbols"]["value"], return_inverse=True)
+        try:
+            unique_masses = np.array([_atomic_masses[symbol] for symbol in unique_symbols])
+        except KeyError as exc:
+            raise ValueError(f"Cannot set the default mass for the unexpected symbol {exc}.")
         
-        if not value:
-            # This is done if we do not define the default?
-            symbols = properties["symbols"]["value"]
-            
-            # Here I play on the fact that then the dictionary is updated, so I will have the new masses also 
-            # in the node.
-            properties["mass"]["value"] = [_atomic_masses[symbol] for symbol in symbols]
-            return properties["mass"]["value"]
-        
-        if not len(properties["mass"]["value"]) == len(properties["positions"]["value"]):
-            raise ValueError("The number of provided masses should either be zero or match the number of positions.")
-        
-        
-        return value
\ No newline at end of file
+        return unique_masses[inverse].tolist()
\ No newline at end of file
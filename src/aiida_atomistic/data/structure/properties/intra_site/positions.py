@@ -1,29 +1,56 @@
-from typing import List
 from pydantic import Field, validator
 
-from aiida_atomistic.data.structure.properties.intra_site import IntraSiteProperty
+from aiida_atomistic.data.structure.properties.intra_site import IntraSiteProperty, conarray
 
 ################################################## Start: Positions property:
 
-_tolerance_distance = 1e-3 # tolerance to define that two atoms are superimposing. 
+_tolerance_distance = 1e-3 # tolerance to define that two atoms are superimposing.
 
 class Positions(IntraSiteProperty):
     """
-    The sites property. 
+    The sites property.
+
+    If `check_overlaps` is True, the sites (also of different periodic images) closer than `overlap_tolerance` are
+    rejected, e.g. `{"value": [[0, 0, 0], [0, 0, 1e-4]], "check_overlaps": True}` raises a ValueError.
     """
-    value: List[List[float]] = Field(default=None)
+    # (1) validate the list of 3-d coordinates: this is done in bulk by the `conarray` type.
+    value: conarray(float, shape=(3,)) = Field(default=None)
     #kind_tags: List[str] = Field(default=None)
-    
+    check_overlaps: bool = Field(default=False)
+    overlap_tolerance: float = Field(default=_tolerance_distance, gt=0)
+
     @validator("value", always=True)
     def validate_positions(cls,value,values):
-        # (1) validate the list of 3-d coordinates:
-        for position in value:
-            if len(position) != 3:
-                return ValueError("Each position should be represented by an array of length three (x,y,z)")
-            
-        # (2) check that all positions are unique:
-        # However, this is not checked in the orm.StructureData, so we will implement later.
-        
+        # (2) the check that all positions are unique is optional, see `check_overlapping_sites`.
         return value
-        
-################################################## End: Positions property.
\ No newline at end of file
+
+    def check_dependencies(self, dependencies):
+        """
+        Check that no two sites are closer than the `overlap_tolerance`, taking into account the periodic images
+        (of the validated cell and pbc). The sites are hashed on a grid of spacing `overlap_tolerance`, so that only 
+        the sites in adjacent grid cells are compared, in linear time.
+        """
+        if not self.check_overlaps:
+            return
+
+        import numpy as np
+        from aiida_atomistic.data.structure.neighbors import get_neighbor_list
+
+        pbc = dependencies.get("pbc")
+        neighbor_list = get_neighbor_list(
+            self.value,
+            dependencies["cell"].value,
+            pbc.value if pbc is not None else [True]*3,
+            self.overlap_tolerance,
+            )
+
+        first = np.repeat(np.arange(len(neighbor_list.offsets) - 1), np.diff(neighbor_list.offsets))
+        overlapping = np.flatnonzero(first < neighbor_list.neighbors)
+        if len(overlapping) > 0:
+            pairs = [(int(first[k]), int(neighbor_list.neighbors[k])) for k in overlapping[:10]]
+            raise ValueError(
+                f"Found {len(overlapping)} pairs of overlapping sites (closer than {self.overlap_tolerance}), "
+                f"e.g. the sites {pairs}."
+                )
+
+################################################## End: Positions property.
@@ -1,9 +1,8 @@
-from typing import List, Literal
 from pydantic import Field, validator
 
 from aiida.common.constants import elements
 
-from aiida_atomistic.data.structure.properties.intra_site import IntraSiteProperty
+from aiida_atomistic.data.structure.properties.intra_site import IntraSiteProperty, conarray
 
 ################################################## Start: Symbols property:
 
@@ -15,19 +14,18 @@ class Symbols(IntraSiteProperty):
     """
     domain = "intra-site"
     # units... maybe specify in the docs.
-    value: List[Literal[_valid_symbols]]
+    value: conarray(str)
     
     @validator("value", always=True)
     def validate_symbols(cls,value,values):
-        # I have to use the _property_attributes, as accessing directly parent.properties gives recursion error.
-        # Maybe it is possible to change how we get the properties? 
-        properties = values["parent"].base.attributes.get("_property_attributes")
-        if not "positions" in properties.keys():
-            raise ValueError("If you define symbols, you should define also the corresponding positions.")
-        elif not len(value) == len(properties["positions"]["value"]):
-            raise ValueError("The number of provided symbols should match the number of positions.")
-            # what if we prefer to give a guess? like the following:
-            #return [value[0]]*len(values["parent"].base.attributes.get("_property_attributes")["positions"]["value"])
-                
+        import numpy as np
+        
+        # Bulk check of the symbols: we look only at the unique ones.
+        unique_symbols = np.unique(value)
+        invalid_symbols = unique_symbols[~np.isin(unique_symbols, _valid_symbols)]
+        if len(invalid_symbols) > 0:
+            raise ValueError(f"unexpected symbols {invalid_symbols.tolist()}; permitted: {_valid_symbols}")
+        
+        # The consistency with the number of positions is checked in the PropertyCollector.
         return value
 ################################################## End: PBC property.
\ No newline at end of file
@@ -57,6 +57,15 @@ class BaseProperty(BaseModel):
         frozen = True                  # No changes allowed: immutability
         extra = 'forbid'               # No extra arguments or attributes allowed.
         arbitrary_types_allowed = True # You can remove if also StructureData inherits from BaseModel.
+    
+    def check_dependencies(self, dependencies):
+        """
+        Checks which need the other properties: called by the collector after the validation of the properties this 
+        one depends on (see `PropertyCollector.property_dependencies`), with their validated models, e.g. 
+        `{"cell": Cell(...), "pbc": Pbc(...)}` for the positions.
+        
+        :raise ValueError: if the property is not consistent with the other properties.
+        """
 
 
 ################################################## End: Base Class for a property.
@@ -118,13 +127,26 @@ class PropertyMixinMetaclass(ABCMeta):
 
 class HasPropertyMixin(metaclass=PropertyMixinMetaclass):
     _valid_properties = set()
+    
+    def __init__(self):
+        # Memoized property instances (key: property name), so that each pydantic model is validated only once.
+        # This is safe as the properties are immutable after the initialization.
+        self._property_models = {}
 
     def _template_property(self, type_hint, attr):
-       
-        return type_hint(
+        
+        try:
+            return self._property_models[attr]
+        except KeyError:
+            pass
+        
+        property_model = type_hint(
             parent=self._parent,
             **self.get_property_attribute(attr)
         )
+        self._property_models[attr] = property_model
+        
+        return property_model
         '''except: 
             # In case we initialise to
             return type_hint(
@@ -161,9 +183,8 @@ class HasPropertyMixin(metaclass=PropertyMixinMetaclass):
 
     def get_stored_properties(self):
         # Get the properties that you already set
-        property_attributes = self._parent.base.attributes.get("_property_attributes")
         return list(set(self.get_supported_properties()).intersection(
-            property_attributes.keys()
+            self._property_attributes.keys()
         ))
         
 ################################################## End: Mixin classes.
@@ -0,0 +1,49 @@
+"""
+Fixtures for the benchmarks of the StructureData.
+
+The benchmarks are run with pytest-benchmark, against the temporary AiiDA profile of the test suite. They are 
+skipped by the default `pytest` run (`--benchmark-skip` in the `addopts`), and run with `tox -e benchmarks`, i.e.:
+
+    pytest tests/benchmarks --benchmark-only --benchmark-json=benchmarks.json
+    
+Results of different commits can be compared with `pytest-benchmark compare`, or saved and compared with the 
+`--benchmark-autosave` and `--benchmark-compare` options.
+"""
+import numpy as np
+import pytest
+
+# Number of sites and sets of properties used in the benchmarks.
+N_SITES = [10, 100, 1000, 10000, 100000]
+PROPERTY_SETS = {
+    "minimal": ["cell", "positions", "symbols"],
+    "all": ["cell", "pbc", "positions", "symbols", "mass", "charge", "kinds"],
+}
+
+
+@pytest.fixture
+def generate_properties():
+    """
+    Return a function which generates the dictionary of properties of a random structure with `n_sites` sites, 
+    two elements and `n_charges` possible charges per site.
+    """
+    def _generate_properties(n_sites, properties="all", n_charges=4, seed=0):
+        rng = np.random.default_rng(seed)
+        symbols = np.array(["Li", "Cu"])[rng.integers(0, 2, n_sites)]
+        charge = rng.integers(0, n_charges, n_sites)
+        
+        all_properties = {
+            "cell": {"value": (np.eye(3)*10*n_sites**(1/3)).tolist()},
+            "pbc": {"value": [True, True, True]},
+            "positions": {"value": (rng.random((n_sites, 3))*10*n_sites**(1/3)).tolist()},
+            "symbols": {"value": symbols.tolist()},
+            "mass": {"value": np.where(symbols == "Li", 6.941, 63.546).tolist()},
+            "charge": {"value": charge.astype(float).tolist()},
+            "kinds": {"value": np.char.add(symbols, charge.astype(str)).tolist()},
+        }
+        
+        if isinstance(properties, str):
+            properties = PROPERTY_SETS[properties]
+        
+        return {pname: all_properties[pname] for pname in properties}
+    
+    return _generate_properties
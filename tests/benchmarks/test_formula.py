@@ -0,0 +1,82 @@
+"""
+Benchmarks for the `StructureData.get_formula` and `StructureData.get_composition` methods, compared with the
+previous implementation, which counted each distinct symbol with `list.count` (see `reference_composition`).
+"""
+import pytest
+
+from aiida_atomistic.data.structure import StructureData, get_formula
+
+FORMULA_MODES = ["hill", "hill_compact", "reduce", "count", "count_compact"]
+COMPOSITION_MODES = ["full", "reduced", "fractional"]
+
+
+def reference_composition(symbols_list, mode="full"):
+    """The previous implementation of `get_composition`, on the list of symbols."""
+    import numpy as np
+    symbols_set = set(symbols_list)
+
+    if mode == 'full':
+        return {symbol: symbols_list.count(symbol) for symbol in symbols_set}
+
+    if mode == 'reduced':
+        gcd = np.gcd.reduce([symbols_list.count(symbol) for symbol in symbols_set])
+        return {symbol: (symbols_list.count(symbol) / gcd) for symbol in symbols_set}
+
+    sum_comp = sum(symbols_list.count(symbol) for symbol in symbols_set)
+    return {symbol: symbols_list.count(symbol) / sum_comp for symbol in symbols_set}
+
+
+N_SITES = 100000
+SYMBOLS = ["H", "Li", "Be", "B", "C", "N", "O", "F", "Na", "Mg", "Al", "Si", "P", "S", "Cl", "K", "Ca", "Ti", "Fe", "Cu"]
+
+
+@pytest.fixture
+def symbols_list():
+    """Random list of `N_SITES` symbols, of 20 different elements."""
+    import numpy as np
+    return np.array(SYMBOLS)[np.random.default_rng(0).integers(0, len(SYMBOLS), N_SITES)].tolist()
+
+
+@pytest.fixture
+def structure(generate_properties, symbols_list):
+    properties = generate_properties(N_SITES, "minimal")
+    properties["symbols"] = {"value": symbols_list}
+    return StructureData(properties=properties)
+
+
+@pytest.mark.benchmark(group="get_formula")
+@pytest.mark.parametrize("mode", FORMULA_MODES)
+def test_get_formula(benchmark, structure, mode):
+    formula = benchmark(structure.get_formula, mode=mode)
+
+    assert formula
+
+
+@pytest.mark.benchmark(group="get_composition")
+@pytest.mark.parametrize("mode", COMPOSITION_MODES)
+def test_get_composition(benchmark, structure, symbols_list, mode):
+    composition = benchmark(structure.get_composition, mode=mode)
+
+    assert composition == pytest.approx(reference_composition(symbols_list, mode))
+
+
+@pytest.mark.benchmark(group="get_composition")
+@pytest.mark.parametrize("mode", COMPOSITION_MODES)
+def test_get_composition_reference(benchmark, symbols_list, mode):
+    composition = benchmark(reference_composition, symbols_list, mode)
+
+    assert set(composition) == set(SYMBOLS)
+
+
+@pytest.mark.benchmark(group="get_formula-legacy-sites")
+@pytest.mark.parametrize("mode", FORMULA_MODES)
+def test_get_formula_legacy_sites(benchmark, symbols_list, mode):
+    """Structure defined via the (legacy) sites: the symbols strings are computed once per kind."""
+    import ase
+
+    atoms = ase.Atoms(symbols_list, cell=[100, 100, 100], pbc=True)
+    structure = StructureData(ase=atoms)
+
+    formula = benchmark(structure.get_formula, mode=mode)
+
+    assert formula == get_formula(atoms.get_chemical_symbols(), mode=mode)
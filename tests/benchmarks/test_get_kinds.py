@@ -0,0 +1,38 @@
+"""
+Benchmarks for the `StructureData.get_kinds` method, to check its scaling with the number of sites.
+"""
+import pytest
+
+from aiida_atomistic.data.structure import StructureData
+
+
+@pytest.mark.benchmark(group="get_kinds")
+@pytest.mark.parametrize("n_sites", [100, 1000, 10000])
+def test_get_kinds(benchmark, generate_properties, n_sites):
+    structure = StructureData(properties=generate_properties(n_sites, ["cell", "positions", "symbols", "charge"]))
+    
+    kinds, _ = benchmark(structure.get_kinds)
+    
+    assert len(kinds) == n_sites
+    assert len(set(kinds)) <= 8
+
+
+@pytest.mark.benchmark(group="get_kinds-many-kinds")
+@pytest.mark.parametrize("n_sites", [100, 1000, 10000])
+def test_get_kinds_many_kinds(benchmark, generate_properties, n_sites):
+    """Worst case of the previous O(N^2) implementation: (almost) each site is a different kind."""
+    structure = StructureData(properties=generate_properties(n_sites, ["cell", "positions", "symbols", "charge"], n_charges=n_sites))
+    
+    kinds, _ = benchmark(structure.get_kinds, custom_thr={"charge": 0.5})
+    
+    assert len(kinds) == n_sites
+
+
+@pytest.mark.benchmark(group="to_kinds")
+@pytest.mark.parametrize("n_sites", [1000, 10000, 100000])
+def test_to_kinds(benchmark, generate_properties, n_sites):
+    structure = StructureData(properties=generate_properties(n_sites, ["cell", "positions", "symbols", "charge"], n_charges=n_sites))
+    
+    labels, _ = benchmark(structure.properties.charge.to_kinds, thr=0.5)
+    
+    assert len(labels) == n_sites
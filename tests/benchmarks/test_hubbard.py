@@ -0,0 +1,117 @@
+"""
+Benchmarks for the manipulation of the Hubbard parameters (see the `properties.hubbard_qe_utils` module).
+"""
+import numpy as np
+import pytest
+
+from aiida_atomistic.data.structure import StructureData
+from aiida_atomistic.data.structure.properties.hubbard_qe_utils import (
+    get_hubbard_card,
+    get_hubbard_for_supercell,
+    parse_hubbard_dat,
+    reorder_atoms,
+)
+
+from .conftest import N_SITES
+
+
+def run(benchmark, function, *args, **kwargs):
+    """Benchmark `function`, with a small number of rounds as the largest structures take up to seconds."""
+    return benchmark.pedantic(function, args=args, kwargs=kwargs, rounds=3, iterations=1, warmup_rounds=1)
+
+
+def generate_parameters(structure, cutoff):
+    """Return the onsite U parameters of all the sites, and the intersite V parameters of all the pairs within `cutoff`."""
+    neighbor_list = structure.get_neighbor_list(cutoff)
+    n_sites = len(neighbor_list.offsets) - 1
+    first = np.repeat(np.arange(n_sites), np.diff(neighbor_list.offsets))
+
+    parameters = [(i, '3d', i, '3d', 5.0, (0, 0, 0), 'U') for i in range(n_sites)]
+    parameters += [
+        (i, '3d', j, '2p', 1.0, tuple(image), 'V')
+        for i, j, image in zip(first.tolist(), neighbor_list.neighbors.tolist(), neighbor_list.images.tolist())
+    ]
+    return parameters
+
+
+@pytest.mark.benchmark(group="get_hubbard_for_supercell")
+@pytest.mark.parametrize("n_images", [2, 5])
+def test_get_hubbard_for_supercell(benchmark, generate_properties, n_images):
+    """Parameters of a 20-site cell (about 300, within 15 angstrom) mapped onto a supercell of `20*n_images**3` sites."""
+    structure = StructureData(properties=generate_properties(20))
+    supercell, _ = structure.make_supercell([n_images]*3)
+    parameters = generate_parameters(structure, 15.)
+
+    mapped = run(benchmark, get_hubbard_for_supercell, structure, supercell, parameters)
+
+    assert len(mapped) == len(parameters) * n_images**3
+
+
+@pytest.mark.benchmark(group="reorder_atoms")
+@pytest.mark.parametrize("n_sites", N_SITES[:-1])
+def test_reorder_atoms(benchmark, generate_properties, n_sites):
+    """Hubbard parameters (U on all the sites, V within 10 angstrom) of structures with all the properties."""
+    structure = StructureData(properties=generate_properties(n_sites))
+    parameters = generate_parameters(structure, 10.)
+
+    reordered, reordered_parameters = run(benchmark, reorder_atoms, structure, parameters)
+
+    assert len(reordered_parameters) == len(parameters)
+
+
+@pytest.mark.benchmark(group="append_hubbard_parameters")
+@pytest.mark.parametrize("n_sites", N_SITES[:-1])
+def test_append_hubbard_parameters(benchmark, generate_properties, n_sites):
+    """Bulk append of the V parameters within 10 angstrom to the U parameters of all the sites."""
+    parameters = generate_parameters(StructureData(properties=generate_properties(n_sites)), 10.)
+    properties = generate_properties(n_sites)
+    properties["hubbard"] = {"parameters": parameters[:n_sites]}
+    structure = StructureData(properties=properties)
+
+    new_structure = run(benchmark, structure.properties.hubbard.append_hubbard_parameters, parameters[n_sites:])
+
+    assert new_structure.properties.hubbard.has_parameter(*parameters[-1][:4], parameters[-1][5], 'V')
+
+
+@pytest.mark.benchmark(group="initialize_intersites_hubbard")
+@pytest.mark.parametrize("number_of_shells", [1, 3])
+@pytest.mark.parametrize("n_sites", N_SITES[:-1])
+def test_initialize_intersites_hubbard(benchmark, generate_properties, n_sites, number_of_shells):
+    """V parameters between all the Cu and Li sites, within the first shells of neighbours."""
+    structure = StructureData(properties={**generate_properties(n_sites, properties="minimal"), "hubbard": {"parameters": []}})
+
+    new_structure = run(
+        benchmark, structure.properties.hubbard.initialize_intersites_hubbard, 'Cu', '3d', 'Li', '2s',
+        number_of_shells=number_of_shells,
+    )
+
+    assert len(new_structure.properties.hubbard.parameters['value']) >= structure.properties.symbols.value.count('Cu')
+
+
+@pytest.mark.benchmark(group="get_hubbard_card")
+@pytest.mark.parametrize("n_sites", N_SITES[:-1])
+def test_get_hubbard_card(benchmark, generate_properties, n_sites):
+    """HUBBARD card of the parameters (U on all the sites, V within 10 angstrom) of structures with all the properties."""
+    properties = generate_properties(n_sites)
+    properties["hubbard"] = {"parameters": generate_parameters(StructureData(properties=generate_properties(n_sites)), 10.)}
+    structure = StructureData(properties=properties)
+
+    card = run(benchmark, get_hubbard_card, structure)
+
+    assert card.startswith('HUBBARD')
+
+
+@pytest.mark.benchmark(group="parse_hubbard_dat")
+@pytest.mark.parametrize("n_sites", N_SITES[:-1])
+def test_parse_hubbard_dat(benchmark, generate_properties, n_sites, tmp_path):
+    """HUBBARD.dat file with the parameters (U on all the sites, V within 10 angstrom), parsed back."""
+    properties = generate_properties(n_sites)
+    parameters = generate_parameters(StructureData(properties=generate_properties(n_sites)), 10.)
+    properties["hubbard"] = {"parameters": parameters}
+    structure = StructureData(properties=properties)
+    filepath = tmp_path / 'HUBBARD.dat'
+    filepath.write_text(get_hubbard_card(structure))
+
+    parsed = run(benchmark, parse_hubbard_dat, structure, filepath)
+
+    assert len(parsed.properties.hubbard.parameters['value']) == len(parameters)
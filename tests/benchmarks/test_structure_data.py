@@ -0,0 +1,128 @@
+"""
+Benchmarks for the main operations on the StructureData, as a function of the number of sites and of the 
+number of properties (see the `N_SITES` and `PROPERTY_SETS` in the conftest).
+"""
+import pytest
+
+from aiida.orm import load_node
+
+from aiida_atomistic.data.structure import StructureData
+
+from .conftest import N_SITES, PROPERTY_SETS
+
+
+def run(benchmark, function, *args, **kwargs):
+    """Benchmark `function`, with a small number of rounds as the largest structures take up to seconds."""
+    return benchmark.pedantic(function, args=args, kwargs=kwargs, rounds=3, iterations=1, warmup_rounds=1)
+
+
+@pytest.mark.benchmark(group="construction")
+@pytest.mark.parametrize("properties", PROPERTY_SETS.keys())
+@pytest.mark.parametrize("n_sites", N_SITES)
+def test_construction(benchmark, generate_properties, n_sites, properties):
+    properties = generate_properties(n_sites, properties)
+    
+    structure = run(benchmark, StructureData, properties=properties)
+    
+    assert len(structure.properties.positions.value) == n_sites
+
+
+@pytest.mark.benchmark(group="properties-access")
+@pytest.mark.parametrize("properties", PROPERTY_SETS.keys())
+@pytest.mark.parametrize("n_sites", N_SITES)
+def test_properties_access(benchmark, generate_properties, n_sites, properties):
+    """Access all the properties of a stored structure, loaded from the database."""
+    structure = StructureData(properties=generate_properties(n_sites, properties))
+    structure.store()
+    
+    def access():
+        loaded = load_node(structure.pk)
+        return [getattr(loaded.properties, pname).value for pname in loaded.properties.get_stored_properties()]
+    
+    values = run(benchmark, access)
+    
+    assert len(values) == len(structure.properties.get_stored_properties())
+
+
+@pytest.mark.benchmark(group="to_dict")
+@pytest.mark.parametrize("properties", PROPERTY_SETS.keys())
+@pytest.mark.parametrize("n_sites", N_SITES)
+def test_to_dict(benchmark, generate_properties, n_sites, properties):
+    structure = StructureData(properties=generate_properties(n_sites, properties))
+    
+    dictionary = run(benchmark, structure.to_dict)
+    
+    assert len(dictionary["positions"]["value"]) == n_sites
+
+
+@pytest.mark.benchmark(group="store-load")
+@pytest.mark.parametrize("properties", PROPERTY_SETS.keys())
+@pytest.mark.parametrize("n_sites", N_SITES)
+def test_store_load(benchmark, generate_properties, n_sites, properties):
+    properties = generate_properties(n_sites, properties)
+    
+    def store_load():
+        structure = StructureData(properties=properties)
+        structure.store()
+        return load_node(structure.pk).properties.positions.value
+    
+    positions = run(benchmark, store_load)
+    
+    assert len(positions) == n_sites
+
+
+@pytest.mark.benchmark(group="get_ase")
+@pytest.mark.parametrize("n_sites", N_SITES)
+def test_get_ase(benchmark, generate_properties, n_sites):
+    structure = StructureData(properties=generate_properties(n_sites))
+    
+    atoms = run(benchmark, structure.get_ase)
+    
+    assert len(atoms) == n_sites
+
+
+@pytest.mark.benchmark(group="get_pymatgen")
+@pytest.mark.parametrize("n_sites", N_SITES)
+def test_get_pymatgen(benchmark, generate_properties, n_sites):
+    structure = StructureData(properties=generate_properties(n_sites))
+    
+    pymatgen_structure = run(benchmark, structure.get_pymatgen)
+    
+    assert len(pymatgen_structure) == n_sites
+
+
+@pytest.mark.benchmark(group="export")
+@pytest.mark.parametrize("fileformat", ["xsf", "xyz", "chemdoodle"])
+@pytest.mark.parametrize("n_sites", N_SITES)
+def test_export(benchmark, generate_properties, tmp_path, n_sites, fileformat):
+    """Export to a file, with the streaming writers."""
+    structure = StructureData(properties=generate_properties(n_sites))
+    path = tmp_path / f"structure.{fileformat}"
+    
+    files = run(benchmark, structure.export, str(path), fileformat=fileformat, overwrite=True)
+    
+    assert files == [str(path)]
+
+
+@pytest.mark.benchmark(group="get_neighbor_list")
+@pytest.mark.parametrize("n_sites", N_SITES)
+def test_get_neighbor_list(benchmark, generate_properties, n_sites):
+    """Neighbor list with a cutoff of 10 angstrom, i.e. about 4 neighbors per site (0.001 sites per A^3)."""
+    structure = StructureData(properties=generate_properties(n_sites))
+    
+    neighbor_list = run(benchmark, structure.get_neighbor_list, 10.)
+    
+    assert len(neighbor_list.offsets) == n_sites + 1
+
+
+@pytest.mark.benchmark(group="make_supercell")
+@pytest.mark.parametrize(
+    "matrix, n_images", [([10, 10, 10], 1000), ([[5, 5, 0], [-5, 5, 0], [0, 0, 5]], 250)], ids=["diagonal", "general"]
+    )
+def test_make_supercell(benchmark, generate_properties, matrix, n_images):
+    """Supercells of a 100-site cell."""
+    structure = StructureData(properties=generate_properties(100))
+    
+    supercell, site_map = run(benchmark, structure.make_supercell, matrix)
+    
+    assert len(site_map) == 100*n_images
@@ -0,0 +1,517 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from aiida_atomistic.data.structure import StructureData
+from aiida_atomistic.data.structure.properties.hubbard_qe_utils import (
+    QE_TRANSLATIONS,
+    get_hubbard_card,
+    get_hubbard_file,
+    get_hubbard_for_supercell,
+    get_indices_and_translations,
+    get_supercell_atomic_indices,
+    get_supercell_site_map,
+    parse_hubbard_dat,
+    reorder_atoms,
+)
+
+
+@pytest.fixture
+def hubbard_properties():
+    """Properties of a (triclinic) rock-salt like cell, with two Co and two O sites."""
+    return {
+        "cell": {"value": [[4.0, 0.0, 0.0], [0.5, 4.0, 0.0], [0.0, 0.3, 4.0]]},
+        "pbc": {"value": [True, True, True]},
+        "positions": {"value": [[0.0, 0.0, 0.0], [2.0, 2.0, 0.0], [2.0, 0.1, 0.2], [0.1, 2.0, 2.0]]},
+        "symbols": {"value": ["Co", "Co", "O", "O"]},
+    }
+
+
+@pytest.fixture
+def hubbard_parameters():
+    return [
+        (0, '3d', 0, '3d', 5.0, (0, 0, 0), 'U'),
+        (0, '3d', 2, '2p', 1.0, (0, 0, 0), 'V'),
+        (0, '3d', 3, '2p', 0.5, (-1, 0, 1), 'V'),
+        (1, '3d', 2, '2p', 0.7, (0, 1, -1), 'V'),
+        (3, '2p', 1, '3d', 0.2, (2, 0, 0), 'V'),
+    ]
+
+
+def brute_force_hubbard_for_supercell(structure, supercell, parameters):
+    """Map the parameters by matching the cartesian positions of each neighbour, one at a time."""
+    positions = np.array(structure.properties.positions.value)
+    cell = np.array(structure.properties.cell.value)
+    supercell_positions = np.array(supercell.properties.positions.value)
+    supercell_cell = np.array(supercell.properties.cell.value)
+
+    def lattice_vector(vector, basis):
+        fractional = vector @ np.linalg.inv(basis)
+        return np.rint(fractional).astype(int) if np.allclose(fractional, np.rint(fractional), atol=1e-6) else None
+
+    mapped = []
+    for atom_index, atom_manifold, neighbour_index, neighbour_manifold, value, translation, hubbard_type in parameters:
+        for i, position in enumerate(supercell_positions):
+            if lattice_vector(position - positions[atom_index], cell) is None:
+                continue
+            neighbour = position + positions[neighbour_index] + np.array(translation) @ cell - positions[atom_index]
+            for j, neighbour_position in enumerate(supercell_positions):
+                image = lattice_vector(neighbour - neighbour_position, supercell_cell)
+                if image is not None:
+                    mapped.append(
+                        (i, atom_manifold, j, neighbour_manifold, value, tuple(image.tolist()), hubbard_type)
+                    )
+    return mapped
+
+
+@pytest.mark.parametrize("matrix", [[2, 1, 1], [2, 2, 2], [[1, 1, 0], [-1, 1, 0], [0, 0, 2]]])
+def test_hubbard_for_supercell(hubbard_properties, hubbard_parameters, matrix):
+    """
+    Testing the mapping of the Hubbard parameters onto a supercell, also with shuffled and displaced supercell sites.
+    """
+    structure = StructureData(properties=hubbard_properties)
+    supercell, _ = structure.make_supercell(matrix)
+
+    mapped = get_hubbard_for_supercell(structure, supercell, hubbard_parameters)
+    assert mapped == brute_force_hubbard_for_supercell(structure, supercell, hubbard_parameters)
+    assert len(mapped) == len(hubbard_parameters) * len(supercell.properties.positions.value) // 4
+
+    # the order of the supercell sites, and the image in which they are, are arbitrary.
+    positions = np.array(supercell.properties.positions.value)
+    shuffle = np.random.default_rng(0).permutation(len(positions))
+    shifts = np.random.default_rng(1).integers(-1, 2, (len(positions), 3)) @ np.array(supercell.properties.cell.value)
+    shuffled = supercell.replace(
+        positions={"value": (positions[shuffle] + shifts).tolist()},
+        symbols={"value": np.array(supercell.properties.symbols.value)[shuffle].tolist()},
+        mass=None,
+    )
+    assert sorted(get_hubbard_for_supercell(structure, shuffled, hubbard_parameters)) == \
+        sorted(brute_force_hubbard_for_supercell(structure, shuffled, hubbard_parameters))
+
+
+def test_hubbard_for_supercell_not_commensurate(hubbard_properties, hubbard_parameters):
+    """
+    Testing that the supercells which are not commensurate with the unit cell are rejected.
+    """
+    structure = StructureData(properties=hubbard_properties)
+    supercell, _ = structure.make_supercell([2, 2, 2])
+
+    site_map, translations = get_supercell_site_map(
+        structure.properties.positions.value, structure.properties.cell.value, supercell.properties.positions.value
+    )
+    assert np.allclose(
+        np.array(structure.properties.positions.value)[site_map] + translations @ np.array(structure.properties.cell.value),
+        supercell.properties.positions.value,
+    )
+
+    displaced = supercell.replace(positions={"value": (np.array(supercell.properties.positions.value) + 0.1).tolist()})
+    with pytest.raises(ValueError, match="do not match"):
+        get_hubbard_for_supercell(structure, displaced, hubbard_parameters)
+
+    strained = supercell.replace(cell={"value": (np.array(supercell.properties.cell.value) * 1.01).tolist()})
+    with pytest.raises(ValueError, match="not commensurate"):
+        get_hubbard_for_supercell(structure, strained, hubbard_parameters)
+
+    # a missing neighbour site.
+    properties = supercell.to_dict()
+    for pname in ["positions", "symbols", "mass"]:
+        properties[pname]["value"] = properties[pname]["value"][:-1]
+    with pytest.raises(ValueError, match="missing"):
+        get_hubbard_for_supercell(structure, StructureData(properties=properties), hubbard_parameters)
+
+
+def reference_reorder_permutation(kind_names, parameters):
+    """The order of the sites of the previous implementation: the Hubbard kinds in reverse order, then the others."""
+    indices = {parameter[0] for parameter in parameters} | {parameter[2] for parameter in parameters}
+    hubbard_kinds = sorted({kind_names[index] for index in indices})
+    sites = list(range(len(kind_names)))
+    ordered_sites = []
+    while hubbard_kinds:
+        hubbard_kind = hubbard_kinds.pop()
+        ordered_sites.extend(site for site in sites if kind_names[site] == hubbard_kind)
+        sites = [site for site in sites if kind_names[site] != hubbard_kind]
+    return ordered_sites + sites
+
+
+def test_reorder_atoms():
+    """
+    Testing the reordering of the sites (and of the indices of the parameters) for an hp.x calculation.
+    """
+    symbols = ["O", "Co", "Li", "O", "Ni", "Co", "Li", "Ni"]
+    properties = {
+        "cell": {"value": np.eye(3).tolist()},
+        "positions": {"value": (np.arange(24).reshape(8, 3) / 24).tolist()},
+        "symbols": {"value": symbols},
+        "charge": {"value": list(range(8))},
+        "kinds": {"value": ["O", "Co1", "Li", "O", "Ni", "Co2", "Li", "Ni"]},
+    }
+    parameters = [
+        (1, '3d', 1, '3d', 5.0, (0, 0, 0), 'U'),
+        (1, '3d', 0, '2p', 1.0, (0, 0, 0), 'V'),
+        (4, '3d', 3, '2p', 0.5, (1, 0, 0), 'V'),
+        (7, '3d', 7, '3d', 6.0, (0, 0, 0), 'U'),
+    ]
+    structure = StructureData(properties=properties)
+
+    reordered, reordered_parameters = reorder_atoms(structure, parameters)
+
+    permutation = reference_reorder_permutation(properties["kinds"]["value"], parameters)
+    assert permutation == [0, 3, 4, 7, 1, 2, 5, 6]
+    for pname in ["positions", "symbols", "charge", "kinds", "mass"]:
+        assert getattr(reordered.properties, pname).value == \
+            np.array(getattr(structure.properties, pname).value)[permutation].tolist()
+    assert reordered.properties.cell.value == structure.properties.cell.value
+
+    # the parameters refer to the same sites.
+    assert reordered_parameters[0] == (4, '3d', 4, '3d', 5.0, (0, 0, 0), 'U')
+    for parameter, reordered_parameter in zip(parameters, reordered_parameters):
+        assert reordered_parameter[1::2] == parameter[1::2]
+        assert permutation[reordered_parameter[0]] == parameter[0]
+        assert permutation[reordered_parameter[2]] == parameter[2]
+
+    # legacy structures, defined via the sites and kinds.
+    import ase
+
+    legacy = StructureData(ase=ase.Atoms(symbols, positions=properties["positions"]["value"], cell=np.eye(3)))
+    reordered, reordered_parameters = reorder_atoms(legacy, parameters)
+
+    permutation = reference_reorder_permutation(symbols, parameters)
+    assert [site.kind_name for site in reordered.sites] == np.array(symbols)[permutation].tolist()
+    assert np.allclose(reordered.sites.positions, legacy.sites.positions[permutation])
+    assert reordered.get_kind_names() == ["O", "Ni", "Co", "Li"]
+    assert permutation[reordered_parameters[2][0]] == 4
+
+
+def test_hubbard_property(hubbard_properties, hubbard_parameters):
+    """
+    Testing the Hubbard property: validation, columnar storage and look-ups of the parameters.
+    """
+    structure = StructureData(properties={**hubbard_properties, "hubbard": {"parameters": hubbard_parameters}})
+
+    hubbard = structure.properties.hubbard
+    assert hubbard.to_list() == hubbard_parameters
+    assert hubbard.parameters["atom_index"] == [0, 0, 0, 1, 3]
+    assert hubbard.parameters["translation"][2] == [-1, 0, 1]
+    assert (hubbard.projectors, hubbard.formulation) == ("ortho-atomic", "dudarev")
+    assert hubbard.get_parameter_index(0, '3d', 3, '2p', (-1, 0, 1), 'V') == 2
+    assert not hubbard.has_parameter(0, '3d', 3, '2p', (0, 0, 0), 'V')
+
+    # the columns are also accepted as input, and the manifolds are normalized.
+    columns = {field: list(column) for field, column in hubbard.parameters.items()}
+    columns["atom_manifold"] = [" 3D"] * 4 + ["2P"]
+    assert StructureData(
+        properties={**hubbard_properties, "hubbard": {"parameters": columns}}
+        ).properties.hubbard.to_list() == hubbard_parameters
+
+    for wrong_parameter in [
+        (0, '3x', 0, '3d', 5.0, (0, 0, 0), 'U'),
+        (0, '3d', 4, '3d', 5.0, (0, 0, 0), 'U'),
+        (0, '3d', -1, '3d', 5.0, (0, 0, 0), 'U'),
+        (0, '3d', 0, '3d', 5.0, (0, 0), 'U'),
+        (0, '3d', 0, '3d', 5.0, (0, 0, 0.5), 'U'),
+        (0, '3d', 0, '3d', 5.0, (0, 0, 0), 'W'),
+    ]:
+        with pytest.raises(ValueError):
+            StructureData(properties={**hubbard_properties, "hubbard": {"parameters": [wrong_parameter]}})
+
+    # the indices are checked against the validated positions, also when these are replaced.
+    with pytest.raises(ValueError, match="smaller than the number of sites"):
+        StructureData(properties={**hubbard_properties, "hubbard": {"parameters": [(0, '3d', 4, '3d', 5.0, (0, 0, 0), 'U')]}})
+    with pytest.raises(ValueError, match="smaller than the number of sites"):
+        structure.replace(
+            positions={"value": hubbard_properties["positions"]["value"][:3]},
+            symbols={"value": hubbard_properties["symbols"]["value"][:3]},
+            mass=None,
+        )
+
+    # stored and loaded.
+    from aiida.orm import load_node
+
+    structure.store()
+    loaded = load_node(structure.pk)
+    assert loaded.properties.hubbard.to_list() == hubbard_parameters
+    assert loaded.properties.hubbard.has_parameter(1, '3d', 2, '2p', (0, 1, -1), 'V')
+
+
+def test_hubbard_append_parameters(hubbard_properties, hubbard_parameters):
+    """
+    Testing the (bulk) append of the Hubbard parameters, with the translations computed from the cell.
+    """
+    structure = StructureData(properties={**hubbard_properties, "hubbard": {"parameters": hubbard_parameters[:2]}})
+
+    new_structure = structure.properties.hubbard.append_hubbard_parameters(hubbard_parameters[1:])
+    assert new_structure.properties.hubbard.to_list() == hubbard_parameters
+    # the structure itself is not changed.
+    assert structure.properties.hubbard.to_list() == hubbard_parameters[:2]
+
+    # the parameters already defined are updated.
+    new_structure = new_structure.properties.hubbard.append_hubbard_parameter(0, '3d', 0, '3d', 6.0, (0, 0, 0), 'U')
+    assert new_structure.properties.hubbard.to_list() == [(0, '3d', 0, '3d', 6.0, (0, 0, 0), 'U')] + hubbard_parameters[1:]
+
+    # closest images: O at (2, 0.1, 0.2) and (0.1, 2, 2) from the Co at (2, 2, 0), Co at (1.5, -2, 0) from the origin.
+    new_structure = new_structure.properties.hubbard.append_hubbard_parameters([
+        (1, '3d', 2, '2p', 1.0, None, 'V'),
+        (1, '3d', 3, '2p', 1.0, None, 'V'),
+    ])
+    assert new_structure.properties.hubbard.to_list()[-2:] == [
+        (1, '3d', 2, '2p', 1.0, (0, 0, 0), 'V'),
+        (1, '3d', 3, '2p', 1.0, (0, 0, 0), 'V'),
+    ]
+    assert new_structure.properties.hubbard.append_hubbard_parameter(
+        0, '3d', 1, '3d', 1.0, hubbard_type='V'
+        ).properties.hubbard.to_list()[-1] == (0, '3d', 1, '3d', 1.0, (0, -1, 0), 'V')
+
+    with pytest.raises(ValueError):
+        new_structure.properties.hubbard.append_hubbard_parameter(0, '3d', 4, '3d', 1.0, hubbard_type='V')
+
+    assert new_structure.properties.hubbard.pop_hubbard_parameters(0).properties.hubbard.to_list() == \
+        new_structure.properties.hubbard.to_list()[1:]
+    assert new_structure.properties.hubbard.clear_hubbard_parameters().properties.hubbard.to_list() == []
+    assert new_structure.properties.hubbard.from_list(hubbard_parameters[:1], projectors="atomic").properties.hubbard.to_list() == \
+        hubbard_parameters[:1]
+
+
+@pytest.mark.parametrize("matrix", [[2, 1, 1], [[1, 1, 0], [-1, 1, 0], [0, 0, 2]]])
+def test_hubbard_supercell_and_reorder(hubbard_properties, hubbard_parameters, matrix):
+    """
+    Testing that the Hubbard parameters are mapped consistently with the sites in the supercells, and when the atoms
+    are reordered.
+    """
+    structure = StructureData(properties={**hubbard_properties, "hubbard": {"parameters": hubbard_parameters}})
+
+    supercell, _ = structure.make_supercell(matrix)
+    assert sorted(supercell.properties.hubbard.to_list()) == \
+        sorted(brute_force_hubbard_for_supercell(structure, supercell, hubbard_parameters))
+
+    reordered, reordered_parameters = reorder_atoms(supercell)
+    assert reordered.properties.hubbard.to_list() == reordered_parameters
+    n_sites = len(supercell.properties.symbols.value)
+    assert reordered.properties.symbols.value == ["O"] * (n_sites // 2) + ["Co"] * (n_sites // 2)
+
+
+def brute_force_intersite_pairs(structure, atom_indices, neighbour_indices, cutoff=None, number_of_shells=1, thr=1e-3):
+    """Pairs within `cutoff`, or within the first shells, from all the images within 3 cells."""
+    positions = np.array(structure.properties.positions.value)
+    cell = np.array(structure.properties.cell.value)
+    images = np.array(list(itertools.product(range(-3, 4), repeat=3)))
+
+    pairs = []
+    for i in atom_indices:
+        candidates = [
+            (np.linalg.norm(positions[j] + image @ cell - positions[i]), j, tuple(image.tolist()))
+            for j in neighbour_indices for image in images if j != i or image.any()
+        ]
+        distances = sorted({round(distance, 6) for distance, _, _ in candidates})
+        shells = [distances[0]]
+        for distance in distances[1:]:
+            if distance - shells[-1] > thr:
+                shells.append(distance)
+        maximum = cutoff if cutoff is not None else shells[number_of_shells] - thr
+        pairs += [(i, j, image) for distance, j, image in candidates if distance <= maximum]
+    return sorted(pairs)
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"number_of_shells": 3}, {"cutoff": 4.0}])
+def test_initialize_intersites_hubbard(hubbard_properties, kwargs):
+    """
+    Testing the bulk initialization of the intersite parameters, from the neighbours of the atoms.
+    """
+    structure = StructureData(properties={**hubbard_properties, "hubbard": {"parameters": []}})
+    new_structure = structure.properties.hubbard.initialize_intersites_hubbard(
+        'Co', '3d', 'O', '2p', value=0.5, use_kinds=False, **kwargs
+    )
+
+    parameters = new_structure.properties.hubbard.to_list()
+    assert sorted((i, j, translation) for i, _, j, _, _, translation, _ in parameters) == \
+        brute_force_intersite_pairs(structure, [0, 1], [2, 3], **kwargs)
+    assert {(parameter[1], parameter[3], parameter[4], parameter[6]) for parameter in parameters} == {('3d', '2p', 0.5, 'V')}
+
+    # the same atoms can be both atoms and neighbours, and the kinds are matched if defined.
+    kinds_structure = structure.replace(kinds={"value": ["Co1", "Co2", "O", "O"]})
+    new_structure = kinds_structure.properties.hubbard.initialize_intersites_hubbard('Co1', '3d', 'Co1', '3d', **kwargs)
+    assert sorted((i, j, translation) for i, _, j, _, _, translation, _ in new_structure.properties.hubbard.to_list()) == \
+        brute_force_intersite_pairs(structure, [0], [0], **kwargs)
+
+    with pytest.raises(ValueError, match="not in structure"):
+        kinds_structure.properties.hubbard.initialize_intersites_hubbard('Co', '3d', 'O', '2p')
+
+
+def test_initialize_onsites_hubbard(hubbard_properties):
+    """
+    Testing the bulk initialization of the onsite parameters.
+    """
+    structure = StructureData(properties={**hubbard_properties, "hubbard": {"parameters": []}})
+    new_structure = structure.properties.hubbard.initialize_onsites_hubbard('Co', '3d', 5.0, 'U', use_kinds=False)
+
+    assert new_structure.properties.hubbard.to_list() == [
+        (0, '3d', 0, '3d', 5.0, (0, 0, 0), 'U'),
+        (1, '3d', 1, '3d', 5.0, (0, 0, 0), 'U'),
+    ]
+
+
+def test_initialize_intersites_hubbard_molecule():
+    """
+    Testing the initialization of the shells of neighbours without periodic boundary conditions.
+    """
+    structure = StructureData(properties={
+        "cell": {"value": [[0.0, 0.0, 0.0]] * 3},
+        "pbc": {"value": [False, False, False]},
+        "positions": {"value": [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 2.0, 0.0], [0.0, 0.0, 9.0]]},
+        "symbols": {"value": ["Fe", "O", "O", "O"]},
+        "hubbard": {"parameters": []},
+    })
+
+    # there are only three shells of neighbours.
+    new_structure = structure.properties.hubbard.initialize_intersites_hubbard('Fe', '3d', 'O', '2p', number_of_shells=5)
+    assert [(i, j, translation) for i, _, j, _, _, translation, _ in new_structure.properties.hubbard.to_list()] == [
+        (0, 1, (0, 0, 0)), (0, 2, (0, 0, 0)), (0, 3, (0, 0, 0)),
+    ]
+
+
+def test_supercell_atomic_indices():
+    """
+    Testing the vectorized conversion between the unit cell and the 3x3x3 QuantumESPRESSO supercell indices.
+    """
+    indices = np.repeat(np.arange(4), 27)
+    translations = np.array(QE_TRANSLATIONS * 4)
+
+    supercell_indices = get_supercell_atomic_indices(indices, 4, translations)
+    assert supercell_indices.tolist() == [
+        index + QE_TRANSLATIONS.index(tuple(translation)) * 4 for index, translation in zip(indices, translations.tolist())
+    ]
+    assert sorted(supercell_indices.tolist()) == list(range(4 * 27))
+
+    back_indices, back_translations = get_indices_and_translations(supercell_indices, 4)
+    assert back_indices.tolist() == indices.tolist()
+    assert back_translations.tolist() == translations.tolist()
+
+    with pytest.raises(ValueError, match="3x3x3 supercell"):
+        get_supercell_atomic_indices([0], 4, [[2, 0, 0]])
+    with pytest.raises(ValueError, match="3x3x3 supercell"):
+        get_indices_and_translations([4 * 27], 4)
+
+
+def test_hubbard_card(hubbard_properties, hubbard_parameters):
+    """
+    Testing the generation of the HUBBARD card and of the parameters file of QuantumESPRESSO.
+    """
+    properties = {**hubbard_properties, "hubbard": {"parameters": hubbard_parameters[:4] + hubbard_parameters[:1]}}
+    structure = StructureData(properties=properties)
+
+    # the intersite parameters are present, so that the onsite one is written as V; duplicates are dropped.
+    assert get_hubbard_card(structure) == ' '.join([
+        'HUBBARD\tortho-atomic\n',
+        'V\tCo-3d\tCo-3d\t1\t1\t5.0\n',
+        'V\tCo-3d\tO-2p\t1\t3\t1.0\n',
+        'V\tCo-3d\tO-2p\t1\t28\t0.5\n',
+        'V\tCo-3d\tO-2p\t2\t63\t0.7\n',
+    ])
+    assert get_hubbard_file(structure) == '#\tAtom 1\tAtom 2\tHubbard V (eV)\n' + ''.join([
+        '\t1\t1\t5.0\n', '\t1\t3\t1.0\n', '\t1\t28\t0.5\n', '\t2\t63\t0.7\n', '\t1\t1\t5.0\n',
+    ])
+
+    # only onsite parameters.
+    onsite_structure = structure.properties.hubbard.from_list(hubbard_parameters[:1] + [(1, '3d', 1, '3d', 1.0, (0, 0, 0), 'J')])
+    assert get_hubbard_card(onsite_structure) == 'HUBBARD\tortho-atomic\n U\tCo-3d\t5.0\n J\tCo-3d\t1.0\n'
+
+    with pytest.raises(ValueError, match="3x3x3 supercell"):
+        get_hubbard_card(structure.properties.hubbard.from_list(hubbard_parameters))
+    with pytest.raises(ValueError, match="no `hubbard` property"):
+        get_hubbard_card(StructureData(properties=hubbard_properties))
+
+
+def test_parse_hubbard_dat(hubbard_properties, hubbard_parameters, tmp_path):
+    """
+    Testing the parsing of the HUBBARD.dat file of QuantumESPRESSO, also from a generated HUBBARD card.
+    """
+    structure = StructureData(properties=hubbard_properties)
+    filepath = tmp_path / 'HUBBARD.dat'
+    filepath.write_text(
+        '# Copy this data in the pw.x input file for DFT+Hubbard calculations\n'
+        'HUBBARD\t(ortho-atomic)\n'
+        'U\tO-2p\t8.0\n'
+        'V\tCo-3d\tO-2p\t1\t28\t0.5\n'
+        '\n'
+        'V\tCo-3d-4s\tO-2p\t2\t63\t0.7\n'
+    )
+
+    parsed = parse_hubbard_dat(structure, filepath)
+    assert parsed.properties.hubbard.projectors == 'ortho-atomic'
+    assert parsed.properties.hubbard.to_list() == [
+        (2, '2p', 2, '2p', 8.0, (0, 0, 0), 'U'),
+        (0, '3d', 3, '2p', 0.5, (-1, 0, 1), 'V'),
+        (1, '3d-4s', 2, '2p', 0.7, (0, 1, -1), 'V'),
+    ]
+
+    # the generated HUBBARD card is parsed back into the same parameters.
+    structure = structure.replace(hubbard={"parameters": hubbard_parameters[1:4], "projectors": "atomic"})
+    filepath.write_text(get_hubbard_card(structure))
+    parsed = parse_hubbard_dat(structure.properties.hubbard.clear_hubbard_parameters(), filepath)
+    assert parsed.properties.hubbard.projectors == 'atomic'
+    assert parsed.properties.hubbard.to_list() == structure.properties.hubbard.to_list()
+
+    filepath.write_text('HUBBARD\t(ortho-atomic)\nU\tNi-3d\t8.0\n')
+    with pytest.raises(ValueError, match="not in structure"):
+        parse_hubbard_dat(structure, filepath)
+
+
+def test_hubbard_utils_reorder_atoms(hubbard_properties):
+    """
+    Testing the legacy `HubbardUtils` reordering, delegated to `reorder_atoms`.
+    """
+    from aiida_atomistic.data.structure.old.properties.hubbard_qe_utils import HubbardUtils
+
+    parameters = [(2, '2p', 2, '2p', 5.0, (0, 0, 0), 'U'), (3, '2p', 2, '2p', 1.0, (0, 0, 0), 'V')]
+    structure = StructureData(
+        properties={**hubbard_properties, "hubbard": {"parameters": parameters, "projectors": "atomic"}}
+        )
+    utils = HubbardUtils(structure)
+    assert utils.is_to_reorder()
+
+    utils.reorder_atoms()
+    assert not utils.is_to_reorder()
+    assert utils.hubbard_structure.properties.symbols.value == ["O", "O", "Co", "Co"]
+    assert utils.hubbard_structure.properties.hubbard.to_list() == [
+        (0, '2p', 0, '2p', 5.0, (0, 0, 0), 'U'), (1, '2p', 0, '2p', 1.0, (0, 0, 0), 'V'),
+    ]
+    assert utils.hubbard_structure.properties.hubbard.projectors == "atomic"
+
+
+def test_hubbard_utils_get_hubbard_for_supercell(hubbard_properties, hubbard_parameters):
+    """
+    Testing the legacy `HubbardUtils` mapping onto a supercell, delegated to `get_hubbard_for_supercell`.
+    """
+    from aiida_atomistic.data.structure.old.properties.hubbard_qe_utils import HubbardUtils
+
+    structure = StructureData(
+        properties={**hubbard_properties, "hubbard": {"parameters": hubbard_parameters, "formulation": "liechtenstein"}}
+        )
+    supercell, _ = StructureData(properties=hubbard_properties).make_supercell([2, 1, 1])
+
+    mapped = HubbardUtils(structure).get_hubbard_for_supercell(supercell)
+    assert mapped.properties.positions.value == supercell.properties.positions.value
+    assert mapped.properties.hubbard.to_list() == get_hubbard_for_supercell(structure, supercell, hubbard_parameters)
+    assert mapped.properties.hubbard.formulation == "liechtenstein"
+
+
+def test_hubbard_utils_card(hubbard_properties, hubbard_parameters, tmp_path):
+    """
+    Testing the legacy `HubbardUtils` card, file and parser, delegated to the array implementation.
+    """
+    from aiida_atomistic.data.structure.old.properties.hubbard_qe_utils import HubbardUtils, is_intersite_hubbard
+
+    structure = StructureData(properties={**hubbard_properties, "hubbard": {"parameters": hubbard_parameters[:4]}})
+    utils = HubbardUtils(structure)
+    assert is_intersite_hubbard(structure.properties.hubbard)
+    assert not is_intersite_hubbard(structure.properties.hubbard.from_list(hubbard_parameters[:1]).properties.hubbard)
+
+    assert utils.get_hubbard_card() == get_hubbard_card(structure)
+    assert utils.get_hubbard_file() == get_hubbard_file(structure)
+
+    # with intersite parameters, the onsite ones are written as V: only the V parameters are parsed back as they are.
+    filepath = tmp_path / 'HUBBARD.dat'
+    filepath.write_text(HubbardUtils(structure.properties.hubbard.from_list(hubbard_parameters[1:4])).get_hubbard_card())
+    utils = HubbardUtils(structure.properties.hubbard.clear_hubbard_parameters())
+    utils.parse_hubbard_dat(filepath)
+    assert utils.hubbard_structure.properties.hubbard.to_list() == hubbard_parameters[1:4]
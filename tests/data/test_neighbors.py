@@ -0,0 +1,124 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from aiida_atomistic.data.structure import StructureData
+from aiida_atomistic.data.structure.neighbors import get_minimum_image_translations, get_neighbor_list
+
+
+def brute_force_neighbors(positions, cell, pbc, cutoff):
+    """
+    Return the set of (i, j, image) neighbors, by checking all the pairs in a range of periodic images large
+    enough to contain all the neighbors.
+    """
+    plane_spacings = 1. / np.linalg.norm(np.linalg.inv(cell), axis=0)
+    ranges = [range(-int(np.ceil(cutoff / h)) - 1, int(np.ceil(cutoff / h)) + 2) if p else [0]
+              for h, p in zip(plane_spacings, pbc)]
+
+    neighbors = set()
+    for image in itertools.product(*ranges):
+        vectors = positions[None, :, :] + np.array(image) @ cell - positions[:, None, :]
+        for i, j in zip(*np.nonzero(np.linalg.norm(vectors, axis=2) <= cutoff)):
+            if i != j or any(image):
+                neighbors.add((i, j, image))
+
+    return neighbors
+
+
+def to_set(neighbor_list):
+    first = np.repeat(np.arange(len(neighbor_list.offsets) - 1), np.diff(neighbor_list.offsets))
+    return {(i, j, tuple(image)) for i, j, image in zip(first, neighbor_list.neighbors, neighbor_list.images.tolist())}
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_neighbor_list(seed):
+    """
+    Testing the neighbor list against a brute-force search, for triclinic cells, mixed pbc and atoms outside
+    the cell, also for cutoffs larger than the cell.
+    """
+    rng = np.random.default_rng(seed)
+    cell = rng.random((3, 3))*4 + np.eye(3)*rng.uniform(1, 6)
+    pbc = rng.random(3) < 0.6
+    positions = (rng.random((rng.integers(1, 30), 3))*1.6 - 0.3) @ cell
+    cutoff = rng.uniform(0.5, 7)
+
+    neighbor_list = get_neighbor_list(positions, cell, pbc, cutoff)
+
+    assert to_set(neighbor_list) == brute_force_neighbors(positions, cell, pbc, cutoff)
+    assert len(neighbor_list.neighbors) == len(neighbor_list.distances) == neighbor_list.offsets[-1]
+    vectors = positions[neighbor_list.neighbors] + neighbor_list.images @ cell \
+        - np.repeat(positions, np.diff(neighbor_list.offsets), axis=0)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), neighbor_list.distances)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_minimum_image_translations(seed):
+    """
+    Testing the translations of the closest images against a brute-force search, for skewed cells and mixed pbc.
+    """
+    rng = np.random.default_rng(seed)
+    cell = rng.random((3, 3))*4 + np.eye(3)*rng.uniform(1, 4)
+    pbc = rng.random(3) < 0.7
+    positions = (rng.random((10, 3))*3 - 1) @ cell
+    first, second = rng.integers(0, 10, (2, 50))
+
+    translations = get_minimum_image_translations(positions, cell, pbc, first, second)
+
+    images = np.array(list(itertools.product(*[range(-10, 11) if p else [0] for p in pbc])))
+    for i, j, translation in zip(first, second, translations):
+        distances = np.linalg.norm(positions[j] + images @ cell - positions[i], axis=1)
+        assert np.isclose(np.linalg.norm(positions[j] + translation @ cell - positions[i]), distances.min())
+    assert not translations[:, ~pbc].any()
+
+
+def test_neighbor_list_molecule():
+    """
+    Testing the neighbor list of a molecule, with a null cell, and the limit cases.
+    """
+    positions = np.array([[0, 0, 0], [0, 0, 1.1], [5, 5, 5]])
+
+    neighbor_list = get_neighbor_list(positions, np.zeros((3, 3)), [False]*3, 1.5)
+
+    assert neighbor_list.offsets.tolist() == [0, 1, 2, 2]
+    assert neighbor_list.neighbors.tolist() == [1, 0]
+    assert np.allclose(neighbor_list.distances, 1.1)
+    assert not neighbor_list.images.any()
+
+    assert get_neighbor_list(np.zeros((0, 3)), np.eye(3), [True]*3, 1.).offsets.tolist() == [0]
+
+    with pytest.raises(ValueError):
+        get_neighbor_list(positions, np.eye(3), [True]*3, 0)
+    with pytest.raises(ValueError):
+        get_neighbor_list(positions, np.zeros((3, 3)), [True]*3, 1.)
+
+
+def test_structure_neighbor_list(example_properties, monkeypatch):
+    """
+    Testing the neighbor list of the StructureData, memoized for stored structures.
+    """
+    import aiida_atomistic.data.structure.neighbors as neighbors_module
+
+    structure = StructureData(properties=example_properties)
+
+    neighbor_list = structure.get_neighbor_list(3.)
+
+    # Li at the origin and at (1.5, 1.5, 1.5) in a cubic cell of side 3.5: the images of the other atom are
+    # at sqrt(3)*1.5, 3 at sqrt(2*1.5**2+2**2), 3 at sqrt(1.5**2+2*2**2) and 1 at sqrt(3)*2, then the
+    # 6 images of the atom itself at 3.5.
+    assert neighbor_list.offsets.tolist() == [0, 4, 8]
+    assert np.allclose(sorted(neighbor_list.distances[:4]), [np.sqrt(3)*1.5] + [np.sqrt(8.5)]*3)
+    assert structure.get_neighbor_list(3.5).offsets.tolist() == [0, 14, 28]
+
+    structure.store()
+    neighbor_list = structure.get_neighbor_list(3.5)
+
+    monkeypatch.setattr(neighbors_module, "get_neighbor_list", None)
+    cached = structure.get_neighbor_list(3.5)
+    assert all(np.array_equal(cached_array, array) for cached_array, array in zip(cached, neighbor_list))
+
+    # the cached arrays are read-only, and returned without copying them.
+    assert structure.get_neighbor_list(3.5) is cached
+    assert not any(array.flags.writeable for array in cached)
+    with pytest.raises(ValueError):
+        cached.distances[0] = 0.
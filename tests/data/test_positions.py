@@ -0,0 +1,51 @@
+import copy
+import pytest
+from aiida_atomistic.data.structure import StructureData
+
+
+def test_positions_overlaps(example_properties):
+    """
+    Testing the optional check of the overlapping sites, also between periodic images.
+    """
+    new_properties = copy.deepcopy(example_properties)
+    new_properties["positions"]["check_overlaps"] = True
+    StructureData(
+        properties=new_properties
+        )
+
+    # the second site is on a periodic image of the first one.
+    new_properties["positions"]["value"] = [[0.0, 0.0, 0.0], [3.5, 3.5, 3.5 - 1e-4]]
+    with pytest.raises(ValueError, match="overlapping sites"):
+        StructureData(
+            properties=new_properties
+            )
+
+    # not overlapping without pbc along z, nor with a smaller tolerance.
+    new_properties["pbc"]["value"] = [True, True, False]
+    StructureData(
+        properties=new_properties
+        )
+    new_properties["pbc"]["value"] = [True, True, True]
+    new_properties["positions"]["overlap_tolerance"] = 1e-5
+    StructureData(
+        properties=new_properties
+        )
+
+    # by default, the overlaps are not checked.
+    new_properties["positions"].pop("check_overlaps")
+    new_properties["positions"].pop("overlap_tolerance")
+    structure = StructureData(
+        properties=new_properties
+        )
+
+    # the check is done again if the cell changes.
+    structure = structure.replace(positions={"value": [[0.0, 0.0, 0.0], [3.0, 3.0, 3.0]], "check_overlaps": True})
+    with pytest.raises(ValueError, match="overlapping sites"):
+        structure.replace(cell={"value": [[3.0, 0.0, 0.0], [0.0, 3.0, 0.0], [0.0, 0.0, 3.0]]})
+    
+    # the check uses the validated pbc of the new structure, also when only the pbc are replaced.
+    structure = StructureData(
+        properties={**example_properties, "positions": {"value": [[0.0, 0.0, 0.0], [0.0, 0.0, 3.5 - 1e-4]], "check_overlaps": True}, "pbc": {"value": [True, True, False]}}
+        )
+    with pytest.raises(ValueError, match="overlapping sites"):
+        structure.replace(pbc={"value": [True, True, True]})
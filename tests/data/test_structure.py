@@ -64,6 +64,597 @@ def test_to_dict_method(example_properties):
     assert returned_dict == example_properties, f"The dictionary returned by the method, {returned_dict}, \
                                                   is different from the initial one: {example_properties}"    
     
+def test_properties_caching(example_properties):
+    """
+    Testing that the PropertyCollector and the validated property models are cached, and that the cache
+    is invalidated if the `_property_attributes` of an unstored node are changed.
+    """
+    import copy
+    
+    structure = StructureData(
+        properties=example_properties
+        )
+    
+    # (1) unstored node: same collector and same (already validated) models.
+    assert structure.properties is structure.properties
+    assert structure.properties.symbols is structure.properties.symbols
+    
+    # (2) unstored node: changing the attribute invalidates the cache.
+    collector = structure.properties
+    new_properties = copy.deepcopy(example_properties)
+    new_properties["charge"]["value"] = [0,0]
+    structure.base.attributes.set("_property_attributes", new_properties)
+    
+    assert structure.properties is not collector
+    assert structure.properties.charge.value == [0,0]
+    
+    # (3) stored node: the collector is built only once.
+    structure.store()
+    assert structure.properties is structure.properties
+    assert structure.properties.charge.value == [0,0]
+    
+def test_array_storage(example_properties, monkeypatch):
+    """
+    Testing that the intra-site properties are stored in the repository as numpy arrays 
+    if the number of sites is above the threshold, and that they are correctly loaded.
+    """
+    from aiida.orm import load_node
+    from aiida_atomistic.data.structure.properties import PropertyCollector
+    
+    monkeypatch.setattr(PropertyCollector, "array_storage_threshold", 2)
+    
+    structure = StructureData(
+        properties=example_properties
+        )
+    structure.store()
+    
+    stored_attributes = structure.base.attributes.get("_property_attributes")
+    for pname in ["positions", "symbols", "mass", "charge"]:
+        assert stored_attributes[pname]["array"] == f"{pname}.npy"
+        assert not "value" in stored_attributes[pname]
+        assert f"{pname}.npy" in structure.base.repository.list_object_names()
+    assert stored_attributes["cell"] == example_properties["cell"]
+    
+    loaded = load_node(structure.pk)
+    
+    assert loaded.properties.positions.value == example_properties["positions"]["value"]
+    assert loaded.properties.symbols.value == example_properties["symbols"]["value"]
+    assert loaded.to_dict() == example_properties
+
+
+def test_array_storage_custom(example_properties, monkeypatch):
+    """
+    Testing that the custom properties are stored as attributes, also above the array storage threshold.
+    """
+    from aiida.orm import load_node
+    from aiida_atomistic.data.structure.properties import PropertyCollector
+    
+    monkeypatch.setattr(PropertyCollector, "array_storage_threshold", 2)
+    
+    structure = StructureData(
+        properties={**example_properties, "custom": {"value": [1, 2]}}
+        )
+    structure.store()
+    
+    stored_attributes = structure.base.attributes.get("_property_attributes")
+    assert stored_attributes["custom"] == {"value": [1, 2]}
+    assert stored_attributes["positions"]["array"] == "positions.npy"
+    
+    loaded = load_node(structure.pk)
+    
+    assert loaded.properties.custom.value == [1, 2]
+    assert loaded.properties.positions.value == example_properties["positions"]["value"]
+    
+def test_array_storage_failure(example_properties, monkeypatch):
+    """
+    Testing that the node is left unchanged if the storing fails, before or after the arrays are written.
+    """
+    from aiida.common.exceptions import ModificationNotAllowed
+    from aiida_atomistic.data.structure.properties import PropertyCollector
+    
+    monkeypatch.setattr(PropertyCollector, "array_storage_threshold", 2)
+    
+    # invalid node: zero-volume cell with periodic boundary conditions.
+    structure = StructureData(
+        properties={**example_properties, "cell": {"value": [[3.5, 0.0, 0.0], [0.0, 3.5, 0.0], [0.0, 0.0, 0.0]]}}
+        )
+    
+    with pytest.raises(ValueError, match="3-d volume 0"):
+        structure.store()
+    
+    assert "array" not in structure.base.attributes.get("_property_attributes")["positions"]
+    assert structure.base.repository.list_object_names() == []
+    
+    # valid node, failing after the validation.
+    structure = StructureData(
+        properties=example_properties
+        )
+    attributes = structure.base.attributes.get("_property_attributes")
+    
+    def raise_not_stored(self):
+        raise ModificationNotAllowed("source node not stored")
+    
+    monkeypatch.setattr(StructureData, "_verify_are_parents_stored", raise_not_stored)
+    
+    with pytest.raises(ModificationNotAllowed):
+        structure.store()
+    
+    assert structure.base.attributes.get("_property_attributes") == attributes
+    assert structure.base.repository.list_object_names() == []
+    assert structure.properties.positions.value == example_properties["positions"]["value"]
+    
+    monkeypatch.undo()
+    monkeypatch.setattr(PropertyCollector, "array_storage_threshold", 2)
+    structure.store()
+    
+    assert structure.base.attributes.get("_property_attributes")["positions"]["array"] == "positions.npy"
+    
+def test_intra_site_validation(example_properties):
+    """
+    Testing that the intra-site properties are validated in bulk, and that the
+    wrong values are rejected.
+    """
+    import copy
+    
+    structure = StructureData(
+        properties=example_properties
+        )
+    
+    assert structure.properties.positions.value == example_properties["positions"]["value"]
+    assert structure.properties.mass.value == example_properties["mass"]["value"]
+    
+    # masses are computed from the symbols if not provided.
+    properties = copy.deepcopy(example_properties)
+    properties.pop("mass")
+    structure = StructureData(
+        properties=properties
+        )
+    assert structure.properties.mass.value == [6.941]*2
+    
+    wrong_values = {
+        "positions": [[0.0, 0.0], [1.5, 1.5, 1.5]],
+        "symbols": ["Li", "Xx"],
+        "charge": [1, "a"],
+    }
+    for pname, value in wrong_values.items():
+        properties = copy.deepcopy(example_properties)
+        properties[pname]["value"] = value
+        with pytest.raises(ValueError):
+            StructureData(
+                properties=properties
+                )
+    
+def test_validation_policy(example_properties, monkeypatch):
+    """
+    Testing that the properties of stored nodes loaded from the database are not validated again.
+    """
+    from aiida.orm import load_node
+    from aiida_atomistic.data.structure.properties.intra_site.positions import Positions
+    
+    structure = StructureData(
+        properties=example_properties
+        )
+    structure.store()
+    
+    def no_validation(*args, **kwargs):
+        raise AssertionError("Stored properties should not be validated again.")
+    
+    # `construct` does not call the `__init__` of the pydantic model.
+    monkeypatch.setattr(Positions, "__init__", no_validation)
+    
+    loaded = load_node(structure.pk)
+    
+    assert loaded.properties.positions.value == example_properties["positions"]["value"]
+    assert loaded.properties.mass.value == example_properties["mass"]["value"]
+    assert loaded.to_dict() == structure.to_dict()
+    
+    # new unstored nodes are instead validated.
+    with pytest.raises(AssertionError):
+        StructureData(
+            properties=loaded.to_dict()
+            )
+    
+def test_replace(example_properties):
+    """
+    Testing the `replace` method: only the changed properties are updated, the other ones are shared.
+    """
+    structure = StructureData(
+        properties=example_properties
+        )
+    
+    new_structure = structure.replace(charge={"value": [0.5, 0.5]})
+    
+    assert new_structure.properties.charge.value == [0.5, 0.5]
+    assert structure.properties.charge.value == example_properties["charge"]["value"]
+    assert new_structure.properties.positions.value == structure.properties.positions.value
+    # payloads of the unchanged properties are shared (copy-on-write).
+    assert new_structure.base.attributes.get("_property_attributes")["positions"] is \
+        structure.base.attributes.get("_property_attributes")["positions"]
+    
+    # derived properties are reset to the default if removed, other properties are removed.
+    new_structure = structure.replace(mass=None, charge=None)
+    assert new_structure.properties.mass.value == [6.941]*2
+    assert not "charge" in new_structure.to_dict()
+    
+    # changed properties and their dependents are validated.
+    with pytest.raises(ValueError):
+        structure.replace(charge={"value": [1]})
+    with pytest.raises(ValueError):
+        structure.replace(positions={"value": [[0.0, 0.0, 0.0]]})
+    with pytest.raises(KeyError):
+        structure.replace(symbols=None)
+    
+    new_structure.store()
+    assert new_structure.is_stored
+    
+def test_validation_engine(example_properties):
+    """
+    Testing the validation engine of the PropertyCollector: topological order, defaults and number of sites.
+    """
+    import copy
+    from aiida_atomistic.data.structure.properties import PropertyCollector
+    
+    order = PropertyCollector._get_validation_order()
+    for pname, dependencies in PropertyCollector.property_dependencies.items():
+        for dependency in dependencies:
+            assert order.index(dependency) < order.index(pname)
+    
+    properties = copy.deepcopy(example_properties)
+    properties.pop("pbc")
+    properties.pop("mass")
+    structure = StructureData(
+        properties=properties
+        )
+    assert structure.base.attributes.get("_property_attributes")["pbc"]["value"] == [True, True, True]
+    assert structure.base.attributes.get("_property_attributes")["mass"]["value"] == [6.941]*2
+    
+    properties = copy.deepcopy(example_properties)
+    properties["kinds"] = {"value": ["Li0"]}
+    with pytest.raises(ValueError, match="number of positions"):
+        StructureData(
+            properties=properties
+            )
+    
+def test_site_view():
+    """
+    Testing the array-backed SiteView of the (legacy) sites.
+    """
+    import numpy as np
+    from aiida_atomistic.data.structure import Kind, Site, SiteView
+    
+    structure = StructureData()
+    structure.set_cell([[3.5, 0.0, 0.0], [0.0, 3.5, 0.0], [0.0, 0.0, 3.5]])
+    structure.append_kind(Kind(symbols="Li"))
+    structure.append_kind(Kind(symbols="Cu"))
+    structure.append_site(Site(kind_name="Li", position=[0.0, 0.0, 0.0]))
+    structure.append_site(Site(kind_name="Cu", position=[1.5, 1.5, 1.5]))
+    structure.append_site(Site(kind_name="Li", position=[1.5, 2.5, 1.5]))
+    
+    sites = structure.sites
+    assert isinstance(sites, SiteView)
+    assert structure.sites is sites # cached
+    assert len(sites) == 3
+    assert sites.kind_names == ["Li", "Cu", "Li"]
+    assert sites.kind_indices.tolist() == [0, 1, 0]
+    assert np.allclose(sites.positions, [[0.0, 0.0, 0.0], [1.5, 1.5, 1.5], [1.5, 2.5, 1.5]])
+    assert sites[-1].position == (1.5, 2.5, 1.5)
+    assert [site.kind_name for site in sites[1:]] == ["Cu", "Li"]
+    
+    with pytest.raises(AttributeError):
+        sites[0].position = [1.0, 1.0, 1.0]
+    site = Site(site=sites[0])
+    site.position = [1.0, 1.0, 1.0]
+    assert site.position == (1.0, 1.0, 1.0)
+    
+    structure.reset_sites_positions([[0.0, 0.0, 0.5], [1.5, 1.5, 2.0], [1.5, 2.5, 2.0]])
+    assert structure.sites is not sites
+    assert structure.sites[0].position == (0.0, 0.0, 0.5)
+    assert structure.get_site_kindnames() == ["Li", "Cu", "Li"]
+    
+    with pytest.raises(ValueError):
+        structure.reset_sites_positions([[0.0, 0.0], [1.5, 1.5], [1.5, 2.5]])
+    
+    structure.append_site(Site(kind_name="Cu", position=[0.0, 0.0, 0.0]))
+    assert len(structure.sites) == 4
+    
+    # the view is rebuilt by the methods changing the sites, also if their number does not change.
+    sites = structure.sites
+    structure.clear_sites()
+    for position in [[0.0, 0.0, 1.0], [1.0, 1.0, 1.0], [1.0, 2.0, 1.0], [2.0, 2.0, 2.0]]:
+        structure.append_site(Site(kind_name="Li", position=position))
+    assert structure.sites is not sites
+    assert structure.sites.kind_names == ["Li"]*4
+    assert structure.sites[0].position == (0.0, 0.0, 1.0)
+    
+    # the kinds are cached as well, and the returned ones are copies.
+    kinds = structure.kinds
+    assert [kind.name for kind in kinds] == ["Li", "Cu"]
+    kinds[0].name = "Na"
+    assert [kind.name for kind in structure.kinds] == ["Li", "Cu"]
+    structure.append_kind(Kind(symbols="Na"))
+    assert [kind.name for kind in structure.kinds] == ["Li", "Cu", "Na"]
+    assert structure.sites.kind_indices.tolist() == [0]*4
+    
+def test_extend_atoms():
+    """
+    Testing that `extend_atoms` gives the same kinds and sites as the corresponding `append_atom` calls.
+    """
+    atoms = [
+        {"symbols": "Li", "position": [0.0, 0.0, 0.0]},
+        {"symbols": "Cu", "position": [1.5, 1.5, 1.5]},
+        {"symbols": "Li", "position": [1.5, 2.5, 1.5], "mass": 7.5},
+        {"symbols": ["Li", "Cu"], "weights": [0.5, 0.5], "position": [1.5, 1.5, 2.5]},
+        {"symbols": "Cu", "position": [2.5, 1.5, 2.5], "name": "Cu"},
+        {"symbols": "Li", "position": [2.5, 2.5, 2.5]},
+    ]
+    
+    reference = StructureData()
+    for atom in atoms:
+        reference.append_atom(**atom)
+    
+    structure = StructureData()
+    structure.extend_atoms(
+        symbols=[atom["symbols"] for atom in atoms],
+        positions=[atom["position"] for atom in atoms],
+        weights=[atom.get("weights") for atom in atoms],
+        names=[atom.get("name") for atom in atoms],
+        masses=[atom.get("mass") for atom in atoms],
+    )
+    
+    assert [kind.get_raw() for kind in structure.kinds] == [kind.get_raw() for kind in reference.kinds]
+    assert [site.get_raw() for site in structure.sites] == [site.get_raw() for site in reference.sites]
+    assert structure.get_site_kindnames() == ["Li", "Cu", "Li1", "CuLi", "Cu", "Li"]
+    
+    # Different kinds with the same name are not allowed.
+    with pytest.raises(ValueError):
+        structure.extend_atoms(symbols=["Li"], positions=[[0.0, 0.0, 0.0]], names=["Cu"])
+    assert len(structure.sites) == len(atoms)
+    
+    
+def test_set_ase_bulk():
+    """
+    Testing the import of ASE Atoms, with tags, via `extend_atoms`.
+    """
+    import ase
+    
+    atoms = ase.Atoms("Li2Cu2", positions=[[0, 0, 0], [1, 1, 1], [2, 2, 2], [3, 3, 3]], cell=[4, 4, 4], pbc=True)
+    atoms.set_tags([0, 1, 0, 0])
+    
+    structure = StructureData(ase=atoms)
+    
+    assert structure.get_site_kindnames() == ["Li", "Li1", "Cu", "Cu"]
+    assert structure.sites.positions.tolist() == atoms.positions.tolist()
+    
+def test_get_ase(example_properties):
+    """
+    Testing the conversion to ASE, both from the properties and from the (legacy) sites.
+    """
+    import ase
+    import copy
+    import numpy as np
+    
+    properties = copy.deepcopy(example_properties)
+    properties["kinds"] = {"value": ["Li", "Li2"]}
+    structure = StructureData(
+        properties=properties
+        )
+    
+    atoms = structure.get_ase()
+    
+    assert atoms.get_chemical_symbols() == ["Li", "Li"]
+    assert np.allclose(atoms.positions, properties["positions"]["value"])
+    assert np.allclose(atoms.cell, properties["cell"]["value"])
+    assert atoms.pbc.tolist() == properties["pbc"]["value"]
+    assert np.allclose(atoms.get_masses(), properties["mass"]["value"])
+    assert np.allclose(atoms.get_initial_charges(), properties["charge"]["value"])
+    assert atoms.get_tags().tolist() == [0, 2]
+    
+    # legacy sites: same result as the conversion of each site.
+    reference = ase.Atoms("Li3Cu", positions=[[0, 0, 0], [1, 1, 1], [2, 2, 2], [3, 3, 3]], cell=[4, 4, 4], pbc=True)
+    reference.set_tags([0, 1, 3, 0])
+    structure = StructureData(ase=reference)
+    
+    atoms = structure.get_ase()
+    
+    kinds = structure.kinds
+    expected = ase.Atoms(cell=structure.cell, pbc=structure.pbc)
+    for site in structure.sites:
+        expected.append(site.get_ase(kinds=kinds))
+    assert atoms == expected
+    assert atoms.get_tags().tolist() == [0, 1, 3, 0]
+    assert np.allclose(atoms.get_masses(), expected.get_masses())
+    
+def test_get_pymatgen(example_properties):
+    """
+    Testing the conversion to pymatgen, both from the properties and from the (legacy) sites.
+    """
+    import ase
+    import copy
+    import numpy as np
+    
+    properties = copy.deepcopy(example_properties)
+    properties["kinds"] = {"value": ["Li1", "Li2"]}
+    structure = StructureData(
+        properties=properties
+        )
+    
+    pymatgen_structure = structure.get_pymatgen()
+    
+    assert [str(specie) for specie in pymatgen_structure.species] == ["Li", "Li"]
+    assert np.allclose(pymatgen_structure.cart_coords, properties["positions"]["value"])
+    assert np.allclose(pymatgen_structure.lattice.matrix, properties["cell"]["value"])
+    assert pymatgen_structure.site_properties["kind_name"] == ["Li1", "Li2"]
+    assert np.allclose(pymatgen_structure.site_properties["charge"], properties["charge"]["value"])
+    assert np.allclose(pymatgen_structure.site_properties["mass"], properties["mass"]["value"])
+    
+    pymatgen_structure = structure.get_pymatgen(add_spin=True)
+    assert [specie.spin for specie in pymatgen_structure.species] == [-1, 1]
+    
+    # legacy sites, with a kind name that cannot be obtained from the symbols.
+    reference = ase.Atoms("Li3Cu", positions=[[0, 0, 0], [1, 1, 1], [2, 2, 2], [3, 3, 3]], cell=[4, 4, 4], pbc=True)
+    reference.set_tags([0, 1, 1, 0])
+    structure = StructureData(ase=reference)
+    
+    pymatgen_structure = structure.get_pymatgen()
+    
+    assert [str(specie) for specie in pymatgen_structure.species] == ["Li", "Li", "Li", "Cu"]
+    assert np.allclose(pymatgen_structure.cart_coords, reference.positions)
+    assert pymatgen_structure.site_properties["kind_name"] == structure.get_site_kindnames()
+    
+    structure = StructureData(ase=ase.Atoms("Li2", positions=[[0, 0, 0], [1, 1, 1]]))
+    
+    pymatgen_molecule = structure.get_pymatgen()
+    
+    assert [str(specie) for specie in pymatgen_molecule.species] == ["Li", "Li"]
+    assert np.allclose(pymatgen_molecule.cart_coords, [[0, 0, 0], [1, 1, 1]])
+    
+def test_formula_and_composition(example_properties):
+    """
+    Testing the formula (in all the modes) and the composition, both from the properties and from the (legacy) sites.
+    """
+    import ase
+    import copy
+    
+    symbols = ["Ba", "Ti", "O", "O", "O", "Ba", "Ti", "O", "O", "O", "Ba", "Ti", "Ti", "O", "O", "O"]
+    properties = copy.deepcopy(example_properties)
+    properties["positions"] = {"value": [[float(i), 0., 0.] for i in range(len(symbols))]}
+    properties["symbols"] = {"value": symbols}
+    for pname in ["mass", "charge", "kinds"]:
+        properties.pop(pname, None)
+    
+    expected_formulas = {
+        "hill": "Ba3O9Ti4",
+        "hill_compact": "Ba3O9Ti4",
+        "reduce": "BaTiO3BaTiO3BaTi2O3",
+        "group": "(BaTiO3)2BaTi2O3",
+        "count": "Ba3Ti4O9",
+        "count_compact": "Ba3Ti4O9",
+    }
+    expected_compositions = {
+        "full": {"Ba": 3, "Ti": 4, "O": 9},
+        "reduced": {"Ba": 3, "Ti": 4, "O": 9},
+        "fractional": {"Ba": 3/16, "Ti": 4/16, "O": 9/16},
+    }
+    
+    for structure in [
+        StructureData(properties=properties),
+        StructureData(ase=ase.Atoms(symbols, positions=properties["positions"]["value"], cell=[20, 20, 20])),
+        ]:
+        for mode, formula in expected_formulas.items():
+            assert structure.get_formula(mode=mode) == formula
+        for mode, composition in expected_compositions.items():
+            assert structure.get_composition(mode=mode) == pytest.approx(composition)
+    
+    assert StructureData(properties=properties).get_formula(mode="hill", separator=" ") == "Ba3 O9 Ti4"
+    
+    with pytest.raises(ValueError):
+        structure.get_formula(mode="wrong")
+    with pytest.raises(ValueError):
+        structure.get_composition(mode="wrong")
+        
+def test_export(example_properties, tmp_path):
+    """
+    Testing the export formats with a streaming writer, both from the properties and from the (legacy) sites.
+    """
+    import ase
+    import json
+    import numpy as np
+    
+    atoms = ase.Atoms("Li2Cu", positions=[[0, 0, 0], [1, 1, 1], [2, 2, 2.5]], cell=[4, 4, 5], pbc=[True, True, False])
+    atoms.set_tags([0, 1, 0])
+    
+    for index, structure in enumerate([StructureData(properties=example_properties), StructureData(ase=atoms)]):
+        for fileformat in ["xsf", "xyz", "chemdoodle"]:
+            content, _ = structure._exportcontent(fileformat)
+            path = tmp_path / f"structure{index}.{fileformat}"
+            
+            assert structure.export(str(path)) == [str(path)]
+            assert path.read_bytes() == content
+            with pytest.raises(OSError):
+                structure.export(str(path))
+    
+    structure = StructureData(ase=atoms)
+    
+    lines = structure._exportcontent("xyz")[0].decode().split("\n")
+    assert lines[0] == "3"
+    assert lines[1] == 'Lattice="4.0 0.0 0.0 0.0 4.0 0.0 0.0 0.0 5.0" pbc="True True False"'
+    assert lines[4] == "Cu           2.0000000000       2.0000000000       2.5000000000"
+    
+    lines = structure._exportcontent("xsf")[0].decode().splitlines()
+    assert lines[:6] == [
+        "CRYSTAL", "PRIMVEC 1",
+        "      4.0000000000       0.0000000000       0.0000000000",
+        "      0.0000000000       4.0000000000       0.0000000000",
+        "      0.0000000000       0.0000000000       5.0000000000",
+        "PRIMCOORD 1",
+        ]
+    assert lines[6:] == [
+        "3 1",
+        "3       0.0000000000       0.0000000000       0.0000000000",
+        "3       1.0000000000       1.0000000000       1.0000000000",
+        "29       2.0000000000       2.0000000000       2.5000000000",
+        ]
+    
+    chemdoodle = json.loads(structure._exportcontent("chemdoodle")[0])
+    assert [atom["l"] for atom in chemdoodle["m"][0]["a"]] == ["Li", "Li", "Cu"]
+    assert np.allclose([[atom[x] for x in "xyz"] for atom in chemdoodle["m"][0]["a"]], atoms.positions - [2, 2, 2.5])
+    assert chemdoodle["s"][0]["o"] == [-2, -2, -2.5]
+    
+def test_make_supercell(example_properties):
+    """
+    Testing the supercell builder, for diagonal and general matrices, and the tiling of the intra-site properties.
+    """
+    import copy
+    import numpy as np
+    from ase.build import make_supercell
+    
+    properties = copy.deepcopy(example_properties)
+    properties["kinds"] = {"value": ["Li0", "Li1"]}
+    structure = StructureData(
+        properties=properties
+        )
+    
+    supercell, site_map = structure.make_supercell([2, 1, 3])
+    
+    assert site_map.tolist() == [0, 1]*6
+    assert np.allclose(supercell.properties.cell.value, np.diag([7., 3.5, 10.5]))
+    positions = np.array(supercell.properties.positions.value)
+    assert np.allclose(positions[:2], properties["positions"]["value"])
+    assert np.allclose(positions[2:4], np.array(properties["positions"]["value"]) + [0, 0, 3.5])
+    for pname in ["symbols", "mass", "charge", "kinds"]:
+        assert getattr(supercell.properties, pname).value == np.array(properties[pname]["value"])[site_map].tolist()
+    assert supercell.properties.pbc.value == properties["pbc"]["value"]
+    
+    # general matrix: same sites as ASE, wrapped in the supercell.
+    matrix = [[1, 1, 0], [-1, 1, 0], [0, 1, 2]]
+    supercell, site_map = structure.make_supercell(matrix)
+    
+    reference = make_supercell(structure.get_ase(), matrix)
+    assert len(site_map) == len(reference) == 8
+    assert np.allclose(supercell.properties.cell.value, reference.cell)
+    positions = np.array(supercell.properties.positions.value)
+    scaled = np.linalg.solve(np.array(supercell.properties.cell.value).T, positions.T).T
+    assert ((scaled > -1e-8) & (scaled < 1)).all()
+    reference_positions = reference.get_scaled_positions(wrap=True) @ reference.cell
+    assert np.allclose(np.sort(positions, axis=0), np.sort(reference_positions, axis=0))
+    assert supercell.properties.kinds.value == np.array(properties["kinds"]["value"])[site_map].tolist()
+    # each site is a lattice translation of the corresponding primitive site.
+    fractional = (positions - np.array(properties["positions"]["value"])[site_map]) @ np.linalg.inv(properties["cell"]["value"])
+    assert np.allclose(fractional, np.round(fractional))
+    
+    with pytest.raises(ValueError, match="singular"):
+        structure.make_supercell([[1, 0, 0], [1, 0, 0], [0, 0, 1]])
+    with pytest.raises(ValueError, match="integer"):
+        structure.make_supercell([1.5, 1, 1])
+    with pytest.raises(ValueError, match="non-periodic"):
+        structure.replace(pbc={"value": [True, True, False]}).make_supercell([1, 1, 2])
+    
+    # custom per-site properties are tiled as well; the other custom properties cannot be mapped.
+    supercell, site_map = structure.replace(custom={"value": [1, [2, 3]]}).make_supercell([2, 1, 1])
+    assert supercell.properties.custom.value == [1, [2, 3], 1, [2, 3]]
+    with pytest.raises(ValueError, match="one value per site"):
+        structure.replace(custom={"value": [1, 2, 3]}).make_supercell([2, 1, 1])
+    
 ## Test the get_kinds() method.
 
 
@@ -90,6 +681,7 @@ def kinds_properties():
     return properties
 
 def test_get_kinds(example_properties, kinds_properties):
+    import copy
     
     # (1) trivial system, defaults thr
     structure = StructureData(
@@ -99,7 +691,7 @@ def test_get_kinds(example_properties, kinds_properties):
     kinds, kinds_values = structure.get_kinds()
     
     assert kinds == ["Li0","Li1"]
-    assert kinds_values["charge"] == [1,0]
+    assert kinds_values["charge"]["value"] == [1,0]
     
     # (2) trivial system, custom thr
     structure = StructureData(
@@ -109,7 +701,7 @@ def test_get_kinds(example_properties, kinds_properties):
     kinds, kinds_values = structure.get_kinds(custom_thr={"charge": 0.1})
     
     assert kinds == ["Li0","Li1"]
-    assert kinds_values["charge"] == [1,0]
+    assert kinds_values["charge"]["value"] == [1,0]
     
     # (3) trivial system, exclude one property
     structure = StructureData(
@@ -119,7 +711,7 @@ def test_get_kinds(example_properties, kinds_properties):
     kinds, kinds_values = structure.get_kinds(exclude=["charge"])
     
     assert kinds == ["Li0","Li0"]
-    assert kinds_values["mass"] == structure.properties.mass.value
+    assert kinds_values["mass"]["value"] == structure.properties.mass.value
     assert not "charge" in kinds_values.keys()
     
     # (4) non-trivial system, default thr
@@ -130,7 +722,7 @@ def test_get_kinds(example_properties, kinds_properties):
     kinds, kinds_values = structure.get_kinds(exclude=["charge"])
     
     assert kinds == ['Li1', 'Li1', 'Cu2', 'Cu2']
-    assert kinds_values["mass"] == structure.properties.mass.value
+    assert kinds_values["mass"]["value"] == structure.properties.mass.value
     assert not "charge" in kinds_values.keys()
     
     # (5) non-trivial system, custom thr
@@ -140,11 +732,144 @@ def test_get_kinds(example_properties, kinds_properties):
     
     kinds, kinds_values = structure.get_kinds(custom_thr={"charge":0.6})
     
-    assert kinds == ['Li0', 'Li1', 'Cu2', 'Cu2']
-    assert kinds_values["mass"] == structure.properties.mass.value
-    assert kinds_values["charge"] == [1.0, 0.0, 0.0, 0.0]
+    # the Li charges (1 and 0.5) are within the threshold: the clustering is done per element.
+    assert kinds == ['Li1', 'Li1', 'Cu2', 'Cu2']
+    assert kinds_values["mass"]["value"] == structure.properties.mass.value
+    assert kinds_values["charge"]["value"] == [0.5, 0.5, 0.0, 0.0]
+    
+    # (6) the kinds property is not clustered, also once stored
+    properties = copy.deepcopy(kinds_properties)
+    properties["kinds"] = {"value": ["Li0", "Li1", "Cu2", "Cu2"]}
+    structure = StructureData(
+        properties=properties
+        )
+    
+    kinds, kinds_values = structure.get_kinds(custom_thr={"charge":0.6})
+    
+    assert kinds == ['Li1', 'Li1', 'Cu2', 'Cu2']
+    assert not "kinds" in kinds_values.keys()
+    
+    structure.store()
+    assert structure.get_kinds(custom_thr={"charge":0.6}) == (kinds, kinds_values)
+    
+    
+def test_to_kinds(kinds_properties):
+    """
+    Testing the clustering of the intra-site properties, also for vector-valued ones.
+    """
+    import numpy as np
+    from aiida_atomistic.data.structure.properties.intra_site.charge import Charge
+    
+    structure = StructureData(
+        properties=kinds_properties
+        )
+    
+    # clustering is done per element: Li and Cu charges are not compared.
+    labels, values = structure.properties.charge.to_kinds(thr=0.6)
+    assert labels[0] == labels[1] and labels[2] == labels[3] and labels[0] != labels[2]
+    assert values.tolist() == [0.5, 0.5, 0.0, 0.0]
+    
+    labels, values = structure.properties.charge.to_kinds(thr=0)
+    assert labels.tolist() == [0, 1, 2, 3]
+    
+    # vector-valued property, not validated.
+    moments = Charge.construct(parent=structure, value=[[0, 0, 1], [0, 0, 1.05], [0, 0, -1], [0, 0, -1]])
+    
+    labels, values = moments.to_kinds(thr=0.1)
+    assert labels[0] == labels[1] and labels[2] == labels[3] and labels[0] != labels[2]
+    assert np.allclose(values[0], [0, 0, 1])
+    
+    # Same norm: only one kind per element.
+    labels, values = moments.to_kinds(thr=0.1, mode="norm")
+    assert labels[0] == labels[1] and labels[2] == labels[3]
+    assert np.allclose(values, [[0, 0, 1], [0, 0, 1], [0, 0, -1], [0, 0, -1]])
+    
+    
+    
+def test_get_kinds_memoization(kinds_properties, monkeypatch):
+    """
+    Testing that the `get_kinds` results are memoized for stored structures, also via the extras.
+    """
+    from aiida.orm import load_node
+    from aiida_atomistic.data.structure import _STORED_CACHE
+    
+    structure = StructureData(
+        properties=kinds_properties
+        )
+    structure.store()
+    
+    kinds, kinds_values = structure.get_kinds(custom_thr={"charge":0.6}, use_extras=True)
+    
+    def no_computation(*args, **kwargs):
+        raise AssertionError("The kinds should not be computed again.")
+    
+    monkeypatch.setattr(StructureData, "_get_kinds", no_computation)
+    
+    # from the per-process cache, also for another instance of the same node.
+    assert load_node(structure.pk).get_kinds(custom_thr={"charge":0.6}) == (kinds, kinds_values)
+    
+    # from the extras.
+    _STORED_CACHE.clear()
+    assert load_node(structure.pk).get_kinds(custom_thr={"charge":0.6}, use_extras=True) == (kinds, kinds_values)
+    
+    # different arguments are not memoized.
+    with pytest.raises(AssertionError):
+        structure.get_kinds(exclude=["charge"])    
+    
+def test_memoize_if_stored(example_properties, monkeypatch):
+    """
+    Testing that the derived quantities of stored structures are memoized in the bounded per-process cache.
+    """
+    from aiida.orm import load_node
+    from aiida_atomistic.data.structure import _STORED_CACHE
+    import aiida_atomistic.data.structure as structure_module
+    
+    structure = StructureData(properties=example_properties)
+    structure.get_formula()
+    assert not any(key[0] == structure.uuid for key in _STORED_CACHE)
+    
+    structure.store()
+    expected = {
+        "formula": structure.get_formula(mode="count"),
+        "composition": structure.get_composition(),
+        "symbols": structure.get_symbols_set(),
+        "volume": structure.get_cell_volume(),
+        "dimensionality": structure.get_dimensionality(),
+        "is_alloy": structure.is_alloy,
+        "has_vacancies": structure.has_vacancies,
+    }
+    
+    def no_computation(*args, **kwargs):
+        raise AssertionError("The derived quantities should not be computed again.")
+    
+    monkeypatch.setattr(StructureData, "kinds", property(no_computation))
+    monkeypatch.setattr(StructureData, "properties", property(no_computation))
+    
+    # from the per-process cache, also for another instance of the same node.
+    loaded = load_node(structure.pk)
+    assert loaded.get_formula(mode="count") == expected["formula"]
+    assert loaded.get_composition() == expected["composition"]
+    assert loaded.get_symbols_set() == expected["symbols"]
+    assert loaded.get_cell_volume() == expected["volume"]
+    assert loaded.get_dimensionality() == expected["dimensionality"]
+    assert loaded.is_alloy == expected["is_alloy"]
+    assert loaded.has_vacancies == expected["has_vacancies"]
+    
+    # the cached values are copies.
+    loaded.get_composition()["Li"] = 10
+    assert loaded.get_composition() == expected["composition"]
     
+    # different arguments are not memoized.
+    with pytest.raises(AssertionError):
+        loaded.get_formula(mode="hill")
     
+    # the cache is bounded: the least recently used entries are evicted.
+    monkeypatch.undo()
+    monkeypatch.setattr(structure_module, "_STORED_CACHE_MAXSIZE", 2)
+    _STORED_CACHE.clear()
+    for mode in ["hill", "reduce", "count_compact"]:
+        loaded.get_formula(mode=mode)
+    assert [key[3] for key in _STORED_CACHE] == [(("mode", "reduce"),), (("mode", "count_compact"),)]
     
 # Tests to be skipped because they require the implementation of the related method:
 